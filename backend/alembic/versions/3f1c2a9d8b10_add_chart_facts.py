@@ -0,0 +1,72 @@
+"""Add JSONB chart facts with a GIN index
+
+The first migration: it upgrades databases whose base tables were created
+by ``init_db`` before migrations existed. ``init_db`` now builds a fresh
+database at the latest revision and stamps it, so none of these run there.
+
+This revision adds the ``facts`` column to ``birth_charts``, indexes it with ``jsonb_path_ops`` and backfills
+it from the existing ``planet_positions`` rows.
+
+Revision ID: 3f1c2a9d8b10
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2a9d8b10"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "birth_charts",
+        sa.Column(
+            "facts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+    # Enum columns store member names (e.g. 'MOON'); facts use the values.
+    op.execute(
+        """
+        UPDATE birth_charts AS bc
+        SET facts = jsonb_build_object('planets', agg.planets)
+        FROM (
+            SELECT
+                chart_id,
+                jsonb_object_agg(
+                    lower(planet::text),
+                    jsonb_build_object(
+                        'sign', lower(sign::text),
+                        'nakshatra', nakshatra,
+                        'house', house,
+                        'retrograde', coalesce(is_retrograde, false)
+                    )
+                ) AS planets
+            FROM planet_positions
+            GROUP BY chart_id
+        ) AS agg
+        WHERE agg.chart_id = bc.id
+        """
+    )
+
+    op.create_index(
+        "ix_birth_charts_facts",
+        "birth_charts",
+        ["facts"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"facts": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_birth_charts_facts", table_name="birth_charts")
+    op.drop_column("birth_charts", "facts")
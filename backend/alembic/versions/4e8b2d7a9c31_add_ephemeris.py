@@ -0,0 +1,51 @@
+"""Add the precomputed ephemeris table, partitioned by year
+
+One partition per year from 1900 to 2100; ``load-ephemeris.py`` fills them.
+
+Revision ID: 4e8b2d7a9c31
+Revises: c7f3e9a05b18
+Create Date: 2026-10-19 17:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "4e8b2d7a9c31"
+down_revision = "c7f3e9a05b18"
+branch_labels = None
+depends_on = None
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+
+def upgrade() -> None:
+    # The planet and zodiacsign enum types already exist (planet_positions)
+    planet = postgresql.ENUM(name="planet", create_type=False)
+    zodiac_sign = postgresql.ENUM(name="zodiacsign", create_type=False)
+
+    op.create_table(
+        "ephemeris",
+        sa.Column("planet", planet, nullable=False),
+        sa.Column("moment", sa.DateTime(), nullable=False),
+        sa.Column("jd", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("speed", sa.Float(), nullable=False),
+        sa.Column("sign", zodiac_sign, nullable=False),
+        sa.Column("nakshatra", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("planet", "moment"),
+        postgresql_partition_by="RANGE (moment)",
+    )
+    op.create_index("ix_ephemeris_moment", "ephemeris", ["moment"])
+
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        op.execute(
+            f"CREATE TABLE ephemeris_y{year} PARTITION OF ephemeris "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+
+
+def downgrade() -> None:
+    # Dropping the parent drops its partitions and indexes
+    op.drop_table("ephemeris")
@@ -0,0 +1,42 @@
+"""Add ON DELETE CASCADE to chart foreign keys
+
+Deleting a user or a chart now removes dependent rows in the database
+instead of the ORM loading and deleting every child row individually.
+
+Revision ID: 5b7e09c4a1f3
+Revises: d91a7f3c5e22
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b7e09c4a1f3"
+down_revision = "d91a7f3c5e22"
+branch_labels = None
+depends_on = None
+
+# (table, column, referenced table); constraint names are PostgreSQL defaults
+FOREIGN_KEYS = (
+    ("birth_charts", "user_id", "users"),
+    ("planet_positions", "chart_id", "birth_charts"),
+    ("houses", "chart_id", "birth_charts"),
+    ("aspects", "chart_id", "birth_charts"),
+    ("dasha_periods", "chart_id", "birth_charts"),
+)
+
+
+def _recreate_foreign_keys(ondelete) -> None:
+    for table, column, referent in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, referent, [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
@@ -0,0 +1,82 @@
+"""Add composite, partial unique and trigram indexes for chart queries
+
+Revision ID: 8c4e61b0d2a7
+Revises: 3f1c2a9d8b10
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8c4e61b0d2a7"
+down_revision = "3f1c2a9d8b10"
+branch_labels = None
+depends_on = None
+
+CHILD_TABLES = ("planet_positions", "houses", "aspects", "dasha_periods")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_index(
+        "ix_birth_charts_user_id_id", "birth_charts", ["user_id", "id"]
+    )
+    op.create_index(
+        "ix_birth_charts_user_id_chart_type",
+        "birth_charts",
+        ["user_id", "chart_type"],
+    )
+
+    # Keep only the newest primary chart per owner before enforcing uniqueness.
+    op.execute(
+        """
+        UPDATE birth_charts AS bc
+        SET is_primary = false
+        WHERE bc.is_primary
+          AND EXISTS (
+              SELECT 1 FROM birth_charts AS newer
+              WHERE newer.user_id = bc.user_id
+                AND newer.is_primary
+                AND newer.id > bc.id
+          )
+        """
+    )
+    op.create_index(
+        "uq_birth_charts_user_id_primary",
+        "birth_charts",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("is_primary"),
+    )
+
+    op.create_index(
+        "ix_birth_charts_name_trgm",
+        "birth_charts",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_birth_charts_notes_trgm",
+        "birth_charts",
+        ["notes"],
+        postgresql_using="gin",
+        postgresql_ops={"notes": "gin_trgm_ops"},
+    )
+
+    # Batched relationship loads filter child tables by chart_id IN (...)
+    for table in CHILD_TABLES:
+        op.create_index(f"ix_{table}_chart_id", table, ["chart_id"])
+
+
+def downgrade() -> None:
+    for table in CHILD_TABLES:
+        op.drop_index(f"ix_{table}_chart_id", table_name=table)
+    op.drop_index("ix_birth_charts_notes_trgm", table_name="birth_charts")
+    op.drop_index("ix_birth_charts_name_trgm", table_name="birth_charts")
+    op.drop_index("uq_birth_charts_user_id_primary", table_name="birth_charts")
+    op.drop_index(
+        "ix_birth_charts_user_id_chart_type", table_name="birth_charts"
+    )
+    op.drop_index("ix_birth_charts_user_id_id", table_name="birth_charts")
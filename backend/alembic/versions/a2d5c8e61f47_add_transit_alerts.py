@@ -0,0 +1,57 @@
+"""Add transit_alerts for the nightly transit-to-natal job
+
+Revision ID: a2d5c8e61f47
+Revises: 5b7e09c4a1f3
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a2d5c8e61f47"
+down_revision = "5b7e09c4a1f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The planet and zodiacsign enum types already exist (planet_positions)
+    planet = postgresql.ENUM(name="planet", create_type=False)
+    zodiac_sign = postgresql.ENUM(name="zodiacsign", create_type=False)
+
+    op.create_table(
+        "transit_alerts",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "chart_id",
+            sa.Integer(),
+            sa.ForeignKey("birth_charts.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("alert_date", sa.Date(), nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("transit_planet", planet, nullable=True),
+        sa.Column("natal_planet", planet, nullable=True),
+        sa.Column("aspect", sa.String(16), nullable=True),
+        sa.Column("sign", zodiac_sign, nullable=True),
+        sa.Column("house", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_transit_alerts_chart_id", "transit_alerts", ["chart_id"])
+    op.create_index(
+        "ix_transit_alerts_user_id_alert_date",
+        "transit_alerts",
+        ["user_id", "alert_date"],
+    )
+    op.create_index("ix_transit_alerts_alert_date", "transit_alerts", ["alert_date"])
+
+
+def downgrade() -> None:
+    op.drop_table("transit_alerts")
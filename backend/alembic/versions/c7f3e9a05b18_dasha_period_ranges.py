@@ -0,0 +1,62 @@
+"""Store dasha periods as date ranges with a GiST index, and add antardashas
+
+``period`` is a generated ``daterange(start_date, end_date, '[)')`` so
+existing writers keep setting the two dates. ``level`` separates mahadashas
+(1) from antardashas (2); existing rows are all mahadashas.
+
+Revision ID: c7f3e9a05b18
+Revises: a2d5c8e61f47
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "c7f3e9a05b18"
+down_revision = "a2d5c8e61f47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GiST operator class for the integer level in the composite index
+    # (btree_gist has none for enums before PostgreSQL 16)
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    planet = postgresql.ENUM(name="planet", create_type=False)
+
+    op.add_column(
+        "dasha_periods",
+        sa.Column("level", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "dasha_periods",
+        sa.Column("mahadasha_planet", planet, nullable=True),
+    )
+    op.add_column(
+        "dasha_periods",
+        sa.Column(
+            "period",
+            postgresql.DATERANGE(),
+            sa.Computed("daterange(start_date, end_date, '[)')", persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_dasha_periods_level_period",
+        "dasha_periods",
+        ["level", "period"],
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "ix_dasha_periods_planet_level", "dasha_periods", ["planet", "level"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dasha_periods_planet_level", table_name="dasha_periods")
+    op.drop_index("ix_dasha_periods_level_period", table_name="dasha_periods")
+    op.execute("DELETE FROM dasha_periods WHERE level <> 1")
+    op.drop_column("dasha_periods", "period")
+    op.drop_column("dasha_periods", "mahadasha_planet")
+    op.drop_column("dasha_periods", "level")
@@ -0,0 +1,42 @@
+"""Enforce one primary chart per owner with a statement-level constraint
+
+The partial unique index from 8c4e61b0d2a7 is checked row by row, which
+makes a single ``UPDATE ... SET is_primary = (id = :new)`` fail whenever the
+new row is visited before the old one. A deferrable exclusion constraint
+over the same btree predicate is checked at the end of each statement.
+
+Revision ID: d91a7f3c5e22
+Revises: 8c4e61b0d2a7
+Create Date: 2026-10-19 11:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d91a7f3c5e22"
+down_revision = "8c4e61b0d2a7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("uq_birth_charts_user_id_primary", table_name="birth_charts")
+    op.execute(
+        """
+        ALTER TABLE birth_charts
+        ADD CONSTRAINT uq_birth_charts_user_id_primary
+        EXCLUDE USING btree (user_id WITH =) WHERE (is_primary)
+        DEFERRABLE INITIALLY IMMEDIATE
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE birth_charts DROP CONSTRAINT uq_birth_charts_user_id_primary"
+    )
+    op.execute(
+        """
+        CREATE UNIQUE INDEX uq_birth_charts_user_id_primary
+        ON birth_charts (user_id) WHERE is_primary
+        """
+    )
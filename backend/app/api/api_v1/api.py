@@ -5,7 +5,7 @@ from fastapi import APIRouter
 
 from ..deps import get_current_active_user
 from ...models.user import User
-from .endpoints import auth, users, charts
+from .endpoints import auth, users, charts, sky
 
 # Create main API router
 api_router = APIRouter()
@@ -14,6 +14,7 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(charts.router, prefix="/charts", tags=["charts"])
+api_router.include_router(sky.router, prefix="/sky", tags=["sky"])
 
 # Health check endpoint
 @api_router.get("/health")
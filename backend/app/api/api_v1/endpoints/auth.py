@@ -5,6 +5,7 @@ from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -18,13 +19,13 @@ from ...models.token import Token
 router = APIRouter()
 
 @router.post("/login/access-token", response_model=schemas.Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = crud.user.authenticate(
+    user = await crud.user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -53,7 +54,7 @@ def test_token(current_user: models.User = Depends(security.get_current_user)) -
     return current_user
 
 @router.post("/register", response_model=schemas.User)
-def create_user_registration(
+async def create_user_registration(
     *,
     db: Session = Depends(get_db),
     user_in: schemas.UserCreate,
@@ -61,7 +62,7 @@ def create_user_registration(
     """
     Create new user (registration).
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -69,7 +70,7 @@ def create_user_registration(
         )
     
     # Create new user
-    user = crud.user.create(db, obj_in=user_in)
+    user = await crud.user.create_async(db, obj_in=user_in)
     
     # TODO: Send welcome email
     
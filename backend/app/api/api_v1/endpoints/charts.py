@@ -1,20 +1,54 @@
 """
 API endpoints for Vedic astrology chart calculations and analysis.
 """
-from datetime import datetime, time
-from typing import Any, Dict, List, Optional
+import hashlib
+import json
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
 from app.core.config import settings
-from app.services.astrology.calculation_engine import VedicCalculator
+from app.core.singleflight import SharedSingleFlight, SingleFlight
+from app.db.session import get_read_db
+from app.models.astrology import Planet, PlanetPlacementFilter
+
+if TYPE_CHECKING:
+    from app.services.astrology.calculation_engine import VedicCalculator
 
 router = APIRouter()
-calculator = VedicCalculator()
+
+
+@lru_cache(maxsize=None)
+def get_calculator() -> "VedicCalculator":
+    """
+    The shared calculator, built on first use.
+    
+    Importing the engine loads swisseph and the ephemeris path; deferring it
+    keeps that off the import path of the app (and of serverless cold starts
+    that only serve auth or health requests).
+    """
+    from app.services.astrology.calculation_engine import VedicCalculator
+    return VedicCalculator()
+
+
+@lru_cache(maxsize=None)
+def get_chart_flight() -> SingleFlight:
+    """Coalescer for chart calculations (cross-process with the redis backend)."""
+    if settings.SINGLE_FLIGHT_BACKEND == "redis":
+        return SharedSingleFlight(
+            prefix="chart-calc:",
+            lock_ttl=settings.SINGLE_FLIGHT_LOCK_SECONDS,
+            result_ttl=settings.SINGLE_FLIGHT_RESULT_SECONDS,
+        )
+    return SingleFlight()
+
 
 class ChartRequest(BaseModel):
     """Request model for chart generation."""
@@ -28,6 +62,73 @@ class ChartRequest(BaseModel):
     house_system: str = Field("P", description="House system (P=Placidus, K=Koch, etc.)")
     is_primary: bool = Field(False, description="Set as primary chart for the user")
 
+def chart_calculation_key(chart_in: ChartRequest) -> str:
+    """
+    Canonical key for the inputs that determine a chart calculation.
+    
+    Name, timezone label and primary flag don't affect the result, so
+    requests differing only in those share a key.
+    """
+    inputs = [
+        chart_in.birth_date,
+        chart_in.birth_time,
+        round(chart_in.latitude, 6) + 0.0,  # + 0.0 folds -0.0 into 0.0
+        round(chart_in.longitude, 6) + 0.0,
+        chart_in.ayanamsa,
+        chart_in.house_system,
+    ]
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+def calculate_chart(chart_in: ChartRequest, birth_date: date, birth_time: time) -> Dict[str, Any]:
+    """
+    Run the calculator for a chart request.
+    
+    The result is in its JSON form (enums as values, datetimes as ISO
+    strings), which is how it is stored and lets coalesced callers in other
+    processes receive it through the shared cache.
+    """
+    calculator = get_calculator()
+    
+    # Calculate planetary positions
+    positions = calculator.calculate_planetary_positions(
+        birth_date=birth_date,
+        birth_time=birth_time,
+        latitude=chart_in.latitude,
+        longitude=chart_in.longitude,
+        ayanamsa=chart_in.ayanamsa
+    )
+    
+    # Calculate houses
+    houses = calculator.calculate_houses(
+        birth_date=birth_date,
+        birth_time=birth_time,
+        latitude=chart_in.latitude,
+        longitude=chart_in.longitude,
+        house_system=chart_in.house_system
+    )
+    
+    # Calculate aspects
+    aspects = calculator.calculate_aspects(positions)
+    
+    # Calculate dasha periods
+    dasha_periods = calculator.calculate_dasha_periods(
+        birth_date=birth_date,
+        birth_time=birth_time,
+        latitude=chart_in.latitude,
+        longitude=chart_in.longitude,
+        years=100
+    )
+    
+    return jsonable_encoder({
+        "ayanamsa": calculator.AYANAMSA,
+        "planetary_positions": {
+            planet.value: pos for planet, pos in positions.items()
+        },
+        "houses": houses,
+        "aspects": aspects,
+        "dasha_periods": dasha_periods,
+    })
+
 class ChartResponse(schemas.BirthChart):
     """Response model for chart with calculations."""
     planetary_positions: Dict[str, Any] = Field(..., description="Planetary positions")
@@ -50,34 +151,10 @@ def generate_chart(
         birth_date = datetime.strptime(chart_in.birth_date, "%Y-%m-%d").date()
         birth_time = datetime.strptime(chart_in.birth_time, "%H:%M:%S").time()
         
-        # Calculate planetary positions
-        positions = calculator.calculate_planetary_positions(
-            birth_date=birth_date,
-            birth_time=birth_time,
-            latitude=chart_in.latitude,
-            longitude=chart_in.longitude,
-            ayanamsa=chart_in.ayanamsa
-        )
-        
-        # Calculate houses
-        houses = calculator.calculate_houses(
-            birth_date=birth_date,
-            birth_time=birth_time,
-            latitude=chart_in.latitude,
-            longitude=chart_in.longitude,
-            house_system=chart_in.house_system
-        )
-        
-        # Calculate aspects
-        aspects = calculator.calculate_aspects(positions)
-        
-        # Calculate dasha periods
-        dasha_periods = calculator.calculate_dasha_periods(
-            birth_date=birth_date,
-            birth_time=birth_time,
-            latitude=chart_in.latitude,
-            longitude=chart_in.longitude,
-            years=100
+        # Concurrent requests for the same chart share one calculation
+        calculation = get_chart_flight().do(
+            chart_calculation_key(chart_in),
+            lambda: calculate_chart(chart_in, birth_date, birth_time),
         )
         
         # Create chart in database
@@ -88,16 +165,14 @@ def generate_chart(
             "timezone": chart_in.timezone,
             "latitude": chart_in.latitude,
             "longitude": chart_in.longitude,
-            "ayanamsa": calculator.AYANAMSA,
+            "ayanamsa": calculation["ayanamsa"],
             "house_system": chart_in.house_system,
             "is_primary": chart_in.is_primary,
             "user_id": current_user.id,
-            "planetary_positions": {
-                planet.value: pos for planet, pos in positions.items()
-            },
-            "houses": houses,
-            "aspects": aspects,
-            "dasha_periods": dasha_periods
+            "planetary_positions": calculation["planetary_positions"],
+            "houses": calculation["houses"],
+            "aspects": calculation["aspects"],
+            "dasha_periods": calculation["dasha_periods"]
         }
         
         chart = crud.birth_chart.create_with_owner(
@@ -106,10 +181,6 @@ def generate_chart(
             owner_id=current_user.id
         )
         
-        # If this is set as primary, update other charts
-        if chart_in.is_primary:
-            crud.birth_chart.set_primary_chart(db, chart_id=chart.id, user_id=current_user.id)
-        
         # Prepare response
         response = ChartResponse(
             **chart.to_dict(),
@@ -135,7 +206,7 @@ def generate_chart(
 @router.get("/{chart_id}", response_model=ChartResponse)
 def get_chart(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(get_read_db),
     chart_id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -167,7 +238,7 @@ def get_chart(
 @router.get("/user/{user_id}", response_model=List[schemas.BirthChart])
 def get_user_charts(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(get_read_db),
     user_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -188,6 +259,63 @@ def get_user_charts(
     )
     return charts
 
+@router.post("/search/placements", response_model=List[schemas.BirthChart])
+def search_charts_by_placement(
+    *,
+    db: Session = Depends(deps.get_db),
+    placements: List[PlanetPlacementFilter],
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Find the current user's charts matching all given planet placements,
+    e.g. Moon in Rohini, or Saturn retrograde in the 7th house.
+    """
+    if not placements:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one placement is required"
+        )
+    
+    return crud.birth_chart.filter_by_placements(
+        db, owner_id=current_user.id, placements=placements, skip=skip, limit=limit
+    )
+
+@router.get("/search/dasha", response_model=List[schemas.BirthChart])
+def search_charts_by_dasha(
+    *,
+    db: Session = Depends(get_read_db),
+    on: date,
+    mahadasha: List[Planet] = Query([]),
+    antardasha: List[Planet] = Query([]),
+    match_all: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Find the current user's charts running the given dashas on a date,
+    e.g. ``?on=2026-01-01&mahadasha=saturn&antardasha=rahu`` for clients in
+    Saturn mahadasha or a Rahu antardasha. With ``match_all`` both must hold.
+    """
+    if not mahadasha and not antardasha:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one mahadasha or antardasha planet is required"
+        )
+    
+    return crud.birth_chart.get_multi_in_dasha(
+        db,
+        owner_id=current_user.id,
+        on=on,
+        mahadasha=mahadasha,
+        antardasha=antardasha,
+        match_all=match_all,
+        skip=skip,
+        limit=limit,
+    )
+
 @router.delete("/{chart_id}", response_model=schemas.BirthChart)
 def delete_chart(
     *,
@@ -238,5 +366,5 @@ def set_primary_chart(
             detail="Not enough permissions"
         )
     
-    # Set as primary
-    return crud.birth_chart.set_primary_chart(db, chart_id=chart_id, user_id=current_user.id)
+    # Set as primary for the chart's owner (admins may act on others' charts)
+    return crud.birth_chart.set_primary_chart(db, chart_id=chart_id, user_id=chart.user_id)
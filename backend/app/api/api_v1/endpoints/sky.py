@@ -0,0 +1,150 @@
+"""
+API endpoints for the current sky (transits, horary and prashna).
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from app import crud
+from app.core.config import settings
+from app.core.security import _decode_token
+from app.db.session import get_db_session
+
+if TYPE_CHECKING:
+    from app.services.astrology.current_sky import CurrentSky
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def get_current_sky() -> "CurrentSky":
+    """The process-wide snapshot service (imports swisseph on first use)."""
+    from app.services.astrology.current_sky import current_sky
+    return current_sky
+
+class SkyResponse(BaseModel):
+    """Planetary positions at an instant, with houses when a location is given."""
+    timestamp: datetime = Field(..., description="Instant the positions are for (UTC)")
+    ayanamsa: float = Field(..., description="Lahiri ayanamsa at that instant")
+    planetary_positions: Dict[str, Any] = Field(..., description="Planetary positions")
+    houses: Optional[List[Dict[str, Any]]] = Field(None, description="House cusps")
+
+@router.get("/now", response_model=SkyResponse)
+def read_current_sky(
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    house_system: str = Query("P", min_length=1, max_length=1),
+    at: Optional[datetime] = Query(None, description="Instant (default: now)"),
+) -> Any:
+    """
+    Planetary positions for now (or ``at``), projected from the shared
+    current-sky snapshot. Pass ``latitude`` and ``longitude`` for houses.
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude and longitude must be given together"
+        )
+    
+    sky = get_current_sky()
+    moment = at or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    
+    houses = None
+    if latitude is not None:
+        houses = sky.houses(latitude, longitude, at=moment, house_system=house_system)
+    
+    return SkyResponse(
+        timestamp=moment,
+        ayanamsa=sky.ayanamsa(moment),
+        planetary_positions={
+            planet.value: pos for planet, pos in sky.positions(moment).items()
+        },
+        houses=houses,
+    )
+
+
+def _natal_longitudes(token: Optional[str], chart_id: int) -> Optional[Dict[str, float]]:
+    """Natal longitudes of a chart the token's user owns, or None."""
+    if not token:
+        return None
+    try:
+        user_id, _ = _decode_token(token)
+    except Exception:
+        return None
+    
+    db = get_db_session()
+    try:
+        chart = crud.birth_chart.get(db, id=chart_id)
+        if chart is None or str(chart.user_id) != user_id:
+            return None
+        return {
+            planet: position["longitude"]
+            for planet, position in (chart.planetary_positions or {}).items()
+        }
+    finally:
+        db.close()
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass  # Client messages (keep-alives) are ignored
+
+@router.websocket("/stream")
+async def stream_transits(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    chart_id: Optional[int] = None,
+) -> None:
+    """
+    Stream planetary positions, and with ``chart_id`` (and a ``token`` for
+    its owner) transit-to-natal aspect events.
+    
+    The first ``positions`` message carries every planet; later ones carry
+    only the planets that changed since the last message on this connection.
+    A client too slow to keep up skips ticks; one that stops reading for
+    TRANSIT_STREAM_SEND_TIMEOUT_SECONDS is disconnected.
+    """
+    natal = None
+    if chart_id is not None:
+        natal = await run_in_threadpool(_natal_longitudes, token, chart_id)
+        if natal is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    
+    from app.services.astrology.transit_stream import transit_broadcaster
+    
+    await websocket.accept()
+    subscription = transit_broadcaster.subscribe(natal)
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_frame = asyncio.create_task(subscription.next_frame())
+            await asyncio.wait(
+                {next_frame, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected.done():
+                next_frame.cancel()
+                break
+            for message in subscription.messages_for(next_frame.result()):
+                await asyncio.wait_for(
+                    websocket.send_json(message),
+                    timeout=settings.TRANSIT_STREAM_SEND_TIMEOUT_SECONDS,
+                )
+    except asyncio.TimeoutError:
+        logger.info("Closing transit stream for a client that stopped reading")
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            pass  # The transport is already gone
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        transit_broadcaster.unsubscribe(subscription)
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
-from app.core.config import settings
+from app.db.session import get_read_db
 
 router = APIRouter()
 
@@ -37,7 +37,7 @@ def update_user_me(
 @router.get("/me/charts", response_model=List[schemas.BirthChart])
 def read_user_charts(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(deps.get_current_active_user),
@@ -53,13 +53,13 @@ def read_user_charts(
 @router.get("/me/primary-chart", response_model=schemas.BirthChart)
 def get_primary_chart(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get the primary chart for the current user.
     """
-    chart = crud.birth_chart.get_primary_chart(db, user_id=current_user.id)
+    chart = crud.birth_chart.get_primary_chart(db, owner_id=current_user.id)
     if not chart:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,96 @@
+"""
+Small in-process caches and the shared Redis client.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Generic, Hashable, Optional, Tuple, TypeVar
+
+from .config import settings
+
+if TYPE_CHECKING:
+    import redis
+    from redis.asyncio import Redis
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache with an optional per-entry time-to-live.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is
+    reached, and are treated as absent once older than ``ttl`` seconds.
+    With ``ttl=None`` this is a plain bounded LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@lru_cache()
+def get_redis() -> "Redis":
+    """
+    The process-wide asyncio Redis client for REDIS_URL.
+    
+    redis is imported on first use, so deployments that never touch the
+    shared cache don't pay for it at startup. Connections are opened lazily
+    by the client's pool.
+    """
+    from redis.asyncio import Redis
+    
+    return Redis.from_url(
+        settings.REDIS_URL,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+    )
+
+
+@lru_cache()
+def get_redis_sync() -> "redis.Redis":
+    """The blocking counterpart of ``get_redis`` for sync endpoints and jobs."""
+    import redis
+    
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+    )
@@ -31,6 +31,25 @@ class Settings(BaseSettings):
             return v
         return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
     
+    # Connection pooling: "queue" for long-running servers, "serverless" for
+    # function instances (one connection, reused across warm invocations),
+    # or "null" to open a connection per session behind an external pooler
+    # such as pgbouncer
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    
+    @validator("DB_POOL_MODE")
+    def validate_pool_mode(cls, v: str) -> str:
+        if v not in ("queue", "serverless", "null"):
+            raise ValueError("DB_POOL_MODE must be 'queue', 'serverless' or 'null'")
+        return v
+    
+    # Read replicas for read-only endpoints (empty = read from the primary)
+    DATABASE_REPLICA_URIS: List[str] = []
+    # After a user's own write, their reads stay on the primary this long
+    READ_YOUR_WRITES_SECONDS: int = 10
+    
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_PASSWORD: Optional[str] = None
@@ -38,6 +57,47 @@ class Settings(BaseSettings):
     
     # Security
     ALGORITHM: str = "HS256"
+    # Password hashing. Pick PASSWORD_BCRYPT_ROUNDS with calibrate-bcrypt.py;
+    # stored hashes with a different cost are rehashed on the next login.
+    # Hashing runs on its own small executor so login bursts can't occupy
+    # the request threadpool; callers beyond the pending cap get a 503
+    # immediately rather than waiting for a slot.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    
+    # Verified-token LRU and authenticated-user cache (per process)
+    TOKEN_CACHE_SIZE: int = 10_000
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+    
+    # Rate limiting (token buckets, see core/rate_limit.py). Authenticated
+    # requests draw from a per-user bucket and anonymous ones from a per-IP
+    # bucket; expensive endpoints take several tokens per call. The memory
+    # backend is per process, the redis backend is shared via REDIS_URL.
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_USER_CAPACITY: int = 120
+    RATE_LIMIT_USER_REFILL_PER_SECOND: float = 2.0
+    RATE_LIMIT_IP_CAPACITY: int = 60
+    RATE_LIMIT_IP_REFILL_PER_SECOND: float = 1.0
+    # Where the client IP comes from behind a proxy. A header the platform
+    # sets itself (e.g. x-nf-client-connection-ip on Netlify) wins; otherwise
+    # optionally the right-most X-Forwarded-For hop, the one appended by the
+    # proxy in front of us (only behind exactly one trusted proxy).
+    RATE_LIMIT_CLIENT_IP_HEADER: Optional[str] = None
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    
+    # Identical concurrent chart calculations share one computation; with
+    # "redis" this also holds across processes via a short-lived lock
+    SINGLE_FLIGHT_BACKEND: str = "memory"
+    SINGLE_FLIGHT_LOCK_SECONDS: float = 30.0
+    SINGLE_FLIGHT_RESULT_SECONDS: float = 10.0
+    
+    @validator("RATE_LIMIT_BACKEND", "SINGLE_FLIGHT_BACKEND")
+    def validate_shared_backend(cls, v: str, field) -> str:
+        if v not in ("memory", "redis"):
+            raise ValueError(f"{field.name} must be 'memory' or 'redis'")
+        return v
     
     # Email Configuration
     SMTP_TLS: bool = True
@@ -50,10 +110,33 @@ class Settings(BaseSettings):
     
     # Swiss Ephemeris Configuration
     SWISS_EPHEMERIS_PATH: str = "/usr/share/libswe"
+    # Current-sky snapshot shared by transit/prashna requests. Requests within
+    # CURRENT_SKY_MAX_AGE_SECONDS of the snapshot are projected from it.
+    CURRENT_SKY_REFRESH_SECONDS: float = 30.0
+    CURRENT_SKY_MAX_AGE_SECONDS: float = 120.0
+    # Refresh from a background task (off where instances are frozen between
+    # requests; the snapshot is then refreshed on demand)
+    CURRENT_SKY_BACKGROUND_REFRESH: bool = True
+    
+    # Live transit WebSocket: one frame per tick for all subscribers, longitudes
+    # rounded to TRANSIT_STREAM_PRECISION decimals; slow clients are dropped
+    # after TRANSIT_STREAM_SEND_TIMEOUT_SECONDS
+    TRANSIT_STREAM_TICK_SECONDS: float = 5.0
+    TRANSIT_STREAM_PRECISION: int = 3
+    TRANSIT_STREAM_SEND_TIMEOUT_SECONDS: float = 10.0
+    TRANSIT_ASPECT_ORB: float = 1.0
+    
+    # Sun/Moon rise and set LRU (per process, one entry per body, location
+    # and day); locations are rounded to RISE_SET_LOCATION_PRECISION degrees
+    RISE_SET_CACHE_SIZE: int = 100_000
+    RISE_SET_LOCATION_PRECISION: float = 0.01
     
     # Feature Flags
     ENABLE_EMAIL_VERIFICATION: bool = True
-    ENABLE_RATE_LIMITING: bool = True
+    # Off by default: the memory backend limits per process (per instance
+    # on serverless), so enable it with RATE_LIMIT_BACKEND=redis when the
+    # API runs in more than one process
+    ENABLE_RATE_LIMITING: bool = False
     
     class Config:
         case_sensitive = True
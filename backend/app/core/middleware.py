@@ -0,0 +1,52 @@
+"""
+ASGI middleware for the Vedic Astrology API.
+"""
+from typing import Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_SECURITY_HEADERS: Tuple[Tuple[str, str], ...] = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+)
+
+
+class SecurityHeadersMiddleware:
+    """
+    Add security headers to every HTTP response.
+
+    A pure ASGI middleware: it only rewrites the ``http.response.start``
+    message and passes body messages straight through, so streaming and
+    NDJSON responses are not buffered and no Request/Response objects are
+    built per request. Headers are encoded once, up front. A header the
+    endpoint already set is left alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        headers: Iterable[Tuple[str, str]] = DEFAULT_SECURITY_HEADERS,
+    ) -> None:
+        self.app = app
+        self.headers: List[Tuple[bytes, bytes]] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                existing = message.get("headers", [])
+                present = {name.lower() for name, _ in existing}
+                message["headers"] = list(existing) + [
+                    header for header in self.headers if header[0] not in present
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
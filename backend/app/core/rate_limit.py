@@ -0,0 +1,231 @@
+"""
+Token-bucket rate limiting for the Vedic Astrology API.
+
+Each client has a bucket that holds up to ``capacity`` tokens and refills
+at ``refill_rate`` tokens per second. A request takes as many tokens as its
+endpoint weight, so generating a chart drains the bucket much faster than
+reading one. Authenticated requests are charged to a per-user bucket and
+anonymous ones to a per-IP bucket.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from typing import Callable, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .cache import TTLCache, get_redis
+from .config import settings
+from .security import _decode_token
+
+logger = logging.getLogger(__name__)
+
+# (method, path regex, tokens per request); the first match wins and
+# anything unmatched costs DEFAULT_WEIGHT
+DEFAULT_ENDPOINT_WEIGHTS: Tuple[Tuple[str, str, int], ...] = (
+    ("GET", r"/health$", 0),
+    ("POST", r"/charts/generate$", 10),
+    ("POST", r"/charts/search/placements$", 3),
+    ("POST", r"/auth/(login/access-token|register)$", 5),
+    ("POST", r"/users/me/change-password$", 5),
+)
+DEFAULT_WEIGHT = 1
+
+
+class BucketPolicy(NamedTuple):
+    capacity: int
+    refill_rate: float
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float
+
+
+class MemoryRateLimitBackend:
+    """
+    Per-process buckets kept in a bounded LRU.
+
+    A bucket left alone long enough to refill completely is indistinguishable
+    from a new one, so idle buckets may be evicted freely.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._buckets: "TTLCache[Tuple[float, float]]" = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._clock = clock
+    
+    async def consume(self, key: str, cost: int, policy: BucketPolicy) -> RateLimitResult:
+        with self._lock:
+            now = self._clock()
+            tokens, updated = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated) * policy.refill_rate)
+            if tokens >= cost:
+                self._buckets.set(key, (tokens - cost, now))
+                return RateLimitResult(True, 0.0)
+            self._buckets.set(key, (tokens, now))
+            return RateLimitResult(False, (cost - tokens) / policy.refill_rate)
+
+
+# Refill and take in one atomic step on the Redis server, using its clock so
+# app instances with skewed clocks agree. The bucket expires once it would
+# be full again. Lua numbers are truncated to integers on return, so
+# retry_after comes back as a string.
+_CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Buckets shared by every app instance, stored as Redis hashes."""
+    
+    def __init__(self, prefix: str = "ratelimit:"):
+        self.prefix = prefix
+        self._script = None
+    
+    async def consume(self, key: str, cost: int, policy: BucketPolicy) -> RateLimitResult:
+        if self._script is None:
+            # EVALSHA with a transparent EVAL fallback on NOSCRIPT
+            self._script = get_redis().register_script(_CONSUME_SCRIPT)
+        allowed, retry_after = await self._script(
+            keys=[self.prefix + key],
+            args=[policy.capacity, policy.refill_rate, cost],
+        )
+        return RateLimitResult(bool(int(allowed)), float(retry_after))
+
+
+class RateLimitMiddleware:
+    """
+    Reject clients that exceed their token bucket with 429 Too Many Requests.
+
+    A pure ASGI middleware: the client is identified from the bearer token
+    (verified through the same cache as get_current_user) or the client IP,
+    before any routing or body parsing. If the backend is unreachable,
+    requests are let through rather than failing the API.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend=None,
+        user_policy: Optional[BucketPolicy] = None,
+        ip_policy: Optional[BucketPolicy] = None,
+        weights: Iterable[Tuple[str, str, int]] = DEFAULT_ENDPOINT_WEIGHTS,
+        trust_forwarded_for: Optional[bool] = None,
+        client_ip_header: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        if backend is None:
+            backend = (
+                RedisRateLimitBackend()
+                if settings.RATE_LIMIT_BACKEND == "redis"
+                else MemoryRateLimitBackend()
+            )
+        self.backend = backend
+        self.user_policy = user_policy or BucketPolicy(
+            settings.RATE_LIMIT_USER_CAPACITY, settings.RATE_LIMIT_USER_REFILL_PER_SECOND
+        )
+        self.ip_policy = ip_policy or BucketPolicy(
+            settings.RATE_LIMIT_IP_CAPACITY, settings.RATE_LIMIT_IP_REFILL_PER_SECOND
+        )
+        self.weights: List[Tuple[str, Pattern, int]] = [
+            (method, re.compile(pattern), cost) for method, pattern, cost in weights
+        ]
+        self.trust_forwarded_for = (
+            settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+            if trust_forwarded_for is None
+            else trust_forwarded_for
+        )
+        client_ip_header = client_ip_header or settings.RATE_LIMIT_CLIENT_IP_HEADER
+        self.client_ip_header = (
+            client_ip_header.lower().encode("latin-1") if client_ip_header else None
+        )
+    
+    def weight(self, method: str, path: str) -> int:
+        for weight_method, pattern, cost in self.weights:
+            if weight_method == method and pattern.search(path):
+                return cost
+        return DEFAULT_WEIGHT
+    
+    def client_key(self, scope: Scope) -> Tuple[str, BucketPolicy]:
+        """The bucket a request is charged to, and that bucket's policy."""
+        headers = dict(scope.get("headers", []))
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                subject, _ = _decode_token(token)
+                return f"user:{subject}", self.user_policy
+            except Exception:
+                # Invalid tokens are rejected later by get_current_user;
+                # until then they are anonymous
+                pass
+        
+        ip = None
+        if self.client_ip_header and self.client_ip_header in headers:
+            ip = headers[self.client_ip_header].decode("latin-1").strip()
+        elif self.trust_forwarded_for and b"x-forwarded-for" in headers:
+            # Earlier entries are whatever the client sent; only the last
+            # was added by the proxy
+            ip = headers[b"x-forwarded-for"].decode("latin-1").split(",")[-1].strip()
+        if not ip and scope.get("client"):
+            ip = scope["client"][0]
+        return f"ip:{ip or 'unknown'}", self.ip_policy
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        cost = self.weight(scope["method"], scope["path"])
+        if cost > 0:
+            key, policy = self.client_key(scope)
+            try:
+                result = await self.backend.consume(key, min(cost, policy.capacity), policy)
+            except Exception:
+                logger.warning("Rate limit backend unavailable, allowing request", exc_info=True)
+                result = RateLimitResult(True, 0.0)
+            if not result.allowed:
+                await self._reject(send, result.retry_after)
+                return
+        
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    async def _reject(send: Send, retry_after: float) -> None:
+        body = b'{"detail":"Rate limit exceeded"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,36 +1,134 @@
 """
 Security utilities for authentication and authorization.
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, Union
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
 
+from .cache import TTLCache
 from .config import settings
+from ..db.session import get_db
 from ..models.token import TokenData
-from ..models.user import User
+from ..models.user import User, UserTable
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password-hashing executor is saturated."""
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    Password hashing context, built on first use.
+    
+    passlib and the bcrypt backend are only needed by login, registration
+    and password changes, so they stay off the import path. min and max
+    rounds are pinned to the configured cost so any stored hash with a
+    different cost is reported by ``needs_update`` and rehashed on login.
+    """
+    from passlib.context import CryptContext
+    rounds = settings.PASSWORD_BCRYPT_ROUNDS
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+# Dedicated bcrypt workers plus a cap on queued + running hashes
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+def _run_hash(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run a bcrypt operation on the hashing executor and wait for it.
+    
+    Blocks the calling thread, so request handlers should prefer the async
+    variants. Never waits for a slot: a full queue fails straight away.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        return _hash_executor.submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
+async def _run_hash_async(fn: Callable[..., T], *args: Any) -> T:
+    """Like ``_run_hash`` but awaits without holding a thread."""
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        return await asyncio.wrap_future(_hash_executor.submit(fn, *args))
+    finally:
+        _hash_slots.release()
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Verified tokens -> (sub, exp); users by sub
+_verified_tokens: "TTLCache[Tuple[str, float]]" = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+_user_cache: "TTLCache[User]" = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hash(get_pwd_context().verify, plain_password, hashed_password)
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if the stored hash uses an outdated cost, return
+    a replacement hash computed with the current one.
+    
+    Returns:
+        ``(valid, new_hash)``; ``new_hash`` is None when no rehash is needed
+    """
+    return _run_hash(get_pwd_context().verify_and_update, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate a password hash."""
-    return pwd_context.hash(password)
+    return _run_hash(get_pwd_context().hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password from async code without blocking the event loop."""
+    return await _run_hash_async(get_pwd_context().verify, plain_password, hashed_password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """``verify_and_update_password`` without blocking the event loop."""
+    return await _run_hash_async(
+        get_pwd_context().verify_and_update, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash from async code without blocking the event loop."""
+    return await _run_hash_async(get_pwd_context().hash, password)
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
     """Create a JWT access token."""
+    from jose import jwt
+    
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -42,8 +140,54 @@ def create_access_token(
     )
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Get the current user from the JWT token."""
+def _decode_token(token: str) -> Tuple[str, float]:
+    """
+    Verify a JWT and return its ``(sub, exp)``.
+    
+    Verified tokens are remembered in a bounded LRU until they expire, so a
+    client repeating the same bearer token skips signature verification.
+    """
+    cached = _verified_tokens.get(token)
+    if cached is not None and cached[1] > time.time():
+        return cached
+    
+    # jose (and its cryptography backend) is imported on first use; after
+    # that these are plain sys.modules lookups
+    from jose import jwt
+    
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+    subject = payload.get("sub")
+    if subject is None:
+        raise ValueError("Token has no subject")
+    verified = (str(subject), float(payload.get("exp", 0)))
+    _verified_tokens.set(token, verified)
+    return verified
+
+def invalidate_user_cache(user_id: Any) -> None:
+    """
+    Drop a cached user so the next request reloads it from the database.
+    
+    Called whenever a user is updated or deleted. The cache is per
+    process, so other workers pick the change up within
+    ``USER_CACHE_TTL_SECONDS``.
+    """
+    _user_cache.pop(str(user_id))
+
+def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Get the current user from the JWT token.
+    
+    The user is loaded from the database by the token's ``sub`` (the user
+    ID) and cached for ``USER_CACHE_TTL_SECONDS``.
+    """
+    from jose import JWTError
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -51,35 +195,38 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     )
     
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        user_id, _ = _decode_token(token)
+        token_data = TokenData(username=user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
     
-    # TODO: Replace with actual database call
-    # user = await get_user_by_username(username=token_data.username)
-    user = User(username=token_data.username, email="user@example.com", full_name="Test User")
+    # Lets the session router keep this user's reads on the primary after a write
+    request.state.user_id = token_data.username
     
+    user = _user_cache.get(token_data.username)
     if user is None:
-        raise credentials_exception
+        try:
+            db_user = db.get(UserTable, int(token_data.username))
+        except ValueError:
+            raise credentials_exception
+        if db_user is None:
+            raise credentials_exception
+        user = User.from_orm(db_user)
+        _user_cache.set(token_data.username, user)
     return user
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     """Get the current active user."""
-    # TODO: Add user active status check
-    # if not current_user.is_active:
-    #     raise HTTPException(status_code=400, detail="Inactive user")
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def create_refresh_token(subject: Union[str, Any]) -> str:
     """Create a refresh token with a longer expiration time."""
+    from jose import jwt
+    
     expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     expire = datetime.utcnow() + expires_delta
     
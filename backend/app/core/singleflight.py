@@ -0,0 +1,157 @@
+"""
+Request coalescing for expensive computations.
+
+``SingleFlight`` makes concurrent calls with the same key share a single
+execution within a process. ``SharedSingleFlight`` adds a short-lived Redis
+lock so that, across processes, one caller computes while the others wait
+for its result to appear in the shared cache.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+from .cache import get_redis_sync
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it runs
+    block on the same future and get the same result (or exception). The key
+    is forgotten as soon as the call finishes, so this is not a cache: a
+    later call computes afresh. Results are shared between callers and
+    should be treated as read-only.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# Delete the lock only if it is still ours (it may have expired and been
+# taken by another process while we computed)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SharedSingleFlight(SingleFlight):
+    """
+    Single-flight across processes through the shared Redis cache.
+
+    Calls are first coalesced in-process, so each process has at most one
+    caller per key talking to Redis. That caller takes ``<prefix>lock:<key>``
+    with ``SET NX PX``; the winner computes and publishes the JSON-encoded
+    result under ``<prefix>result:<key>`` for ``result_ttl`` seconds. The
+    others poll for the result. If the lock holder dies, its lock expires
+    after ``lock_ttl`` and a waiter takes over; a waiter that runs out of
+    ``lock_ttl`` computes for itself. If Redis is unreachable every process
+    simply computes locally.
+
+    Keys must be strings and results must be JSON-serializable.
+    """
+    
+    def __init__(
+        self,
+        prefix: str,
+        lock_ttl: float = 30.0,
+        result_ttl: float = 10.0,
+        poll_interval: float = 0.05,
+        client_factory: Callable[[], Any] = get_redis_sync,
+    ):
+        super().__init__()
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._client_factory = client_factory
+        self._release = None
+    
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        return super().do(key, lambda: self._do_shared(key, fn))
+    
+    def _do_shared(self, key: str, fn: Callable[[], T]) -> T:
+        try:
+            client = _redis_call(self._client_factory)
+            return self._coordinate(client, key, fn)
+        except _LocalFallback:
+            return fn()
+    
+    def _coordinate(self, client: Any, key: str, fn: Callable[[], T]) -> T:
+        lock_key = f"{self.prefix}lock:{key}"
+        result_key = f"{self.prefix}result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+        
+        while True:
+            cached = _redis_call(client.get, result_key)
+            if cached is not None:
+                return json.loads(cached)
+            if _redis_call(client.set, lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+                break
+            if time.monotonic() > deadline:
+                logger.warning(f"Timed out waiting for {lock_key}, computing locally")
+                return fn()
+            time.sleep(self.poll_interval)
+        
+        try:
+            result = fn()
+            try:
+                client.set(result_key, json.dumps(result), px=int(self.result_ttl * 1000))
+            except Exception:
+                # Waiters take the lock once it is released and compute themselves
+                logger.warning(f"Could not publish {result_key}", exc_info=True)
+            return result
+        finally:
+            try:
+                if self._release is None:
+                    self._release = client.register_script(_RELEASE_SCRIPT)
+                self._release(keys=[lock_key], args=[token], client=client)
+            except Exception:
+                # The lock expires on its own
+                logger.warning(f"Could not release {lock_key}", exc_info=True)
+
+
+class _LocalFallback(Exception):
+    """Redis is unavailable; compute without cross-process coordination."""
+
+
+def _redis_call(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    try:
+        return method(*args, **kwargs)
+    except Exception as exc:
+        logger.warning(f"Shared single-flight unavailable: {exc}")
+        raise _LocalFallback() from exc
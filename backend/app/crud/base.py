@@ -1,11 +1,15 @@
 """
 Base CRUD class with common database operations.
 """
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import delete, inspect, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE, set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.db.base_class import Base
 
@@ -49,32 +53,118 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session, 
         *, 
         db_obj: ModelType, 
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        expected_updated_at: Optional[datetime] = None,
+        commit: bool = True
     ) -> ModelType:
-        """Update a record."""
-        obj_data = jsonable_encoder(db_obj)
+        """
+        Update a record with a single ``UPDATE ... WHERE id = :id RETURNING``.
+        
+        Only mapped columns whose value actually changes are written; unknown
+        keys are ignored. Relationships are never touched, and the returned
+        row is written back onto ``db_obj`` so no refresh is needed.
         
+        Args:
+            expected_updated_at: Optimistic-concurrency guard. When given, the
+                row is only updated if its ``updated_at`` still matches, and
+                ``StaleDataError`` is raised otherwise.
+            commit: Set False to run the UPDATE inside the caller's
+                transaction and leave committing to the caller.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
         
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        mapper = inspect(self.model)
+        state = inspect(db_obj)
+        columns = {attr.key: attr for attr in mapper.column_attrs}
+        primary_keys = {mapper.get_property_by_column(c).key for c in mapper.primary_key}
+        # Identity survives expiry, so reading it never triggers a reload
+        obj_id = state.identity[0]
         
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        values: Dict[str, Any] = {}
+        for key, value in update_data.items():
+            if key not in columns or key in primary_keys:
+                continue
+            loaded = state.attrs[key].loaded_value
+            if loaded is NO_VALUE or loaded != value:
+                values[key] = value
+        if not values:
+            if expected_updated_at is not None:
+                # Nothing to write, but callers may act on the version check
+                # (e.g. a primary-chart switch), so still enforce it and lock
+                # the row until their transaction ends
+                current = db.scalar(
+                    select(self.model.id)
+                    .where(
+                        self.model.id == obj_id,
+                        self.model.updated_at == expected_updated_at,
+                    )
+                    .with_for_update()
+                )
+                if current is None:
+                    db.rollback()
+                    raise StaleDataError(
+                        f"{self.model.__name__} {obj_id} was modified or deleted concurrently"
+                    )
+            return db_obj
+        
+        stmt = update(self.model).where(self.model.id == obj_id)
+        if expected_updated_at is not None:
+            stmt = stmt.where(self.model.updated_at == expected_updated_at)
+        stmt = (
+            stmt.values(**values)
+            .returning(*(getattr(self.model, key) for key in columns))
+            .execution_options(synchronize_session=False)
+        )
+        
+        row = db.execute(stmt).one_or_none()
+        if row is None:
+            db.rollback()
+            raise StaleDataError(
+                f"{self.model.__name__} {obj_id} was modified or deleted concurrently"
+            )
+        if commit:
+            db.commit()
+        
+        for key, value in zip(columns, row):
+            set_committed_value(db_obj, key, value)
         return db_obj
     
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        """Delete a record."""
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
+    def remove(self, db: Session, *, id: int) -> Optional[ModelType]:
+        """
+        Delete a record and return it as a detached snapshot.
+        
+        Dependent rows are removed by the database's ``ON DELETE CASCADE``
+        foreign keys rather than loaded and deleted one by one by the ORM.
+        The record itself comes from the identity map when already loaded.
+        """
+        obj = db.get(self.model, id)
+        if obj is None:
+            return None
+        db.execute(
+            delete(self.model)
+            .where(self.model.id == id)
+            .execution_options(synchronize_session=False)
+        )
+        # Detached before the commit so its loaded attributes aren't expired
+        db.expunge(obj)
         db.commit()
         return obj
     
+    def remove_many(self, db: Session, *, ids: Sequence[int]) -> int:
+        """Delete records by ID in one statement; returns the number deleted."""
+        if not ids:
+            return 0
+        result = db.execute(
+            delete(self.model)
+            .where(self.model.id.in_(list(ids)))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+    
     def get_by_field(
         self, db: Session, *, field: str, value: Any
     ) -> Optional[ModelType]:
@@ -1,25 +1,186 @@
 """
 CRUD operations for birth charts.
 """
-from typing import List, Optional, Dict, Any, Union
+from datetime import date, datetime
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, exists, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session, selectinload
 
 from app.crud.base import CRUDBase
+from app.models.astrology import (
+    AspectTable, DashaLevel, DashaPeriodTable, HouseTable, Planet,
+    PlanetPlacementFilter, PlanetPositionTable
+)
 from app.models.birth_chart import BirthChart as BirthChartModel
 from app.schemas.birth_chart import BirthChartCreate, BirthChartUpdate, ChartType
-from app.models.user import User as UserModel
+from app.services.astrology.dasha import antardasha_periods
+
+# A chart to persist together with the calculator output for it:
+# {"positions": ..., "houses": ..., "aspects": ..., "dasha_periods": ...}
+ChartWithCalculation = Tuple[BirthChartCreate, Dict[str, Any]]
+
+
+def _house_of(longitude: float, cusps: List[float]) -> int:
+    """Return the house (1-12) whose cusp span contains ``longitude``."""
+    for i, start in enumerate(cusps):
+        end = cusps[(i + 1) % 12]
+        span = (end - start) % 360
+        if (longitude - start) % 360 < span:
+            return i + 1
+    return 1
+
+
+def _as_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _planet_house(longitude: float, cusps: List[float]) -> int:
+    return _house_of(longitude, cusps) if len(cusps) == 12 else 1
+
+
+def build_chart_facts(calculation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the ``facts`` JSONB document for a chart from calculator output.
+    
+    The shape matches ``PlanetPlacementFilter.to_fact`` so placement filters
+    are plain ``@>`` containment checks served by the GIN index.
+    """
+    cusps = [h["longitude"] for h in calculation.get("houses", [])]
+    return {
+        "planets": {
+            _enum_value(planet): {
+                "sign": _enum_value(pos["sign"]),
+                "nakshatra": pos["nakshatra"]["name"],
+                "house": _planet_house(pos["longitude"], cusps),
+                "retrograde": bool(pos["is_retrograde"]),
+            }
+            for planet, pos in calculation.get("positions", {}).items()
+        }
+    }
+
+
+def _child_rows(chart_id: int, calculation: Dict[str, Any]) -> Dict[type, List[Dict[str, Any]]]:
+    """Map calculator output for one chart onto rows of the child tables."""
+    houses = calculation.get("houses", [])
+    cusps = [h["longitude"] for h in houses]
+    
+    planet_rows = [
+        {
+            "chart_id": chart_id,
+            "planet": planet,
+            "sign": pos["sign"],
+            "degree": pos["longitude"] % 30,
+            "nakshatra": pos["nakshatra"]["name"],
+            "nakshatra_pada": pos["nakshatra"]["pada"],
+            "house": _planet_house(pos["longitude"], cusps),
+            "is_retrograde": pos["is_retrograde"],
+        }
+        for planet, pos in calculation.get("positions", {}).items()
+    ]
+    house_rows = [
+        {
+            "chart_id": chart_id,
+            "house_number": h["house_number"],
+            "sign": h["sign"],
+            "start_degree": h["longitude"],
+            "end_degree": cusps[h["house_number"] % 12] if len(cusps) == 12 else h["longitude"],
+        }
+        for h in houses
+    ]
+    aspect_rows = [
+        {
+            "chart_id": chart_id,
+            "planet": a["from_planet"],
+            "aspecting_planet": a["to_planet"],
+            "aspect_degree": a["aspect_degree"],
+            "orb": a["applied_orb"],
+            "is_mutual": False,
+            "description": a.get("type"),
+        }
+        for a in calculation.get("aspects", [])
+    ]
+    mahadashas = calculation.get("dasha_periods", [])
+    dasha_rows = [
+        {
+            "chart_id": chart_id,
+            "planet": d["planet"],
+            "level": DashaLevel.MAHADASHA,
+            "mahadasha_planet": None,
+            "start_date": _as_date(d["start_date"]),
+            "end_date": _as_date(d["end_date"]),
+        }
+        for d in mahadashas
+    ] + [
+        {
+            "chart_id": chart_id,
+            "planet": d["planet"],
+            "level": DashaLevel.ANTARDASHA,
+            "mahadasha_planet": d["mahadasha_planet"],
+            "start_date": _as_date(d["start_date"]),
+            "end_date": _as_date(d["end_date"]),
+        }
+        for d in antardasha_periods(mahadashas)
+    ]
+    return {
+        PlanetPositionTable: planet_rows,
+        HouseTable: house_rows,
+        AspectTable: aspect_rows,
+        DashaPeriodTable: dasha_rows,
+    }
+
 
 class CRUDBirthChart(CRUDBase[BirthChartModel, BirthChartCreate, BirthChartUpdate]):
     """CRUD operations for birth charts with additional methods."""
     
+    def _with_chart_graph(self, query: Query) -> Query:
+        """
+        Batch-load the chart's child rows with one SELECT ... IN per relationship.
+        
+        Without this, serializing N charts issues 4 * N lazy loads.
+        """
+        return query.options(
+            selectinload(BirthChartModel.planet_positions),
+            selectinload(BirthChartModel.houses),
+            selectinload(BirthChartModel.aspects),
+            selectinload(BirthChartModel.dasha_periods),
+        )
+    
+    def get(self, db: Session, id: Any) -> Optional[BirthChartModel]:
+        """Get a single birth chart by ID with its child rows loaded."""
+        return (
+            self._with_chart_graph(db.query(self.model))
+            .filter(BirthChartModel.id == id)
+            .first()
+        )
+    
     def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        load_children: bool = True
     ) -> List[BirthChartModel]:
-        """Get all birth charts for a specific user."""
+        """
+        Get all birth charts for a specific user.
+        
+        Child rows are batch-loaded so the listing costs a constant number of
+        queries; pass ``load_children=False`` when only chart columns are needed.
+        """
+        query = db.query(self.model)
+        if load_children:
+            query = self._with_chart_graph(query)
         return (
-            db.query(self.model)
+            query
             .filter(BirthChartModel.owner_id == owner_id)
+            .order_by(BirthChartModel.id)
             .offset(skip)
             .limit(limit)
             .all()
@@ -62,56 +223,223 @@ class CRUDBirthChart(CRUDBase[BirthChartModel, BirthChartCreate, BirthChartUpdat
     def create_with_owner(
         self, db: Session, *, obj_in: BirthChartCreate, owner_id: int
     ) -> BirthChartModel:
-        """Create a new birth chart for a specific user."""
-        # If this is set as primary, unset any existing primary chart
-        if obj_in.is_primary:
-            self._unset_primary_chart(db, owner_id=owner_id)
-        
-        # Create the new chart
-        db_obj = BirthChartModel(**obj_in.dict(), owner_id=owner_id)
-        db.add(db_obj)
-        db.commit()
+        """
+        Create a new birth chart for a specific user.
+        
+        A primary chart is inserted unflagged and then promoted by
+        ``_switch_primary_chart`` in the same transaction, so the create
+        costs a single commit. ``facts`` is built from the stored positions
+        and houses so placement searches find the chart.
+        """
+        data = obj_in.dict()
+        facts = build_chart_facts({
+            "positions": data.get("planetary_positions") or {},
+            "houses": data.get("houses") or [],
+        })
+        db_obj = BirthChartModel(
+            **{**data, "is_primary": False, "facts": facts}, owner_id=owner_id
+        )
+        try:
+            db.add(db_obj)
+            db.flush()
+            if obj_in.is_primary:
+                self._switch_primary_chart(db, owner_id=owner_id, chart_id=db_obj.id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         db.refresh(db_obj)
         return db_obj
     
+    def create_many_with_children(
+        self,
+        db: Session,
+        *,
+        charts: Sequence[ChartWithCalculation],
+        owner_id: int
+    ) -> List[int]:
+        """
+        Persist charts and all their child rows in a single transaction.
+        
+        Charts are written with one multi-row ``INSERT ... RETURNING id``; each
+        child table then gets one batched executemany ``INSERT`` (SQLAlchemy
+        folds these into multi-row VALUES statements). No ORM objects are built
+        and nothing is refreshed.
+        
+        Returns:
+            The new chart IDs, in input order.
+        """
+        if not charts:
+            return []
+        
+        try:
+            chart_values = [
+                {
+                    **obj_in.dict(),
+                    "is_primary": False,
+                    "owner_id": owner_id,
+                    "facts": build_chart_facts(calculation),
+                }
+                for obj_in, calculation in charts
+            ]
+            
+            chart_ids = list(
+                db.scalars(
+                    insert(BirthChartModel).returning(
+                        BirthChartModel.id, sort_by_parameter_order=True
+                    ),
+                    chart_values,
+                )
+            )
+            
+            rows_by_table: Dict[type, List[Dict[str, Any]]] = {}
+            for chart_id, (_, calculation) in zip(chart_ids, charts):
+                for table, rows in _child_rows(chart_id, calculation).items():
+                    rows_by_table.setdefault(table, []).extend(rows)
+            
+            for table, rows in rows_by_table.items():
+                if rows:
+                    db.execute(insert(table), rows)
+            
+            # The last chart flagged primary wins.
+            primary_ids = [
+                chart_id
+                for chart_id, (obj_in, _) in zip(chart_ids, charts)
+                if obj_in.is_primary
+            ]
+            if primary_ids:
+                self._switch_primary_chart(
+                    db, owner_id=owner_id, chart_id=primary_ids[-1]
+                )
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return chart_ids
+    
+    def create_with_children(
+        self,
+        db: Session,
+        *,
+        obj_in: BirthChartCreate,
+        calculation: Dict[str, Any],
+        owner_id: int
+    ) -> int:
+        """Persist a single chart and its child rows; returns the chart ID."""
+        return self.create_many_with_children(
+            db, charts=[(obj_in, calculation)], owner_id=owner_id
+        )[0]
+    
     def update(
         self, 
         db: Session, 
         *, 
         db_obj: BirthChartModel, 
-        obj_in: Union[BirthChartUpdate, Dict[str, Any]]
+        obj_in: Union[BirthChartUpdate, Dict[str, Any]],
+        expected_updated_at: Optional[datetime] = None
     ) -> BirthChartModel:
-        """Update a birth chart, handling primary chart logic."""
+        """
+        Update a birth chart, handling primary chart logic.
+        
+        Pass ``expected_updated_at`` to fail with ``StaleDataError`` instead of
+        overwriting a concurrent change.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
         
-        # If this chart is being set as primary, unset any existing primary chart
-        if update_data.get('is_primary', False):
-            self._unset_primary_chart(db, owner_id=db_obj.owner_id, exclude_id=db_obj.id)
+        # Promote in the same transaction as the remaining field updates,
+        # after the optimistic check (the switch itself bumps updated_at)
+        promote = update_data.get('is_primary', False)
+        if promote:
+            update_data = {k: v for k, v in update_data.items() if k != 'is_primary'}
         
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        try:
+            db_obj = super().update(
+                db,
+                db_obj=db_obj,
+                obj_in=update_data,
+                expected_updated_at=expected_updated_at,
+                commit=False,
+            )
+            if promote:
+                self._switch_primary_chart(
+                    db, owner_id=db_obj.owner_id, chart_id=db_obj.id
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return db_obj
     
-    def _unset_primary_chart(
-        self, 
-        db: Session, 
-        *, 
-        owner_id: int, 
-        exclude_id: Optional[int] = None
-    ) -> None:
-        """Unset any existing primary chart for a user."""
-        query = db.query(self.model).filter(
-            BirthChartModel.owner_id == owner_id,
-            BirthChartModel.is_primary == True  # noqa: E712
-        )
+    def set_primary_chart(
+        self, db: Session, *, chart_id: int, user_id: int
+    ) -> Optional[BirthChartModel]:
+        """
+        Make ``chart_id`` the user's only primary chart.
+        
+        Returns None if the chart does not belong to the user. A concurrent
+        switch for the same user can trip the one-primary-per-owner
+        constraint; the statement is then retried once against the newly
+        committed state.
+        """
+        for attempt in range(2):
+            try:
+                switched = self._switch_primary_chart(
+                    db, owner_id=user_id, chart_id=chart_id
+                )
+                db.commit()
+                break
+            except IntegrityError:
+                db.rollback()
+                if attempt:
+                    raise
+        if not switched:
+            return None
+        return self.get(db, id=chart_id)
+    
+    def _switch_primary_chart(
+        self, db: Session, *, owner_id: int, chart_id: int
+    ) -> bool:
+        """
+        Flip the owner's primary flag to ``chart_id`` with one statement::
         
-        if exclude_id is not None:
-            query = query.filter(BirthChartModel.id != exclude_id)
+            UPDATE birth_charts SET is_primary = (id = :chart_id)
+            WHERE owner_id = :owner_id AND (is_primary OR id = :chart_id)
+              AND EXISTS (chart_id belongs to owner_id)
         
-        # Update all matching charts to not be primary
-        query.update({BirthChartModel.is_primary: False})
-        db.commit()
+        The one-primary-per-owner exclusion constraint is checked at the end
+        of the statement, so the old and new rows can swap atomically. Does
+        not commit. Returns whether the chart was found.
+        """
+        owned = (
+            exists()
+            .where(
+                BirthChartModel.id == chart_id,
+                BirthChartModel.owner_id == owner_id,
+            )
+        )
+        result = db.execute(
+            update(BirthChartModel)
+            .where(
+                BirthChartModel.owner_id == owner_id,
+                or_(BirthChartModel.is_primary, BirthChartModel.id == chart_id),
+                owned,
+            )
+            .values(is_primary=(BirthChartModel.id == chart_id))
+            .returning(BirthChartModel.id)
+            .execution_options(synchronize_session=False)
+        )
+        changed = set(result.scalars())
+        # Loaded copies of the updated rows now hold a stale flag; expire
+        # just those columns on just those charts
+        for changed_id in changed:
+            obj = db.identity_map.get(db.identity_key(self.model, changed_id))
+            if obj is not None:
+                db.expire(obj, ["is_primary", "updated_at"])
+        return chart_id in changed
     
     def get_by_name(
         self, db: Session, *, owner_id: int, name: str
@@ -135,19 +463,115 @@ class CRUDBirthChart(CRUDBase[BirthChartModel, BirthChartCreate, BirthChartUpdat
         skip: int = 0, 
         limit: int = 100
     ) -> List[BirthChartModel]:
-        """Search birth charts by name or notes."""
-        search = f"%{query}%"
+        """
+        Search birth charts by name or notes.
+        
+        The bare ``ILIKE`` on each column is what lets PostgreSQL use the
+        trigram indexes (a BitmapOr of the two), so don't wrap the columns in
+        ``lower()`` or ``coalesce()`` here.
+        """
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        search = f"%{escaped}%"
         return (
             db.query(self.model)
             .filter(
                 BirthChartModel.owner_id == owner_id,
-                (BirthChartModel.name.ilike(search)) | 
-                (BirthChartModel.notes.ilike(search) if BirthChartModel.notes is not None else False)
+                BirthChartModel.name.ilike(search, escape="\\")
+                | BirthChartModel.notes.ilike(search, escape="\\")
             )
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def filter_by_placements(
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        placements: Sequence[PlanetPlacementFilter],
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[BirthChartModel]:
+        """
+        Find a user's charts matching every placement condition.
+        
+        Each condition becomes a ``facts @> '{...}'`` predicate, so the query
+        is answered from the GIN index on ``facts``.
+        """
+        query = db.query(self.model).filter(BirthChartModel.owner_id == owner_id)
+        for placement in placements:
+            query = query.filter(BirthChartModel.facts.contains(placement.to_fact()))
+        return (
+            query
+            .order_by(BirthChartModel.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_multi_in_dasha(
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        on: date,
+        mahadasha: Sequence[Planet] = (),
+        antardasha: Sequence[Planet] = (),
+        match_all: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[BirthChartModel]:
+        """
+        Find a user's charts running a given mahadasha or antardasha on ``on``,
+        e.g. Saturn mahadasha or Rahu antardasha.
+        
+        Each level becomes an EXISTS over ``dasha_periods`` with
+        ``period @> :on``, served by the GiST index on (level, period) and
+        the B-tree on (planet, level). The conditions are OR-ed, or AND-ed with ``match_all``.
+        """
+        conditions = [
+            exists().where(
+                DashaPeriodTable.chart_id == BirthChartModel.id,
+                DashaPeriodTable.level == level,
+                DashaPeriodTable.planet.in_(list(planets)),
+                DashaPeriodTable.period.contains(on),
+            )
+            for level, planets in (
+                (DashaLevel.MAHADASHA, mahadasha),
+                (DashaLevel.ANTARDASHA, antardasha),
+            )
+            if planets
+        ]
+        if not conditions:
+            return []
+        return (
+            db.query(self.model)
+            .filter(BirthChartModel.owner_id == owner_id)
+            .filter(and_(*conditions) if match_all else or_(*conditions))
+            .order_by(BirthChartModel.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def remove_many_by_owner(
+        self, db: Session, *, owner_id: int, ids: Optional[Sequence[int]] = None
+    ) -> int:
+        """
+        Delete a user's charts (all of them, or only ``ids``) in one statement.
+        
+        Positions, houses, aspects and dasha periods go with them through
+        ``ON DELETE CASCADE``. Returns the number of charts deleted.
+        """
+        stmt = delete(BirthChartModel).where(BirthChartModel.owner_id == owner_id)
+        if ids is not None:
+            if not ids:
+                return 0
+            stmt = stmt.where(BirthChartModel.id.in_(list(ids)))
+        result = db.execute(stmt.execution_options(synchronize_session=False))
+        db.commit()
+        return result.rowcount
+
 # Create a singleton instance
 birth_chart = CRUDBirthChart(BirthChartModel)
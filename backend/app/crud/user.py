@@ -1,11 +1,19 @@
 """
 CRUD operations for users.
 """
+from datetime import datetime
 from typing import Any, Dict, Optional, Union, List
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    invalidate_user_cache,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
 from app.crud.base import CRUDBase
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate, UserUpdate, UserRole
@@ -23,10 +31,20 @@ class CRUDUser(CRUDBase[UserModel, UserCreate, UserUpdate]):
     
     def create(self, db: Session, *, obj_in: UserCreate) -> UserModel:
         """Create a new user with hashed password."""
+        return self._insert(db, obj_in=obj_in, hashed_password=get_password_hash(obj_in.password))
+    
+    async def create_async(self, db: Session, *, obj_in: UserCreate) -> UserModel:
+        """Like ``create``, but awaits the hash instead of blocking a thread on it."""
+        hashed_password = await get_password_hash_async(obj_in.password)
+        return await run_in_threadpool(
+            self._insert, db, obj_in=obj_in, hashed_password=hashed_password
+        )
+    
+    def _insert(self, db: Session, *, obj_in: UserCreate, hashed_password: str) -> UserModel:
         db_obj = UserModel(
             email=obj_in.email,
             username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password,
             full_name=obj_in.full_name,
             role=obj_in.role if hasattr(obj_in, 'role') else UserRole.USER,
             is_active=True,
@@ -37,9 +55,19 @@ class CRUDUser(CRUDBase[UserModel, UserCreate, UserUpdate]):
         return db_obj
     
     def update(
-        self, db: Session, *, db_obj: UserModel, obj_in: Union[UserUpdate, Dict[str, Any]]
+        self,
+        db: Session,
+        *,
+        db_obj: UserModel,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+        expected_updated_at: Optional[datetime] = None
     ) -> UserModel:
-        """Update a user, handling password hashing if password is being updated."""
+        """
+        Update a user, handling password hashing if password is being updated.
+        
+        Pass ``expected_updated_at`` to fail with ``StaleDataError`` instead of
+        overwriting a concurrent change.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -51,7 +79,18 @@ class CRUDUser(CRUDBase[UserModel, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        updated = super().update(
+            db, db_obj=db_obj, obj_in=update_data, expected_updated_at=expected_updated_at
+        )
+        # /users/me serves the cached user, so any change must evict it
+        invalidate_user_cache(updated.id)
+        return updated
+    
+    def remove(self, db: Session, *, id: int) -> Optional[UserModel]:
+        """Delete a user and drop them from the authenticated-user cache."""
+        removed = super().remove(db, id=id)
+        invalidate_user_cache(id)
+        return removed
     
     def authenticate(
         self, db: Session, *, email: str, password: str
@@ -60,8 +99,33 @@ class CRUDUser(CRUDBase[UserModel, UserCreate, UserUpdate]):
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
+            return None
+        # Stored with an older bcrypt cost: upgrade while we have the password
+        if new_hash is not None:
+            user = self.update(db, db_obj=user, obj_in={"hashed_password": new_hash})
+        return user
+    
+    async def authenticate_async(
+        self, db: Session, *, email: str, password: str
+    ) -> Optional[UserModel]:
+        """
+        Like ``authenticate``, for async endpoints: queries run on the
+        threadpool and bcrypt is awaited, so no thread waits on the hash.
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await verify_and_update_password_async(
+            password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash is not None:
+            user = await run_in_threadpool(
+                self.update, db, db_obj=user, obj_in={"hashed_password": new_hash}
+            )
         return user
     
     def is_active(self, user: UserModel) -> bool:
@@ -5,9 +5,10 @@ This script is used to initialize the database with the required tables and init
 """
 import logging
 import sys
+from pathlib import Path
 from typing import List
 
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 
 from app.core.config import settings
 from app.db.base import Base
@@ -16,8 +17,16 @@ from app.db.session import engine, SessionLocal
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
 def init_db() -> None:
-    """Initialize the database by creating all tables."""
+    """
+    Initialize the database by creating all tables.
+    
+    A fresh database gets the current schema from the models and is stamped
+    at the latest migration, so ``alembic upgrade head`` has nothing left to
+    do. The tables of an existing database are left to the migrations.
+    """
     logger.info("Creating database tables...")
     try:
         # Import all models here to ensure they are registered with SQLAlchemy
@@ -27,9 +36,19 @@ def init_db() -> None:
             HouseTable, AspectTable, DashaPeriodTable
         )
         
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully.")
+        if inspect(engine).has_table("birth_charts"):
+            logger.info("Tables already exist; run `alembic upgrade head` to migrate them.")
+        else:
+            # Operator classes used by the chart search (trigram) and dasha
+            # period (btree_gist) indexes
+            with engine.begin() as connection:
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            
+            # Create all tables
+            Base.metadata.create_all(bind=engine)
+            stamp_migrations()
+            logger.info("Database tables created successfully.")
         
         # Create initial admin user if it doesn't exist
         create_initial_admin()
@@ -38,6 +57,16 @@ def init_db() -> None:
         logger.error(f"Error creating database tables: {e}")
         sys.exit(1)
 
+def stamp_migrations() -> None:
+    """Record the latest migration as applied without running any."""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.stamp(config, "head")
+    logger.info("Database stamped at the latest migration.")
+
 def create_initial_admin() -> None:
     """Create an initial admin user if no users exist."""
     from app.models.user import UserTable, UserRole
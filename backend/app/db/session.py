@@ -1,52 +1,227 @@
 """
 Database session management.
+
+Writes always go to the primary (``DATABASE_URI``). Read-only endpoints use
+``get_read_db``, which routes to a replica from ``DATABASE_REPLICA_URIS``
+unless the requesting user wrote within ``READ_YOUR_WRITES_SECONDS``.
 """
-from typing import Generator
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Any, Dict, Generator, Iterator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 
 from ..core.config import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    connect_args={"connect_timeout": 10}
-)
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _create_engine(uri: str) -> Engine:
+    connect_args = {"connect_timeout": 10}
+    if settings.DB_POOL_MODE == "null":
+        # An external pooler owns the connections; don't hold any here
+        return create_engine(uri, poolclass=NullPool, connect_args=connect_args)
+    if settings.DB_POOL_MODE == "serverless":
+        # One request at a time per instance: keep a single connection and
+        # reuse it across warm invocations, re-checking it after idle gaps
+        return create_engine(
+            uri,
+            pool_pre_ping=True,
+            pool_size=1,
+            max_overflow=0,
+            pool_recycle=300,
+            connect_args=connect_args
+        )
+    return create_engine(
+        uri,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=3600,
+        connect_args=connect_args
+    )
+
+
+# Engines are created on first database use, not at import, so importing
+# the app (e.g. on a serverless cold start) doesn't load the DB driver or
+# build pools for requests that never touch the database.
+_engine: Optional[Engine] = None
+_replica_engines: Optional[List[Engine]] = None
+_replica_cycle: Optional[Iterator[Engine]] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """The primary engine, created on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.DATABASE_URI)
+    return _engine
+
+
+def get_replica_engines() -> List[Engine]:
+    """Replica engines, created on first use (empty if none configured)."""
+    global _replica_engines, _replica_cycle
+    if _replica_engines is None:
+        with _engine_lock:
+            if _replica_engines is None:
+                engines = [_create_engine(uri) for uri in settings.DATABASE_REPLICA_URIS]
+                _replica_cycle = itertools.cycle(engines)
+                _replica_engines = engines
+    return _replica_engines
+
+
+def _next_replica() -> Engine:
+    get_replica_engines()
+    with _engine_lock:
+        return next(_replica_cycle)
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps ``from app.db.session import engine`` working without
+    # creating the engine at import time
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engines":
+        return get_replica_engines()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Base class for models
 Base = declarative_base()
 
-def get_db() -> Generator[Session, None, None]:
-    ""
-    Dependency function that yields database sessions.
-    
+
+class RecentWriters:
+    """
+    Users who committed a write recently, so their reads can stay on the
+    primary until replicas have caught up.
+
+    Tracking is per process, so with several workers a read served by a
+    different worker than the write can still go to a replica.
+    """
+
+    def __init__(self, window_seconds: float, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._deadlines: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._deadlines) >= self.max_entries:
+                self._deadlines = {
+                    k: v for k, v in self._deadlines.items() if v > now
+                }
+            self._deadlines[user_id] = now + self.window_seconds
+
+    def is_recent(self, user_id: str) -> bool:
+        deadline = self._deadlines.get(user_id)
+        return deadline is not None and deadline > time.monotonic()
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _request_user_id(request: Optional[Request]) -> Optional[str]:
+    """User ID stored on the request by ``get_current_user``, if any."""
+    if request is None:
+        return None
+    user_id = getattr(request.state, "user_id", None)
+    return str(user_id) if user_id is not None else None
+
+
+class RoutingSession(Session):
+    """
+    Session that binds read-only sessions to a replica.
+
+    The engine is chosen on first use rather than when the session is
+    created, because FastAPI may build the session before the dependency
+    that identifies the user has run.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return self.bind
+        if not self.info.get("read_only") or not get_replica_engines():
+            return get_engine()
+        if "replica" not in self.info:
+            user_id = _request_user_id(self.info.get("request"))
+            if user_id is not None and recent_writers.is_recent(user_id):
+                self.info["replica"] = None
+            else:
+                self.info["replica"] = _next_replica()
+        return self.info["replica"] or get_engine()
+
+
+# Session factory
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_request_user_write(session: Session) -> None:
+    if session.info.get("read_only"):
+        return
+    user_id = _request_user_id(session.info.get("request"))
+    if user_id is not None:
+        recent_writers.mark(user_id)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _reject_replica_writes(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write through a read-only session")
+
+
+def get_db(request: Request = None) -> Generator[Session, None, None]:
+    """
+    Dependency function that yields database sessions on the primary.
+
     Yields:
         Session: A database session
     """
     db = SessionLocal()
+    db.info["request"] = request
     try:
         yield db
     finally:
         db.close()
 
+
+def get_read_db(request: Request = None) -> Generator[Session, None, None]:
+    """
+    Dependency for read-only handlers: a session that reads from a replica
+    when one is configured and the user has not written recently, and from
+    the primary otherwise.
+
+    Yields:
+        Session: A database session
+    """
+    db = SessionLocal()
+    db.info["request"] = request
+    db.info["read_only"] = True
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db() -> None:
     """Initialize database tables."""
     # Import all models here to ensure they are registered with SQLAlchemy
     from ..models.user import UserTable
     from ..models.astrology import (
-        BirthChart, PlanetPosition, House, Aspect, DashaPeriod, 
+        BirthChart, PlanetPosition, House, Aspect, DashaPeriod,
         Transit, Yogas, HoraryChart, PrashnaKundli, Muhurta
     )
-    
-    Base.metadata.create_all(bind=engine)
+
+    Base.metadata.create_all(bind=get_engine())
 
 def get_db_session() -> Session:
     """Get a database session."""
@@ -1,17 +1,18 @@
 """
 Main FastAPI application module for the Vedic Astrology API.
 """
+import asyncio
 import os
 import logging
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from typing import List, Optional
 
 from .core.config import settings
+from .core.middleware import SecurityHeadersMiddleware
 from .api.api_v1.api import api_router
-from .core.security import get_current_active_user
+from .core.security import PasswordHashingBusy, get_current_active_user
 from .models.user import User
 
 # Configure logging
@@ -31,6 +32,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Rate limiting. Added before CORS so CORSMiddleware wraps it and 429
+# responses still carry CORS headers the browser can read.
+if settings.ENABLE_RATE_LIMITING:
+    from .core.rate_limit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware)
+
 # Set up CORS
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -41,23 +48,9 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-# Add middleware to handle root path for Netlify
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    
-    # Add security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    
-    # Add CORS headers
-    response.headers["Access-Control-Allow-Origin"] = "*"
-    response.headers["Access-Control-Allow-Methods"] = "*"
-    response.headers["Access-Control-Allow-Headers"] = "*"
-    
-    return response
+# Security headers (pure ASGI, so streaming responses pass through unbuffered).
+# CORS headers come from CORSMiddleware above.
+app.add_middleware(SecurityHeadersMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -77,8 +70,20 @@ exception_handlers = {
 for status_code, handler in exception_handlers.items():
     app.add_exception_handler(status_code, handler)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy(request: Request, exc: PasswordHashingBusy):
+    """Shed login/registration load instead of queueing behind bcrypt."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many concurrent sign-ins, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# Mount static files when the deployment ships them (serverless bundles don't)
+STATIC_DIR = os.environ.get("STATIC_DIR", "static")
+if os.path.isdir(STATIC_DIR):
+    from fastapi.staticfiles import StaticFiles
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # Health check endpoint
 @app.get("/health")
@@ -98,6 +103,16 @@ async def startup_event():
     """Initialize application services on startup."""
     logger.info("Starting Vedic Astrology API...")
     # Initialize database, cache, etc.
+    if settings.CURRENT_SKY_BACKGROUND_REFRESH:
+        from .services.astrology.current_sky import current_sky
+        app.state.current_sky_task = asyncio.create_task(current_sky.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background services."""
+    task = getattr(app.state, "current_sky_task", None)
+    if task is not None:
+        task.cancel()
 
 if __name__ == "__main__":
     import uvicorn
@@ -7,9 +7,11 @@ from typing import List, Optional, Dict, Any
 
 from pydantic import BaseModel, Field, validator
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Date, Time, 
-    ForeignKey, JSON, Boolean, Enum as SQLEnum, Text
+    Column, Integer, BigInteger, String, Float, DateTime, Date, Time, 
+    ForeignKey, JSON, Boolean, Enum as SQLEnum, Text, Index, Computed,
+    SmallInteger, text
 )
+from sqlalchemy.dialects.postgresql import DATERANGE, JSONB, ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -64,6 +66,10 @@ class DashaSystem(str, Enum):
     YOGINI = "yogini"
     CHARA = "chara"
 
+class DashaLevel(int, Enum):
+    MAHADASHA = 1
+    ANTARDASHA = 2
+
 class ChartType(str, Enum):
     BIRTH = "birth"
     MOON = "moon"
@@ -101,6 +107,30 @@ class BirthChartUpdate(BaseModel):
     is_primary: Optional[bool] = None
     is_public: Optional[bool] = None
 
+class PlanetPlacementFilter(BaseModel):
+    """
+    A placement condition on one planet, e.g. Moon in Rohini or
+    Saturn retrograde in the 7th house. Unset fields are not constrained.
+    """
+    planet: Planet
+    sign: Optional[ZodiacSign] = None
+    nakshatra: Optional[str] = None
+    house: Optional[HouseNumber] = None
+    is_retrograde: Optional[bool] = None
+    
+    def to_fact(self) -> Dict[str, Any]:
+        """The JSONB fragment a matching chart's ``facts`` must contain."""
+        fact: Dict[str, Any] = {}
+        if self.sign is not None:
+            fact["sign"] = self.sign.value
+        if self.nakshatra is not None:
+            fact["nakshatra"] = self.nakshatra
+        if self.house is not None:
+            fact["house"] = int(self.house)
+        if self.is_retrograde is not None:
+            fact["retrograde"] = self.is_retrograde
+        return {"planets": {self.planet.value: fact}}
+
 class BirthChartInDB(BirthChartBase):
     """Schema for birth chart in database."""
     id: int
@@ -116,7 +146,7 @@ class BirthChartTable(Base):
     __tablename__ = "birth_charts"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     birth_date = Column(Date, nullable=False)
     birth_time = Column(Time, nullable=False)
@@ -129,15 +159,56 @@ class BirthChartTable(Base):
     notes = Column(Text, nullable=True)
     is_primary = Column(Boolean, default=False)
     is_public = Column(Boolean, default=False)
+    # Denormalized placements for content queries:
+    # {"planets": {"moon": {"sign": "taurus", "nakshatra": "Rohini",
+    #                       "house": 2, "retrograde": false}, ...}}
+    facts = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
+    __table_args__ = (
+        Index(
+            "ix_birth_charts_facts",
+            "facts",
+            postgresql_using="gin",
+            postgresql_ops={"facts": "jsonb_path_ops"},
+        ),
+        # Owner listings ordered by id, and chart-type filters per owner
+        Index("ix_birth_charts_user_id_id", "user_id", "id"),
+        Index("ix_birth_charts_user_id_chart_type", "user_id", "chart_type"),
+        # At most one primary chart per owner; also serves primary-chart lookups.
+        # An exclusion constraint rather than a unique index so it can be
+        # checked per statement, letting one UPDATE swap the primary chart.
+        ExcludeConstraint(
+            ("user_id", "="),
+            name="uq_birth_charts_user_id_primary",
+            using="btree",
+            where=text("is_primary"),
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
+        # Trigram indexes for ILIKE '%q%' search on name and notes
+        Index(
+            "ix_birth_charts_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_birth_charts_notes_trgm",
+            "notes",
+            postgresql_using="gin",
+            postgresql_ops={"notes": "gin_trgm_ops"},
+        ),
+    )
+    
+    # Relationships. Child rows are removed by ON DELETE CASCADE in the
+    # database (passive_deletes), so deleting a chart never loads them.
     user = relationship("UserTable", back_populates="birth_charts")
-    planet_positions = relationship("PlanetPositionTable", back_populates="chart", cascade="all, delete-orphan")
-    houses = relationship("HouseTable", back_populates="chart", cascade="all, delete-orphan")
-    aspects = relationship("AspectTable", back_populates="chart", cascade="all, delete-orphan")
-    dasha_periods = relationship("DashaPeriodTable", back_populates="chart", cascade="all, delete-orphan")
+    planet_positions = relationship("PlanetPositionTable", back_populates="chart", cascade="all, delete-orphan", passive_deletes=True)
+    houses = relationship("HouseTable", back_populates="chart", cascade="all, delete-orphan", passive_deletes=True)
+    aspects = relationship("AspectTable", back_populates="chart", cascade="all, delete-orphan", passive_deletes=True)
+    dasha_periods = relationship("DashaPeriodTable", back_populates="chart", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<BirthChart {self.name} ({self.chart_type})>"
@@ -147,7 +218,7 @@ class PlanetPositionTable(Base):
     __tablename__ = "planet_positions"
     
     id = Column(Integer, primary_key=True, index=True)
-    chart_id = Column(Integer, ForeignKey("birth_charts.id"), nullable=False)
+    chart_id = Column(Integer, ForeignKey("birth_charts.id", ondelete="CASCADE"), nullable=False, index=True)
     planet = Column(SQLEnum(Planet), nullable=False)
     sign = Column(SQLEnum(ZodiacSign), nullable=False)
     degree = Column(Float, nullable=False)
@@ -167,7 +238,7 @@ class HouseTable(Base):
     __tablename__ = "houses"
     
     id = Column(Integer, primary_key=True, index=True)
-    chart_id = Column(Integer, ForeignKey("birth_charts.id"), nullable=False)
+    chart_id = Column(Integer, ForeignKey("birth_charts.id", ondelete="CASCADE"), nullable=False, index=True)
     house_number = Column(Integer, nullable=False)
     sign = Column(SQLEnum(ZodiacSign), nullable=False)
     start_degree = Column(Float, nullable=False)
@@ -184,7 +255,7 @@ class AspectTable(Base):
     __tablename__ = "aspects"
     
     id = Column(Integer, primary_key=True, index=True)
-    chart_id = Column(Integer, ForeignKey("birth_charts.id"), nullable=False)
+    chart_id = Column(Integer, ForeignKey("birth_charts.id", ondelete="CASCADE"), nullable=False, index=True)
     planet = Column(SQLEnum(Planet), nullable=False)
     aspecting_planet = Column(SQLEnum(Planet), nullable=False)
     aspect_degree = Column(Float, nullable=False)
@@ -203,11 +274,30 @@ class DashaPeriodTable(Base):
     __tablename__ = "dasha_periods"
     
     id = Column(Integer, primary_key=True, index=True)
-    chart_id = Column(Integer, ForeignKey("birth_charts.id"), nullable=False)
+    chart_id = Column(Integer, ForeignKey("birth_charts.id", ondelete="CASCADE"), nullable=False, index=True)
     dasha_system = Column(SQLEnum(DashaSystem), default=DashaSystem.VIMSHOTTARI)
     planet = Column(SQLEnum(Planet), nullable=False)
+    # 1 = mahadasha, 2 = antardasha within ``mahadasha_planet``'s mahadasha
+    level = Column(Integer, nullable=False, default=DashaLevel.MAHADASHA, server_default="1")
+    mahadasha_planet = Column(SQLEnum(Planet), nullable=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
+    # [start_date, end_date), generated by the database for range queries
+    period = Column(DATERANGE, Computed("daterange(start_date, end_date, '[)')", persisted=True))
+    
+    __table_args__ = (
+        # "Who is in <planet>'s mahadasha/antardasha on date D" is
+        # level = ... AND planet = ... AND period @> D. The integer level can
+        # share the GiST index (btree_gist); the planet enum can't before
+        # PostgreSQL 16, so it gets a B-tree the planner can AND with it.
+        Index(
+            "ix_dasha_periods_level_period",
+            "level",
+            "period",
+            postgresql_using="gist",
+        ),
+        Index("ix_dasha_periods_planet_level", "planet", "level"),
+    )
     
     # Relationships
     chart = relationship("BirthChartTable", back_populates="dasha_periods")
@@ -215,5 +305,61 @@ class DashaPeriodTable(Base):
     def __repr__(self):
         return f"<DashaPeriod {self.planet} ({self.start_date} to {self.end_date})>"
 
+class TransitAlertTable(Base):
+    """
+    A dated alert for a natal chart, written by the nightly transit job:
+    a transit perfecting an aspect to a natal planet, a transit planet
+    changing sign, or a new dasha period starting.
+    """
+    __tablename__ = "transit_alerts"
+    
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    chart_id = Column(Integer, ForeignKey("birth_charts.id", ondelete="CASCADE"), nullable=False, index=True)
+    alert_date = Column(Date, nullable=False)
+    kind = Column(String(16), nullable=False)  # "aspect", "ingress" or "dasha"
+    transit_planet = Column(SQLEnum(Planet), nullable=True)
+    natal_planet = Column(SQLEnum(Planet), nullable=True)
+    aspect = Column(String(16), nullable=True)
+    sign = Column(SQLEnum(ZodiacSign), nullable=True)
+    # House counted from the natal Moon (gochara) for ingresses
+    house = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # A user's alerts by day; also lets the job clear a day before rerunning
+        Index("ix_transit_alerts_user_id_alert_date", "user_id", "alert_date"),
+        Index("ix_transit_alerts_alert_date", "alert_date"),
+    )
+    
+    def __repr__(self):
+        return f"<TransitAlert {self.kind} {self.alert_date} chart={self.chart_id}>"
+
+class EphemerisTable(Base):
+    """
+    Precomputed sidereal positions of every planet at a fixed UTC step
+    (daily or hourly) for 1900-2100, filled by ``load-ephemeris.py``.
+    Range-partitioned by year on ``moment``; one partition per year.
+    """
+    __tablename__ = "ephemeris"
+    
+    planet = Column(SQLEnum(Planet), primary_key=True)
+    moment = Column(DateTime, primary_key=True)  # UTC
+    jd = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    speed = Column(Float, nullable=False)  # deg/day, negative when retrograde
+    sign = Column(SQLEnum(ZodiacSign), nullable=False)
+    nakshatra = Column(SmallInteger, nullable=False)  # 1 (Ashwini) to 27 (Revati)
+    
+    __table_args__ = (
+        # The primary key serves per-planet range scans; this one serves
+        # "every planet at a moment"
+        Index("ix_ephemeris_moment", "moment"),
+        {"postgresql_partition_by": "RANGE (moment)"},
+    )
+    
+    def __repr__(self):
+        return f"<Ephemeris {self.planet} {self.moment} {self.longitude:.4f}°>"
+
 # Update User model with relationships
-UserTable.birth_charts = relationship("BirthChartTable", back_populates="user", cascade="all, delete-orphan")
+UserTable.birth_charts = relationship("BirthChartTable", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
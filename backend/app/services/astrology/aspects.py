@@ -0,0 +1,33 @@
+"""
+Angular aspects between two sets of longitudes (transit-to-natal).
+"""
+from typing import Optional, Tuple
+
+# (type, angle) for the aspects calculate_aspects reports between planets
+TRANSIT_ASPECTS: Tuple[Tuple[str, float], ...] = (
+    ("conjunction", 0.0),
+    ("sextile", 60.0),
+    ("square", 90.0),
+    ("trine", 120.0),
+    ("opposition", 180.0),
+)
+
+
+def angular_distance(a: float, b: float) -> float:
+    """Separation of two longitudes in degrees, 0-180."""
+    distance = abs(a - b) % 360
+    return 360 - distance if distance > 180 else distance
+
+
+def aspect_between(a: float, b: float, orb: float) -> Optional[Tuple[str, float]]:
+    """
+    The aspect two longitudes form within ``orb`` degrees, as
+    ``(type, applied_orb)``, or None. Orbs are below 30 degrees, so at most
+    one aspect can match.
+    """
+    distance = angular_distance(a, b)
+    for aspect_type, angle in TRANSIT_ASPECTS:
+        applied_orb = abs(distance - angle)
+        if applied_orb <= orb:
+            return aspect_type, applied_orb
+    return None
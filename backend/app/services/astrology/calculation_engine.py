@@ -15,9 +15,13 @@ from app.core.config import settings
 from app.schemas.astrology import (
     Planet, ZodiacSign, House, Aspect, DashaPeriod, ChartType
 )
+from app.services.astrology.dasha import VIMSHOTTARI_SEQUENCE
+from app.services.astrology.strength import encode_charts, strength_report
+from app.services.astrology.yogas import find_yogas
 
-# Initialize Swiss Ephemeris
+# Initialize Swiss Ephemeris; get_ayanamsa_ut() then returns Lahiri
 swe.set_ephe_path(settings.SWISS_EPHEM_PATH)
+swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 class VedicCalculator:
     """Core class for Vedic astrology calculations."""
@@ -68,7 +72,14 @@ class VedicCalculator:
     
     def __init__(self):
         """Initialize the calculator with default settings."""
-        self.tf = TimezoneFinder()
+        self._tf = None
+    
+    @property
+    def tf(self) -> TimezoneFinder:
+        """Timezone lookup, loaded on first use (its data files are large)."""
+        if self._tf is None:
+            self._tf = TimezoneFinder()
+        return self._tf
         
     def calculate_planetary_positions(
         self,
@@ -96,7 +107,7 @@ class VedicCalculator:
         jd = self._get_julian_day(birth_dt, latitude, longitude)
         
         # Set ayanamsa
-        self.AYANAMSA = ayanamsa or swe.get_ayanamsa_ut(jd, swe.SIDM_LAHIRI)
+        self.AYANAMSA = ayanamsa or swe.get_ayanamsa_ut(jd)
         
         positions = {}
         
@@ -124,6 +135,16 @@ class VedicCalculator:
         jd: float
     ) -> Dict:
         """Calculate position for a single planet."""
+        long, lat, speed = self.sidereal_position(planet, jd, self.AYANAMSA)
+        return self.describe_position(long, lat, speed)
+    
+    def sidereal_position(
+        self,
+        planet: Planet,
+        jd: float,
+        ayanamsa: float
+    ) -> Tuple[float, float, float]:
+        """Sidereal longitude, latitude and signed speed (deg/day) of a planet."""
         planet_id = self.PLANET_MAPPING[planet]
         
         # Get planet position (geocentric)
@@ -138,10 +159,14 @@ class VedicCalculator:
         else:
             # For regular planets
             xx, _ = swe.calc_ut(jd, planet_id, flags)
-            long = (xx[0] - self.AYANAMSA) % 360  # Convert to sidereal
+            long = (xx[0] - ayanamsa) % 360  # Convert to sidereal
             lat = xx[1]
             speed = xx[3]
         
+        return long, lat, speed
+    
+    def describe_position(self, long: float, lat: float, speed: float) -> Dict:
+        """Build the position entry (sign, nakshatra, retrograde flag)."""
         # Determine if retrograde
         is_retrograde = speed < 0
         
@@ -294,6 +319,51 @@ class VedicCalculator:
         
         return aspects
     
+    def calculate_strength(
+        self,
+        positions: Dict[Planet, Dict],
+        houses: List[Dict],
+        ayanamsa: Optional[float] = None
+    ) -> Dict:
+        """
+        Calculate Ashtakavarga and Shadbala for one chart.
+        
+        Batches of charts should use ``strength.encode_charts`` with
+        ``strength.ashtakavarga`` and ``strength.shadbala`` directly.
+        
+        Args:
+            positions: Planet positions from calculate_planetary_positions
+            houses: House cusps from calculate_houses
+            ayanamsa: Ayanamsa of the chart (default: the last one calculated)
+            
+        Returns:
+            Bindus per planet and sign, Sarvashtakavarga and Shadbala components
+        """
+        chart = {
+            'positions': positions,
+            'houses': houses,
+            'ayanamsa': self.AYANAMSA if ayanamsa is None else ayanamsa,
+        }
+        return strength_report(encode_charts([chart]))[0]
+    
+    def calculate_yogas(
+        self,
+        positions: Dict[Planet, Dict],
+        houses: List[Dict]
+    ) -> List[Dict]:
+        """
+        Detect yogas with the compiled rule set; see ``yogas.find_yogas``
+        for batches of charts.
+        
+        Args:
+            positions: Planet positions from calculate_planetary_positions
+            houses: House cusps from calculate_houses
+            
+        Returns:
+            Yogas present in the chart, with name and description
+        """
+        return find_yogas([{'positions': positions, 'houses': houses}])[0]
+    
     def calculate_dasha_periods(
         self,
         birth_date: date,
@@ -322,18 +392,7 @@ class VedicCalculator:
         moon_pos = self._calculate_planet_position(Planet.MOON, jd)
         nakshatra = self._get_nakshatra(moon_pos['longitude'])
         
-        # Vimshottari Dasha sequence and years
-        dasha_sequence = [
-            (Planet.KETU, 7),
-            (Planet.VENUS, 20),
-            (Planet.SUN, 6),
-            (Planet.MOON, 10),
-            (Planet.MARS, 7),
-            (Planet.RAHU, 18),
-            (Planet.JUPITER, 16),
-            (Planet.SATURN, 19),
-            (Planet.MERCURY, 17)
-        ]
+        dasha_sequence = VIMSHOTTARI_SEQUENCE
         
         # Find current dasha based on Moon's nakshatra
         nakshatra_num = (nakshatra['number'] - 1) % 9
@@ -0,0 +1,219 @@
+"""
+Shared "current sky" snapshot.
+
+Transit widgets, horary and prashna requests all want planetary positions
+for "now", and every one of them used to run the full ephemeris. This module
+keeps one snapshot per process (longitudes, latitudes, speeds and
+accelerations for every planet, plus the ayanamsa and its rate), refreshed
+in the background about every 30 seconds. Requests project the snapshot to
+their exact instant with a second-order Taylor expansion:
+
+    lon(t) = lon0 + v * dt + a * dt**2 / 2
+
+The truncation error is bounded by |jerk| * dt**3 / 6. For the Moon, the
+fastest body, that stays below 1e-6 degree for snapshot ages up to several
+minutes; requests further than ``max_age`` from the snapshot are computed
+directly instead. Location-dependent values (houses) are computed per
+request on top of the projected ayanamsa.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import swisseph as swe
+
+from app.core.config import settings
+from app.models.astrology import Planet
+from app.services.astrology.calculation_engine import VedicCalculator
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+# Step for the central differences giving accelerations and latitude speeds
+_DIFF_STEP_DAYS = 1 / 24
+
+
+class SkySnapshot(NamedTuple):
+    """Positions at ``jd`` with the derivatives needed to project them."""
+    jd: float
+    ayanamsa: float
+    ayanamsa_rate: float
+    longitudes: Dict[Planet, float]
+    latitudes: Dict[Planet, float]
+    speeds: Dict[Planet, float]          # deg/day, negative when retrograde
+    accelerations: Dict[Planet, float]   # deg/day^2
+    latitude_speeds: Dict[Planet, float]  # deg/day
+
+
+def julian_day(moment: datetime) -> float:
+    """Julian day (UT) of an aware datetime; naive datetimes are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return swe.julday(
+        moment.year,
+        moment.month,
+        moment.day,
+        moment.hour + moment.minute / 60.0
+        + (moment.second + moment.microsecond / 1e6) / 3600.0,
+    )
+
+
+class CurrentSky:
+    """
+    Process-wide, periodically refreshed snapshot of the sky.
+
+    ``positions``, ``ayanamsa`` and ``houses`` accept an optional instant
+    (default: now). A stale or missing snapshot is refreshed on demand, so
+    the service also works where no background task runs (serverless).
+    """
+    
+    def __init__(
+        self,
+        refresh_seconds: float = settings.CURRENT_SKY_REFRESH_SECONDS,
+        max_age_seconds: float = settings.CURRENT_SKY_MAX_AGE_SECONDS,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.max_age_days = max_age_seconds / SECONDS_PER_DAY
+        self._calculator: Optional[VedicCalculator] = None
+        self._snapshot: Optional[SkySnapshot] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def calculator(self) -> VedicCalculator:
+        # A private instance: the shared one keeps per-chart AYANAMSA state
+        if self._calculator is None:
+            self._calculator = VedicCalculator()
+        return self._calculator
+    
+    def compute_snapshot(self, jd: float) -> SkySnapshot:
+        """Run the ephemeris at ``jd`` (and one step either side)."""
+        h = _DIFF_STEP_DAYS
+        ayanamsas = [swe.get_ayanamsa_ut(jd + k * h) for k in (-1, 0, 1)]
+        ayanamsa_rate = (ayanamsas[2] - ayanamsas[0]) / (2 * h)
+        
+        longitudes, latitudes, speeds = {}, {}, {}
+        accelerations, latitude_speeds = {}, {}
+        for planet in self.calculator.PLANET_MAPPING:
+            if planet == Planet.KETU:
+                continue
+            before, now, after = (
+                self.calculator.sidereal_position(planet, jd + k * h, ayanamsas[k + 1])
+                for k in (-1, 0, 1)
+            )
+            longitudes[planet], latitudes[planet], speeds[planet] = now
+            if planet != Planet.RAHU:
+                # Tropical speed; the nodes are already computed sidereal
+                speeds[planet] -= ayanamsa_rate
+            accelerations[planet] = (after[2] - before[2]) / (2 * h)
+            latitude_speeds[planet] = (after[1] - before[1]) / (2 * h)
+        
+        # Ketu is always opposite Rahu
+        rahu = Planet.RAHU
+        longitudes[Planet.KETU] = (longitudes[rahu] + 180) % 360
+        latitudes[Planet.KETU] = -latitudes[rahu]
+        speeds[Planet.KETU] = speeds[rahu]
+        accelerations[Planet.KETU] = accelerations[rahu]
+        latitude_speeds[Planet.KETU] = -latitude_speeds[rahu]
+        
+        return SkySnapshot(
+            jd=jd,
+            ayanamsa=ayanamsas[1],
+            ayanamsa_rate=ayanamsa_rate,
+            longitudes=longitudes,
+            latitudes=latitudes,
+            speeds=speeds,
+            accelerations=accelerations,
+            latitude_speeds=latitude_speeds,
+        )
+    
+    def refresh(self) -> SkySnapshot:
+        snapshot = self.compute_snapshot(julian_day(datetime.now(timezone.utc)))
+        self._snapshot = snapshot
+        return snapshot
+    
+    def _is_stale(self, snapshot: Optional[SkySnapshot]) -> bool:
+        if snapshot is None:
+            return True
+        now = julian_day(datetime.now(timezone.utc))
+        return now - snapshot.jd > self.max_age_days
+    
+    def snapshot_for(self, jd: float) -> SkySnapshot:
+        """The snapshot to project to ``jd`` from, refreshing it if stale."""
+        snapshot = self._snapshot
+        if self._is_stale(snapshot):
+            with self._lock:
+                snapshot = self._snapshot
+                if self._is_stale(snapshot):
+                    snapshot = self.refresh()
+        if abs(jd - snapshot.jd) > self.max_age_days:
+            # Far from now (a past or future instant): compute it directly
+            return self.compute_snapshot(jd)
+        return snapshot
+    
+    def _jd(self, at: Optional[datetime]) -> float:
+        return julian_day(at or datetime.now(timezone.utc))
+    
+    def ayanamsa(self, at: Optional[datetime] = None) -> float:
+        jd = self._jd(at)
+        snapshot = self.snapshot_for(jd)
+        return snapshot.ayanamsa + snapshot.ayanamsa_rate * (jd - snapshot.jd)
+    
+    def positions(self, at: Optional[datetime] = None) -> Dict[Planet, Dict]:
+        """
+        Planetary positions at ``at``, in the shape returned by
+        ``VedicCalculator.calculate_planetary_positions``.
+        """
+        jd = self._jd(at)
+        snapshot = self.snapshot_for(jd)
+        dt = jd - snapshot.jd
+        
+        positions = {}
+        for planet, longitude in snapshot.longitudes.items():
+            speed = snapshot.speeds[planet]
+            acceleration = snapshot.accelerations[planet]
+            positions[planet] = self.calculator.describe_position(
+                (longitude + speed * dt + acceleration * dt * dt / 2) % 360,
+                snapshot.latitudes[planet] + snapshot.latitude_speeds[planet] * dt,
+                speed + acceleration * dt,
+            )
+        return positions
+    
+    def houses(
+        self,
+        latitude: float,
+        longitude: float,
+        at: Optional[datetime] = None,
+        house_system: str = "P",
+    ) -> List[Dict]:
+        """House cusps for a location at ``at`` (computed per call)."""
+        jd = self._jd(at)
+        ayanamsa = self.ayanamsa(at)
+        cusps, _ = swe.houses_ex(jd, latitude, longitude, house_system.upper().encode())
+        if len(cusps) == 13:
+            cusps = cusps[1:]  # older pyswisseph pads cusps[0]
+        
+        houses = []
+        for i, cusp in enumerate(cusps[:12], 1):
+            sidereal = (cusp - ayanamsa) % 360
+            houses.append({
+                'house_number': i,
+                'longitude': sidereal,
+                'sign': self.calculator._get_zodiac_sign(sidereal),
+            })
+        return houses
+    
+    async def run(self) -> None:
+        """Refresh the snapshot every ``refresh_seconds`` until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception:
+                logger.exception("Current sky refresh failed")
+            await asyncio.sleep(self.refresh_seconds)
+
+
+current_sky = CurrentSky()
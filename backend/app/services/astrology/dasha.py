@@ -0,0 +1,108 @@
+"""
+Vimshottari dasha sequence and antardasha (sub-period) splitting.
+
+Kept free of the ephemeris so the CRUD layer can derive antardasha rows from
+stored mahadashas without importing swisseph.
+"""
+from datetime import timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.models.astrology import Planet
+
+# Lords in Vimshottari order with their mahadasha lengths in years
+VIMSHOTTARI_SEQUENCE: Tuple[Tuple[Planet, int], ...] = (
+    (Planet.KETU, 7),
+    (Planet.VENUS, 20),
+    (Planet.SUN, 6),
+    (Planet.MOON, 10),
+    (Planet.MARS, 7),
+    (Planet.RAHU, 18),
+    (Planet.JUPITER, 16),
+    (Planet.SATURN, 19),
+    (Planet.MERCURY, 17),
+)
+VIMSHOTTARI_YEARS = 120
+DAYS_PER_YEAR = 365.25
+
+_LORDS = [planet for planet, _ in VIMSHOTTARI_SEQUENCE]
+_YEARS = dict(VIMSHOTTARI_SEQUENCE)
+
+# Each lord's start and end within the 120-year cycle, Ketu first
+_CYCLE_YEARS = np.array([years for _, years in VIMSHOTTARI_SEQUENCE], dtype=float)
+_CYCLE_ENDS = np.cumsum(_CYCLE_YEARS)
+_CYCLE_STARTS = _CYCLE_ENDS - _CYCLE_YEARS
+
+
+def antardasha_periods(mahadashas: Sequence[Dict]) -> List[Dict]:
+    """
+    Split each mahadasha into its nine antardashas.
+
+    The sub-periods start with the mahadasha lord and follow the Vimshottari
+    order; each lasts ``mahadasha years * antardasha lord years / 120``. The
+    mahadasha running at birth is only partly lived, so its sub-periods are
+    laid out over the full mahadasha ending on its end date and those before
+    its start are clipped.
+
+    Args:
+        mahadashas: Periods as returned by ``calculate_dasha_periods``
+
+    Returns:
+        Antardasha periods with ``planet``, ``mahadasha_planet``,
+        ``start_date``, ``end_date`` and ``duration_years``
+    """
+    periods = []
+    for mahadasha in mahadashas:
+        lord = Planet(getattr(mahadasha["planet"], "value", mahadasha["planet"]))
+        lord_years = _YEARS[lord]
+        start, end = mahadasha["start_date"], mahadasha["end_date"]
+        
+        current = end - timedelta(days=lord_years * DAYS_PER_YEAR)
+        first = _LORDS.index(lord)
+        for i in range(len(_LORDS)):
+            planet = _LORDS[(first + i) % len(_LORDS)]
+            sub_years = lord_years * _YEARS[planet] / VIMSHOTTARI_YEARS
+            sub_end = current + timedelta(days=sub_years * DAYS_PER_YEAR)
+            if i == len(_LORDS) - 1:
+                sub_end = end  # absorb rounding so the last one ends with the mahadasha
+            if sub_end > start:
+                sub_start = max(current, start)
+                periods.append({
+                    'planet': planet,
+                    'mahadasha_planet': lord,
+                    'start_date': sub_start,
+                    'end_date': sub_end,
+                    'duration_years': (sub_end - sub_start).total_seconds()
+                    / (DAYS_PER_YEAR * 86400),
+                })
+            current = sub_end
+    return periods
+
+
+def dasha_lords_at(
+    moon_longitude: np.ndarray, age_years: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mahadasha and antardasha lords running ``age_years`` after birth, for a
+    natal Moon at ``moon_longitude`` (sidereal), without building periods.
+
+    Inputs broadcast against each other. The lords are returned as indices
+    into ``VIMSHOTTARI_SEQUENCE`` and agree with ``calculate_dasha_periods``
+    and ``antardasha_periods``.
+    """
+    # Nakshatras since Ashwini; each is ruled by the lords in order
+    nakshatras = np.asarray(moon_longitude) / (360 / 27)
+    lord = np.floor(nakshatras).astype(int) % len(_LORDS)
+    elapsed = nakshatras % 1
+    cycle = (
+        _CYCLE_STARTS[lord] + elapsed * _CYCLE_YEARS[lord] + np.asarray(age_years)
+    ) % VIMSHOTTARI_YEARS
+    mahadasha = np.searchsorted(_CYCLE_ENDS, cycle, side="right")
+    
+    # Antardashas repeat the cycle from the mahadasha lord, scaled to its length
+    into = (cycle - _CYCLE_STARTS[mahadasha]) * VIMSHOTTARI_YEARS / _CYCLE_YEARS[mahadasha]
+    antardasha = np.searchsorted(
+        _CYCLE_ENDS, (_CYCLE_STARTS[mahadasha] + into) % VIMSHOTTARI_YEARS, side="right"
+    )
+    return mahadasha, antardasha
@@ -0,0 +1,204 @@
+"""
+Precomputed ephemeris time series.
+
+Reporting, backtesting and admin analytics read planetary positions over
+long date ranges, and those never change. ``compute_year`` runs the
+ephemeris once per step (daily or hourly, UTC) for a whole year and
+``copy_year`` streams the result into that year's partition of
+``ephemeris`` with ``COPY``; ``load-ephemeris.py`` loads years in parallel.
+The query helpers read it back, touching only the partitions in range.
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session
+
+from app.models.astrology import EphemerisTable, Planet, ZodiacSign
+from app.services.astrology.calculation_engine import VedicCalculator
+from app.services.astrology.current_sky import julian_day
+
+# Years stored; the migration creates their partitions and ``copy_year``
+# adds any that are missing (e.g. on a database built by ``init_db``)
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+PLANETS: Tuple[Planet, ...] = tuple(VedicCalculator.PLANET_MAPPING)
+SIGNS: Tuple[ZodiacSign, ...] = tuple(ZodiacSign)
+NAKSHATRA_SPAN = 360 / 27
+
+COPY_COLUMNS = ("planet", "moment", "jd", "longitude", "speed", "sign", "nakshatra")
+
+
+class EphemerisSeries(NamedTuple):
+    year: int
+    moments: List[datetime]  # (steps,), naive UTC
+    jd: np.ndarray           # (steps,)
+    longitudes: np.ndarray   # (planets, steps), sidereal, in PLANETS order
+    speeds: np.ndarray       # (planets, steps), deg/day
+
+
+def partition_name(year: int) -> str:
+    return f"ephemeris_y{year}"
+
+
+def create_partition_sql(year: int) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF ephemeris "
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    )
+
+
+def compute_year(
+    year: int, step_hours: int = 24, calculator: Optional[VedicCalculator] = None
+) -> EphemerisSeries:
+    """Positions of every planet at each step from 1 January of ``year``."""
+    calculator = calculator or VedicCalculator()
+    start = datetime(year, 1, 1)
+    step = timedelta(hours=step_hours)
+    steps = (datetime(year + 1, 1, 1) - start) // step
+    moments = [start + i * step for i in range(steps)]
+    jd = julian_day(start) + np.arange(steps) * (step_hours / 24)
+    ayanamsas = [swe.get_ayanamsa_ut(t) for t in jd]
+    
+    longitudes = np.empty((len(PLANETS), steps))
+    speeds = np.empty((len(PLANETS), steps))
+    for p, planet in enumerate(PLANETS):
+        if planet == Planet.KETU:
+            continue
+        for i in range(steps):
+            longitudes[p, i], _, speeds[p, i] = calculator.sidereal_position(
+                planet, jd[i], ayanamsas[i]
+            )
+    
+    # Ketu is always opposite Rahu
+    rahu, ketu = PLANETS.index(Planet.RAHU), PLANETS.index(Planet.KETU)
+    longitudes[ketu] = (longitudes[rahu] + 180) % 360
+    speeds[ketu] = speeds[rahu]
+    return EphemerisSeries(year, moments, jd, longitudes, speeds)
+
+
+def to_csv(series: EphemerisSeries) -> io.StringIO:
+    """The series as CSV in ``COPY_COLUMNS`` order, rewound for reading."""
+    signs = (series.longitudes // 30).astype(int) % 12
+    nakshatras = (series.longitudes // NAKSHATRA_SPAN).astype(int) % 27 + 1
+    moments = [moment.isoformat(sep=" ") for moment in series.moments]
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for p, planet in enumerate(PLANETS):
+        # Enum columns store member names
+        writer.writerows(
+            (planet.name, moment, jd, lon, speed, SIGNS[sign].name, nakshatra)
+            for moment, jd, lon, speed, sign, nakshatra in zip(
+                moments,
+                series.jd.tolist(),
+                series.longitudes[p].tolist(),
+                series.speeds[p].tolist(),
+                signs[p].tolist(),
+                nakshatras[p].tolist(),
+            )
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def copy_year(engine: Engine, series: EphemerisSeries) -> int:
+    """
+    Replace the year's partition with ``series`` using ``COPY``.
+
+    The partition is created if missing, then truncated in the same
+    transaction as the copy, so reloading a year is idempotent. Returns the
+    number of rows written.
+    """
+    partition = partition_name(series.year)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # Committed on its own: creating a partition locks the parent table,
+        # which would otherwise serialize the other workers' copies
+        cursor.execute(create_partition_sql(series.year))
+        connection.commit()
+        cursor.execute(f"TRUNCATE {partition}")
+        cursor.copy_expert(
+            f"COPY {partition} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            to_csv(series),
+        )
+        rows = cursor.rowcount
+        connection.commit()
+    finally:
+        connection.close()
+    return rows
+
+
+def ephemeris_range(
+    db: Session, planet: Planet, start: datetime, end: datetime
+) -> List[Row]:
+    """Stored positions of ``planet`` from ``start`` (inclusive) to ``end``."""
+    return db.execute(
+        select(
+            EphemerisTable.moment,
+            EphemerisTable.jd,
+            EphemerisTable.longitude,
+            EphemerisTable.speed,
+            EphemerisTable.sign,
+            EphemerisTable.nakshatra,
+        )
+        .where(
+            EphemerisTable.planet == planet,
+            EphemerisTable.moment >= start,
+            EphemerisTable.moment < end,
+        )
+        .order_by(EphemerisTable.moment)
+    ).all()
+
+
+def ephemeris_at(
+    db: Session, moment: datetime, step: timedelta = timedelta(days=1)
+) -> Dict[Planet, EphemerisTable]:
+    """
+    The latest stored step at or before ``moment`` for every planet.
+
+    ``step`` bounds the lookback so only one or two partitions are read.
+    """
+    rows = db.execute(
+        select(EphemerisTable)
+        .where(EphemerisTable.moment <= moment, EphemerisTable.moment > moment - step)
+        .order_by(EphemerisTable.planet, EphemerisTable.moment.desc())
+        .distinct(EphemerisTable.planet)
+    ).scalars().all()
+    return {row.planet: row for row in rows}
+
+
+def sign_changes(
+    db: Session, planet: Planet, start: datetime, end: datetime
+) -> List[Row]:
+    """
+    Steps in ``[start, end)`` where ``planet`` is in a different sign than
+    at the previous step (ingresses, including retrograde re-entries).
+    """
+    steps = (
+        select(
+            EphemerisTable.moment,
+            EphemerisTable.sign,
+            func.lag(EphemerisTable.sign)
+            .over(order_by=EphemerisTable.moment)
+            .label("previous_sign"),
+        )
+        .where(
+            EphemerisTable.planet == planet,
+            EphemerisTable.moment >= start,
+            EphemerisTable.moment < end,
+        )
+        .subquery()
+    )
+    return db.execute(
+        select(steps.c.moment, steps.c.previous_sign, steps.c.sign)
+        .where(steps.c.sign != steps.c.previous_sign)
+        .order_by(steps.c.moment)
+    ).all()
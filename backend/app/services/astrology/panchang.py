@@ -0,0 +1,301 @@
+"""
+Batch panchang generation.
+
+The five limbs of the panchang are fixed divisions of Sun and Moon
+longitudes (Lahiri sidereal):
+
+- tithi: Moon minus Sun, 12 degrees each (30 per lunar month);
+- karana: half a tithi, 6 degrees each (60 per lunar month);
+- nakshatra: the Moon, 13°20' each;
+- yoga: Sun plus Moon, 13°20' each;
+- vara: the weekday, counted from sunrise.
+
+All four longitude-based values only ever increase, so the instants where
+one limb gives way to the next are independent of the observer. They are
+found once per year: the Sun and Moon are sampled every few hours, steps
+where a limb changes are bracketed, and each boundary is refined with
+Newton's method on the exact ephemeris. A location's calendar then needs
+only its sunrises and sunsets (from the cached rise/set service); each
+day's row is sliced from the shared transitions, so a year for hundreds
+of cities costs one set of transitions plus the rise/set times of each
+city.
+"""
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+from app.models.astrology import Planet
+from app.services.astrology.calculation_engine import VedicCalculator
+from app.services.astrology.current_sky import julian_day
+from app.services.astrology.ephemeris import NAKSHATRA_SPAN
+from app.services.astrology.rise_set import rise_set_service
+
+# Sun and Moon move at most this far apart between samples, so no limb can
+# change twice in one step (the narrowest, karana, is 6 degrees)
+SAMPLE_HOURS = 6
+
+# Newton stops once every correction is below this (about 0.01 seconds)
+TOLERANCE_DAYS = 1e-7
+MAX_ITERATIONS = 8
+
+_J2000 = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)
+_J2000_JD = 2451545.0
+
+_PAKSHA_TITHIS = (
+    "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi",
+    "Saptami", "Ashtami", "Navami", "Dashami", "Ekadashi", "Dwadashi",
+    "Trayodashi", "Chaturdashi",
+)
+TITHIS: Tuple[str, ...] = (
+    tuple(f"Shukla {name}" for name in _PAKSHA_TITHIS) + ("Purnima",)
+    + tuple(f"Krishna {name}" for name in _PAKSHA_TITHIS) + ("Amavasya",)
+)
+
+_MOVABLE_KARANAS = ("Bava", "Balava", "Kaulava", "Taitila", "Garaja", "Vanija", "Vishti")
+KARANAS: Tuple[str, ...] = (
+    ("Kimstughna",)
+    + tuple(_MOVABLE_KARANAS[k % 7] for k in range(56))
+    + ("Shakuni", "Chatushpada", "Naga")
+)
+
+NAKSHATRAS: Tuple[str, ...] = tuple(
+    VedicCalculator()._get_nakshatra((n + 0.5) * NAKSHATRA_SPAN)["name"]
+    for n in range(27)
+)
+
+YOGAS: Tuple[str, ...] = (
+    "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda",
+    "Sukarma", "Dhriti", "Shula", "Ganda", "Vriddhi", "Dhruva", "Vyaghata",
+    "Harshana", "Vajra", "Siddhi", "Vyatipata", "Variyana", "Parigha", "Shiva",
+    "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti",
+)
+
+# Sunday first, matching (date.weekday() + 1) % 7
+VARAS: Tuple[str, ...] = (
+    "Ravivara", "Somavara", "Mangalavara", "Budhavara", "Guruvara",
+    "Shukravara", "Shanivara",
+)
+
+
+class Limb(NamedTuple):
+    name: str
+    weights: Tuple[int, int]  # value = (w_sun * Sun + w_moon * Moon) mod 360
+    span: float
+    names: Tuple[str, ...]
+
+
+LIMBS: Tuple[Limb, ...] = (
+    Limb("tithi", (-1, 1), 12.0, TITHIS),
+    Limb("nakshatra", (0, 1), NAKSHATRA_SPAN, NAKSHATRAS),
+    Limb("yoga", (1, 1), NAKSHATRA_SPAN, YOGAS),
+    Limb("karana", (-1, 1), 6.0, KARANAS),
+)
+
+
+class Transitions(NamedTuple):
+    """``numbers[k]`` (1-based) is in effect from ``starts[k]`` (JD, UT)."""
+    starts: np.ndarray   # the first entry is -inf
+    numbers: np.ndarray
+
+
+class PanchangEntry(NamedTuple):
+    number: int
+    name: str
+    ends: datetime
+
+
+class PanchangDay(NamedTuple):
+    """
+    One civil day. Each limb lists the entries in effect from sunrise to the
+    next sunrise, the first being the one at sunrise.
+    """
+    date: date
+    sunrise: Optional[datetime]
+    sunset: Optional[datetime]
+    vara: str
+    tithi: List[PanchangEntry]
+    nakshatra: List[PanchangEntry]
+    yoga: List[PanchangEntry]
+    karana: List[PanchangEntry]
+
+
+def _sun_moon(
+    jd: np.ndarray, calculator: VedicCalculator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """``(2, n)`` sidereal longitudes and ``(2, n)`` speeds of the Sun and Moon."""
+    longitudes = np.empty((2, len(jd)))
+    speeds = np.empty((2, len(jd)))
+    for i, t in enumerate(jd.tolist()):
+        ayanamsa = swe.get_ayanamsa_ut(t)
+        for b, planet in enumerate((Planet.SUN, Planet.MOON)):
+            longitudes[b, i], _, speeds[b, i] = calculator.sidereal_position(
+                planet, t, ayanamsa
+            )
+    return longitudes, speeds
+
+
+def compute_transitions(
+    start_jd: float, end_jd: float, calculator: Optional[VedicCalculator] = None
+) -> Dict[str, Transitions]:
+    """Every limb change between ``start_jd`` and ``end_jd``, by limb name."""
+    calculator = calculator or VedicCalculator()
+    step = SAMPLE_HOURS / 24
+    grid = start_jd + np.arange(int(np.ceil((end_jd - start_jd) / step)) + 1) * step
+    longitudes, _ = _sun_moon(grid, calculator)
+    
+    # Bracket every boundary, then refine all limbs' roots together
+    first_numbers, numbers, weights, targets, guesses = [], [], [], [], []
+    for limb in LIMBS:
+        value = np.dot(limb.weights, longitudes) % 360
+        # The value only increases, so it unwraps by its forward steps
+        unwrapped = value[0] + np.concatenate(([0.0], np.cumsum(np.diff(value) % 360)))
+        index = np.floor(unwrapped / limb.span).astype(int)
+        steps = np.nonzero(np.diff(index))[0]
+        boundary = index[steps + 1] * limb.span
+        fraction = (boundary - unwrapped[steps]) / (unwrapped[steps + 1] - unwrapped[steps])
+        
+        first_numbers.append(index[0] % len(limb.names) + 1)
+        numbers.append(index[steps + 1] % len(limb.names) + 1)
+        weights.append(np.tile(limb.weights, (len(steps), 1)))
+        targets.append(boundary % 360)
+        guesses.append(grid[steps] + fraction * step)
+    
+    roots = _refine(
+        np.concatenate(guesses), np.concatenate(weights), np.concatenate(targets),
+        calculator,
+    )
+    
+    transitions, offset = {}, 0
+    for limb, first, limb_numbers in zip(LIMBS, first_numbers, numbers):
+        count = len(limb_numbers)
+        transitions[limb.name] = Transitions(
+            starts=np.concatenate(([-np.inf], roots[offset:offset + count])),
+            numbers=np.concatenate(([first], limb_numbers)),
+        )
+        offset += count
+    return transitions
+
+
+def _refine(
+    jd: np.ndarray,
+    weights: np.ndarray,
+    targets: np.ndarray,
+    calculator: VedicCalculator,
+) -> np.ndarray:
+    """Newton's method for ``weights . (Sun, Moon) == targets`` from ``jd``."""
+    jd = jd.copy()
+    for _ in range(MAX_ITERATIONS):
+        longitudes, speeds = _sun_moon(jd, calculator)
+        value = np.einsum("nb,bn->n", weights, longitudes)
+        rate = np.einsum("nb,bn->n", weights, speeds)
+        correction = ((value - targets + 180) % 360 - 180) / rate
+        jd -= correction
+        if not len(jd) or np.abs(correction).max() < TOLERANCE_DAYS:
+            break
+    return jd
+
+
+@lru_cache(maxsize=4)
+def year_transitions(year: int) -> Dict[str, Transitions]:
+    """
+    Transitions covering every civil day of ``year`` in any timezone, up to
+    the following sunrise; shared by all locations.
+    """
+    start = julian_day(datetime(year, 1, 1)) - 2
+    end = julian_day(datetime(year + 1, 1, 1)) + 3
+    return compute_transitions(start, end)
+
+
+def to_datetime(jd: float, tz: Optional[tzinfo] = None) -> datetime:
+    """Aware datetime of a Julian day (UT), in ``tz`` (default UTC)."""
+    moment = _J2000 + timedelta(days=jd - _J2000_JD)
+    return moment.astimezone(tz) if tz is not None else moment
+
+
+def day_rows(
+    dates: Sequence[date],
+    midnights: np.ndarray,
+    sunrises: np.ndarray,
+    sunsets: np.ndarray,
+    transitions: Dict[str, Transitions],
+    tz: tzinfo,
+) -> Iterator[PanchangDay]:
+    """
+    Rows for consecutive ``dates`` from their local midnights and rise/set
+    times (one more midnight and sunrise than dates, for the last day's end).
+    Days without a sunrise are bounded by local midnight.
+    """
+    boundaries = np.where(np.isnan(sunrises), midnights, sunrises)
+    # Entries in effect at each day's start and at the next day's start
+    spans = {
+        name: np.searchsorted(limb.starts, boundaries, side="right") - 1
+        for name, limb in transitions.items()
+    }
+    
+    def entries(limb: Limb, day: int) -> List[PanchangEntry]:
+        limb_transitions = transitions[limb.name]
+        first, last = spans[limb.name][day], spans[limb.name][day + 1]
+        return [
+            PanchangEntry(
+                number=int(limb_transitions.numbers[k]),
+                name=limb.names[limb_transitions.numbers[k] - 1],
+                ends=to_datetime(limb_transitions.starts[k + 1], tz),
+            )
+            for k in range(first, last + 1)
+        ]
+    
+    for day, current in enumerate(dates):
+        yield PanchangDay(
+            date=current,
+            sunrise=None if np.isnan(sunrises[day]) else to_datetime(sunrises[day], tz),
+            sunset=None if np.isnan(sunsets[day]) else to_datetime(sunsets[day], tz),
+            vara=VARAS[(current.weekday() + 1) % 7],
+            **{limb.name: entries(limb, day) for limb in LIMBS},
+        )
+
+
+def panchang_days(
+    latitude: float,
+    longitude: float,
+    start: date,
+    end: date,
+    timezone_name: Optional[str] = None,
+    calculator: Optional[VedicCalculator] = None,
+) -> Iterator[PanchangDay]:
+    """
+    Stream the panchang of every day from ``start`` to ``end`` (inclusive)
+    at a location, one year of rows at a time.
+
+    The timezone is looked up from the coordinates unless given.
+    """
+    if timezone_name is None:
+        calculator = calculator or VedicCalculator()
+        timezone_name = calculator.tf.timezone_at(lat=latitude, lng=longitude) or "UTC"
+    tz = pytz.timezone(timezone_name)
+    
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        dates = [first + timedelta(days=d) for d in range((last - first).days + 1)]
+        # One extra day gives the last date's following sunrise
+        midnights = np.array([
+            julian_day(tz.localize(datetime.combine(day, time())))
+            for day in dates + [last + timedelta(days=1)]
+        ])
+        sunrises, sunsets = rise_set_service.events(
+            latitude, longitude, dates + [last + timedelta(days=1)]
+        )
+        yield from day_rows(dates, midnights, sunrises, sunsets, year_transitions(year), tz)
+
+
+def panchang_year(
+    year: int, latitude: float, longitude: float, timezone_name: Optional[str] = None
+) -> Iterator[PanchangDay]:
+    """The panchang of every day of ``year`` at a location."""
+    return panchang_days(
+        latitude, longitude, date(year, 1, 1), date(year, 12, 31), timezone_name
+    )
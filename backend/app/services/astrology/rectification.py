@@ -0,0 +1,249 @@
+"""
+Birth-time rectification.
+
+Scans a window of possible birth times for the ones consistent with known
+facts about the native: the rising sign, planets in given houses, and
+life events falling in given dasha periods.
+
+Nothing is recalculated per step. The ephemeris runs once at each end of
+the window; planets are interpolated between the two (a quadratic in time
+from the end speeds, good to a few arc-seconds for the Moon over several
+hours). The ascendant follows from the sidereal-time relation: the right
+ascension of the meridian advances by ``SIDEREAL_RATE`` degrees per day,
+and the ascendant is a closed-form function of it, the obliquity and the
+latitude. Other cusps come from ``swe.houses_armc`` on that advancing
+value, without re-deriving sidereal time or nutation. Dasha lords come
+from the interpolated Moon directly (``dasha.dasha_lords_at``).
+
+Every step is checked at once; the edges of each matching run are then
+bisected (ascendant sign changes, cusps crossing planets, dasha
+boundaries) to ``EDGE_TOLERANCE_SECONDS``.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import swisseph as swe
+
+from app.models.astrology import Planet, ZodiacSign
+from app.services.astrology.calculation_engine import VedicCalculator
+from app.services.astrology.current_sky import julian_day
+from app.services.astrology.dasha import DAYS_PER_YEAR, VIMSHOTTARI_SEQUENCE, dasha_lords_at
+from app.services.astrology.strength import houses_of
+
+# Degrees of sidereal time per day of UT
+SIDEREAL_RATE = 360.98564736629
+EDGE_TOLERANCE_SECONDS = 1.0
+
+PLANETS = (
+    Planet.SUN, Planet.MOON, Planet.MARS, Planet.MERCURY, Planet.JUPITER,
+    Planet.VENUS, Planet.SATURN, Planet.RAHU, Planet.KETU,
+)
+SIGNS = tuple(ZodiacSign)
+_DASHA_LORDS = [planet for planet, _ in VIMSHOTTARI_SEQUENCE]
+
+
+class DashaEvent(NamedTuple):
+    """A life event on ``on``, known to fall in the given periods."""
+    on: date
+    mahadasha: Optional[Planet] = None
+    antardasha: Optional[Planet] = None
+
+
+class RectificationConstraints(NamedTuple):
+    ascendant_signs: Sequence[ZodiacSign] = ()  # any of these rising
+    placements: Optional[Dict[Planet, Sequence[int]]] = None  # planet -> houses
+    events: Sequence[DashaEvent] = ()
+
+
+class CandidateWindow(NamedTuple):
+    """Local birth times from ``start`` to ``end`` satisfying every constraint."""
+    start: datetime
+    end: datetime
+    ascendant: ZodiacSign
+
+
+class WindowSky:
+    """Planets, ascendant and cusps over a short window from one ephemeris pass."""
+    
+    def __init__(
+        self,
+        start_jd: float,
+        end_jd: float,
+        latitude: float,
+        longitude: float,
+        house_system: str = "P",
+        calculator: Optional[VedicCalculator] = None,
+    ):
+        calculator = calculator or VedicCalculator()
+        self.start_jd = start_jd
+        self.latitude = latitude
+        self.house_system = house_system.upper()
+        self.ayanamsa = swe.get_ayanamsa_ut(start_jd)
+        # Right ascension of the meridian and true obliquity at the start
+        self.armc = (swe.sidtime(start_jd) * 15 + longitude) % 360
+        nutation, _ = swe.calc_ut(start_jd, swe.ECL_NUT)
+        self.obliquity = nutation[0]
+        
+        duration = max(end_jd - start_jd, 1e-6)
+        ends = []
+        for jd in (start_jd, end_jd):
+            ayanamsa = swe.get_ayanamsa_ut(jd)
+            ends.append([
+                calculator.sidereal_position(planet, jd, ayanamsa)
+                for planet in PLANETS[:-1]
+            ])
+        first, second = (np.array(positions) for positions in ends)
+        self.longitudes = first[:, 0]
+        self.speeds = first[:, 2]
+        self.accelerations = (second[:, 2] - first[:, 2]) / duration
+    
+    def armc_at(self, jd: np.ndarray) -> np.ndarray:
+        return (self.armc + SIDEREAL_RATE * (jd - self.start_jd)) % 360
+    
+    def ascendant(self, jd: np.ndarray) -> np.ndarray:
+        """Sidereal ascendant at each instant."""
+        armc = np.radians(self.armc_at(jd))
+        obliquity = np.radians(self.obliquity)
+        tropical = np.degrees(np.arctan2(
+            np.cos(armc),
+            -(np.sin(armc) * np.cos(obliquity)
+              + np.tan(np.radians(self.latitude)) * np.sin(obliquity)),
+        ))
+        return (tropical - self.ayanamsa) % 360
+    
+    def planets(self, jd: np.ndarray) -> np.ndarray:
+        """``(instants, 9)`` sidereal longitudes in ``PLANETS`` order."""
+        dt = (jd - self.start_jd)[:, None]
+        longitudes = (
+            self.longitudes + self.speeds * dt + self.accelerations * dt * dt / 2
+        ) % 360
+        # Ketu is always opposite Rahu
+        return np.concatenate([longitudes, (longitudes[:, -1:] + 180) % 360], axis=1)
+    
+    def houses(
+        self, jd: np.ndarray, longitudes: np.ndarray, ascendant: np.ndarray
+    ) -> np.ndarray:
+        """House (1-12) of each planet at each instant."""
+        if self.house_system == "W":
+            return (longitudes // 30 - (ascendant // 30)[:, None]) % 12 + 1
+        cusps = np.empty((len(jd), 12))
+        for i, armc in enumerate(self.armc_at(jd).tolist()):
+            tropical, _ = swe.houses_armc(
+                armc, self.latitude, self.obliquity, self.house_system.encode()
+            )
+            if len(tropical) == 13:
+                tropical = tropical[1:]  # older pyswisseph pads cusps[0]
+            cusps[i] = tropical[:12]
+        return houses_of(longitudes, (cusps - self.ayanamsa) % 360)
+
+
+def _matches(
+    sky: WindowSky,
+    jd: np.ndarray,
+    constraints: RectificationConstraints,
+    event_jd: np.ndarray,
+) -> np.ndarray:
+    """Which instants satisfy every constraint."""
+    ascendant = sky.ascendant(jd)
+    ok = np.ones(len(jd), dtype=bool)
+    if constraints.ascendant_signs:
+        allowed = [SIGNS.index(ZodiacSign(sign)) for sign in constraints.ascendant_signs]
+        ok &= np.isin((ascendant // 30).astype(int), allowed)
+    
+    longitudes = sky.planets(jd)
+    if constraints.placements:
+        houses = sky.houses(jd, longitudes, ascendant)
+        for planet, allowed in constraints.placements.items():
+            ok &= np.isin(houses[:, PLANETS.index(Planet(planet))], list(allowed))
+    
+    if constraints.events:
+        moon = longitudes[:, PLANETS.index(Planet.MOON)]
+        ages = (event_jd[None, :] - jd[:, None]) / DAYS_PER_YEAR
+        mahadasha, antardasha = dasha_lords_at(moon[:, None], ages)
+        for e, event in enumerate(constraints.events):
+            if event.mahadasha is not None:
+                ok &= mahadasha[:, e] == _DASHA_LORDS.index(Planet(event.mahadasha))
+            if event.antardasha is not None:
+                ok &= antardasha[:, e] == _DASHA_LORDS.index(Planet(event.antardasha))
+    return ok
+
+
+def _bisect(predicate, inside: float, outside: float) -> float:
+    """The last instant from ``inside`` towards ``outside`` where ``predicate`` holds."""
+    tolerance = EDGE_TOLERANCE_SECONDS / 86400
+    while abs(outside - inside) > tolerance:
+        middle = (inside + outside) / 2
+        if predicate(middle):
+            inside = middle
+        else:
+            outside = middle
+    return inside
+
+
+def rectify(
+    birth_date: date,
+    window_start: time,
+    window_end: time,
+    latitude: float,
+    longitude: float,
+    constraints: RectificationConstraints,
+    step_minutes: float = 1.0,
+    house_system: str = "P",
+    calculator: Optional[VedicCalculator] = None,
+) -> List[CandidateWindow]:
+    """
+    Birth times in a window that satisfy ``constraints``.
+
+    Args:
+        birth_date: Local date of birth
+        window_start: Earliest possible local birth time
+        window_end: Latest possible local birth time (the next day if
+            earlier than ``window_start``)
+        latitude: Birth latitude
+        longitude: Birth longitude
+        constraints: Rising signs, house placements and dasha events
+        step_minutes: Scan resolution; runs shorter than a step may be missed
+        house_system: House system code for placements (W = whole sign)
+
+    Returns:
+        Runs of matching local birth times, earliest first
+    """
+    calculator = calculator or VedicCalculator()
+    start = datetime.combine(birth_date, window_start)
+    end = datetime.combine(birth_date, window_end)
+    if end < start:
+        end += timedelta(days=1)
+    start_jd = calculator._get_julian_day(start, latitude, longitude)
+    end_jd = start_jd + (end - start) / timedelta(days=1)
+    
+    sky = WindowSky(start_jd, end_jd, latitude, longitude, house_system, calculator)
+    event_jd = np.array([
+        julian_day(datetime.combine(event.on, time(12))) for event in constraints.events
+    ])
+    
+    def holds(jd: float) -> bool:
+        return bool(_matches(sky, np.array([jd]), constraints, event_jd)[0])
+    
+    steps = int((end_jd - start_jd) * 1440 // step_minutes) + 1
+    jd = np.minimum(start_jd + np.arange(steps) * step_minutes / 1440, end_jd)
+    ok = _matches(sky, jd, constraints, event_jd)
+    
+    # Runs of matching steps, as [first, last] index pairs
+    edges = np.diff(np.concatenate(([False], ok, [False])).astype(int))
+    firsts = np.nonzero(edges == 1)[0]
+    lasts = np.nonzero(edges == -1)[0] - 1
+    
+    def local(moment: float) -> datetime:
+        return start + timedelta(days=moment - start_jd)
+    
+    windows = []
+    for first, last in zip(firsts.tolist(), lasts.tolist()):
+        begin = jd[first] if first == 0 else _bisect(holds, jd[first], jd[first - 1])
+        finish = jd[last] if last == steps - 1 else _bisect(holds, jd[last], jd[last + 1])
+        windows.append(CandidateWindow(
+            start=local(begin),
+            end=local(finish),
+            ascendant=SIGNS[int(sky.ascendant(np.array([begin]))[0] // 30)],
+        ))
+    return windows
@@ -0,0 +1,160 @@
+"""
+Cached rise and set times of the Sun and Moon.
+
+Vedic days run from sunrise to sunrise, so panchang, hora, muhurta and
+dasha-balance calculations all need rise times, usually for the same few
+cities and days. Results are cached per process in a bounded LRU keyed by
+body, quantized location (``RISE_SET_LOCATION_PRECISION`` degrees, about
+1 km and a few seconds of rise time at the default) and date. Queries take
+many dates at once and only run the ephemeris for the ones not cached;
+``precompute_year`` fills a whole year for a location up front.
+
+Dates are local mean-time days at the location (midnight at 0h UT minus
+longitude / 15 hours), so no timezone lookup is needed. These agree with
+civil dates for every sunrise and sunset outside the polar regions. Rising
+follows the Hindu convention: the centre of the disc, without refraction.
+"""
+from datetime import date
+from typing import Hashable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.astrology import Planet
+
+BODIES = {Planet.SUN: swe.SUN, Planet.MOON: swe.MOON}
+RISE_FLAGS = swe.BIT_HINDU_RISING
+
+# date.toordinal() + _ORDINAL_JD is the JD at 0h UT of that date
+_ORDINAL_JD = 1721424.5
+
+
+class RiseSet(NamedTuple):
+    """Rise and set on each date (JD, UT); NaN where there is none."""
+    rise: np.ndarray
+    set: np.ndarray
+
+
+class VedicDays(NamedTuple):
+    """The sunrise-to-sunrise day containing each queried instant."""
+    dates: List[date]
+    start: np.ndarray  # sunrise (JD, UT); local midnight where the Sun doesn't rise
+    end: np.ndarray    # the next day's start
+
+
+def midnights(dates: Sequence[date], longitude: float) -> np.ndarray:
+    """Local mean-time midnight (JD, UT) of each date at ``longitude``."""
+    ordinals = np.array([day.toordinal() for day in dates], dtype=float)
+    return ordinals + _ORDINAL_JD - longitude / 360
+
+
+class RiseSetService:
+    """Rise/set times through a bounded per-process LRU."""
+    
+    def __init__(
+        self,
+        maxsize: int = settings.RISE_SET_CACHE_SIZE,
+        precision: float = settings.RISE_SET_LOCATION_PRECISION,
+    ):
+        self.precision = precision
+        self._cache: "TTLCache[Tuple[float, float]]" = TTLCache(maxsize=maxsize)
+    
+    def _location(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return round(latitude / self.precision), round(longitude / self.precision)
+    
+    def events(
+        self,
+        latitude: float,
+        longitude: float,
+        dates: Sequence[date],
+        body: Planet = Planet.SUN,
+    ) -> RiseSet:
+        """Rise and set of ``body`` on each of ``dates`` at a location."""
+        location = self._location(latitude, longitude)
+        keys: List[Hashable] = [(body, *location, day.toordinal()) for day in dates]
+        rise = np.full(len(dates), np.nan)
+        set_ = np.full(len(dates), np.nan)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                misses.append(i)
+            else:
+                rise[i], set_[i] = cached
+        
+        if misses:
+            # Computed at the quantized location, so hits never depend on
+            # which nearby coordinates filled the entry
+            lat, lon = (q * self.precision for q in location)
+            computed = compute_rise_set(
+                midnights([dates[i] for i in misses], lon), lat, lon, body
+            )
+            rise[misses], set_[misses] = computed
+            for i, pair in zip(misses, zip(computed.rise.tolist(), computed.set.tolist())):
+                self._cache.set(keys[i], pair)
+        return RiseSet(rise, set_)
+    
+    def sunrises(self, latitude: float, longitude: float, dates: Sequence[date]) -> np.ndarray:
+        """Sunrise (JD, UT) on each of ``dates``."""
+        return self.events(latitude, longitude, dates).rise
+    
+    def precompute_year(
+        self,
+        latitude: float,
+        longitude: float,
+        year: int,
+        bodies: Sequence[Planet] = (Planet.SUN, Planet.MOON),
+    ) -> None:
+        """Fill the cache with every day of ``year`` at a location."""
+        first = date(year, 1, 1).toordinal()
+        dates = [date.fromordinal(n) for n in range(first, date(year + 1, 1, 1).toordinal())]
+        for body in bodies:
+            self.events(latitude, longitude, dates, body)
+    
+    def vedic_days(self, latitude: float, longitude: float, jd: np.ndarray) -> VedicDays:
+        """
+        The Vedic day (sunrise to next sunrise) containing each instant in
+        ``jd``; it carries the date of the sunrise that starts it.
+        """
+        jd = np.asarray(jd, dtype=float)
+        ordinals = np.floor(jd + longitude / 360 - _ORDINAL_JD).astype(int)
+        # The civil days involved, plus one either side
+        span = np.arange(ordinals.min() - 1, ordinals.max() + 2)
+        dates = [date.fromordinal(int(n)) for n in span]
+        starts = self.sunrises(latitude, longitude, dates)
+        starts = np.where(np.isnan(starts), midnights(dates, longitude), starts)
+        
+        day = ordinals - span[0]
+        day = np.where(jd < starts[day], day - 1, day)
+        return VedicDays(
+            dates=[dates[d] for d in day.tolist()],
+            start=starts[day],
+            end=starts[day + 1],
+        )
+    
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def compute_rise_set(
+    midnight_jd: np.ndarray, latitude: float, longitude: float, body: Planet = Planet.SUN
+) -> RiseSet:
+    """
+    The first rise and set of ``body`` within a day of each midnight,
+    straight from the ephemeris.
+    """
+    geopos = (longitude, latitude, 0.0)
+    rise = np.full(len(midnight_jd), np.nan)
+    set_ = np.full(len(midnight_jd), np.nan)
+    for i, start in enumerate(midnight_jd.tolist()):
+        for out, event in ((rise, swe.CALC_RISE), (set_, swe.CALC_SET)):
+            status, times = swe.rise_trans(start, BODIES[body], event | RISE_FLAGS, geopos)
+            # The Moon skips a rise or set about once a month
+            if status == 0 and times[0] < start + 1:
+                out[i] = times[0]
+    return RiseSet(rise, set_)
+
+
+rise_set_service = RiseSetService()
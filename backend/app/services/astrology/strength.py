@@ -0,0 +1,282 @@
+"""
+Planetary strength: Ashtakavarga and Shadbala for batches of charts.
+
+Charts are encoded once into arrays (``encode_charts``) and every result
+is an array expression over the whole batch. Ashtakavarga bindus come from
+one contraction of the contributors' one-hot signs with a precomputed
+(planet, contributor, sign, sign) bindu tensor; each Shadbala component is
+elementwise arithmetic on longitudes, cusps and speeds, with a (planet,
+planet) drishti matrix for Drik Bala.
+
+Shadbala covers the components derivable from positions, cusps and the
+ayanamsa: Uchcha, Ojayugma, Kendradi and Drekkana (Sthana), Dig,
+Nathonnatha, Paksha and Ayana (Kala), Chesta, Naisargika and Drik.
+Saptavargaja Bala and the calendar parts of Kala Bala (Tribhaga, Abda,
+Masa, Vara, Hora) and Yuddha Bala are not included.
+"""
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from app.models.astrology import Planet
+
+SEVEN_PLANETS: Tuple[Planet, ...] = (
+    Planet.SUN, Planet.MOON, Planet.MARS, Planet.MERCURY,
+    Planet.JUPITER, Planet.VENUS, Planet.SATURN,
+)
+SUN, MOON, MARS, MERCURY, JUPITER, VENUS, SATURN = range(7)
+
+# Houses, counted from each contributor (the seven planets, then the
+# ascendant), that give a bindu in a planet's Ashtakavarga (BPHS)
+BENEFIC_PLACES: Dict[Planet, Tuple[Tuple[int, ...], ...]] = {
+    Planet.SUN: (
+        (1, 2, 4, 7, 8, 9, 10, 11), (3, 6, 10, 11), (1, 2, 4, 7, 8, 9, 10, 11),
+        (3, 5, 6, 9, 10, 11, 12), (5, 6, 9, 11), (6, 7, 12),
+        (1, 2, 4, 7, 8, 9, 10, 11), (3, 4, 6, 10, 11, 12),
+    ),
+    Planet.MOON: (
+        (3, 6, 7, 8, 10, 11), (1, 3, 6, 7, 10, 11), (2, 3, 5, 6, 9, 10, 11),
+        (1, 3, 4, 5, 7, 8, 10, 11), (1, 4, 7, 8, 10, 11, 12), (3, 4, 5, 7, 9, 10, 11),
+        (3, 5, 6, 11), (3, 6, 10, 11),
+    ),
+    Planet.MARS: (
+        (3, 5, 6, 10, 11), (3, 6, 11), (1, 2, 4, 7, 8, 10, 11),
+        (3, 5, 6, 11), (6, 10, 11, 12), (6, 8, 11, 12),
+        (1, 4, 7, 8, 9, 10, 11), (1, 3, 6, 10, 11),
+    ),
+    Planet.MERCURY: (
+        (5, 6, 9, 11, 12), (2, 4, 6, 8, 10, 11), (1, 2, 4, 7, 8, 9, 10, 11),
+        (1, 3, 5, 6, 9, 10, 11, 12), (6, 8, 11, 12), (1, 2, 3, 4, 5, 8, 9, 11),
+        (1, 2, 4, 7, 8, 9, 10, 11), (1, 2, 4, 6, 8, 10, 11),
+    ),
+    Planet.JUPITER: (
+        (1, 2, 3, 4, 7, 8, 9, 10, 11), (2, 5, 7, 9, 11), (1, 2, 4, 7, 8, 10, 11),
+        (1, 2, 4, 5, 6, 9, 10, 11), (1, 2, 3, 4, 7, 8, 10, 11), (2, 5, 6, 9, 10, 11),
+        (3, 5, 6, 12), (1, 2, 4, 5, 6, 7, 9, 10, 11),
+    ),
+    Planet.VENUS: (
+        (8, 11, 12), (1, 2, 3, 4, 5, 8, 9, 11, 12), (3, 5, 6, 9, 11, 12),
+        (3, 5, 6, 9, 11), (5, 8, 9, 10, 11), (1, 2, 3, 4, 5, 8, 9, 10, 11),
+        (3, 4, 5, 8, 9, 10, 11), (1, 2, 3, 4, 5, 8, 9, 11),
+    ),
+    Planet.SATURN: (
+        (1, 2, 4, 7, 8, 10, 11), (3, 6, 11), (3, 5, 6, 10, 11, 12),
+        (6, 8, 9, 10, 11, 12), (5, 6, 11, 12), (6, 11, 12),
+        (3, 5, 6, 11), (1, 3, 4, 6, 10, 11),
+    ),
+}
+
+
+def _bindu_tensor() -> np.ndarray:
+    """``[planet, contributor, contributor sign, sign]`` -> 1 for a bindu."""
+    places = np.zeros((7, 8, 12), dtype=np.int16)
+    for p, planet in enumerate(SEVEN_PLANETS):
+        for c, houses in enumerate(BENEFIC_PLACES[planet]):
+            places[p, c, np.array(houses) - 1] = 1
+    offsets = (np.arange(12)[None, :] - np.arange(12)[:, None]) % 12
+    return places[:, :, offsets]
+
+
+BINDU_TENSOR = _bindu_tensor()
+
+# Deep exaltation points (sidereal longitude)
+EXALTATION = np.array([10.0, 33.0, 298.0, 165.0, 95.0, 357.0, 200.0])
+# Moon and Venus are feminine for Ojayugma Bala
+FEMININE = np.array([False, True, False, False, False, True, False])
+# Decanate (0-2) giving Drekkana Bala: male, female, neuter planets
+DREKKANA = np.array([0, 2, 0, 1, 0, 2, 1])
+# Cusp index (0 = ascendant) where each planet has full Dig Bala
+DIG_CUSP = np.array([9, 3, 9, 0, 0, 3, 6])
+NATURAL_BENEFIC = np.array([False, True, False, True, True, True, False])
+DIURNAL = np.array([True, False, False, False, True, True, False])
+# +1 when northern declination strengthens, -1 southern; Mercury takes |k|
+AYANA_SIDE = np.array([1, -1, 1, 0, 1, 1, -1])
+NAISARGIKA = np.array([60.0, 51.43, 17.14, 25.71, 34.29, 42.86, 8.57])
+# Mean daily motion in degrees, for Chesta Bala
+MEAN_MOTION = np.array([0.9856, 13.1764, 0.5240, 0.9856, 0.0831, 0.9856, 0.0335])
+# Shadbala (rupas) a planet needs to count as strong
+MINIMUM_RUPAS = np.array([6.5, 6.0, 5.0, 7.0, 6.5, 5.5, 5.0])
+
+OBLIQUITY = 23.44
+
+# Drishti (virupas) by angular distance from the aspecting planet
+_DRISHTI_DEGREES = np.array([0, 30, 60, 90, 120, 150, 180, 300, 360])
+_DRISHTI_VALUES = np.array([0, 0, 15, 45, 30, 0, 60, 0, 0])
+# Full special aspects by sign counted from the aspecting planet
+SPECIAL_ASPECTS = {MARS: (4, 8), JUPITER: (5, 9), SATURN: (3, 10)}
+
+
+class ChartBatch(NamedTuple):
+    longitudes: np.ndarray  # (charts, 7) sidereal, in SEVEN_PLANETS order
+    speeds: np.ndarray      # (charts, 7) deg/day, negative when retrograde
+    cusps: np.ndarray       # (charts, 12) sidereal, cusps[:, 0] is the ascendant
+    ayanamsa: np.ndarray    # (charts,)
+
+
+class AshtakavargaResult(NamedTuple):
+    bhinna: np.ndarray  # (charts, 7, 12) bindus per planet per sign, Aries first
+    sarva: np.ndarray   # (charts, 12) Sarvashtakavarga
+
+
+class ShadbalaResult(NamedTuple):
+    # Each (charts, 7) in virupas (60 virupas = 1 rupa)
+    sthana: np.ndarray
+    dig: np.ndarray
+    kala: np.ndarray
+    chesta: np.ndarray
+    naisargika: np.ndarray
+    drik: np.ndarray
+    
+    @property
+    def total(self) -> np.ndarray:
+        return self.sthana + self.dig + self.kala + self.chesta + self.naisargika + self.drik
+    
+    @property
+    def rupas(self) -> np.ndarray:
+        return self.total / 60
+    
+    @property
+    def is_strong(self) -> np.ndarray:
+        return self.rupas >= MINIMUM_RUPAS
+
+
+def encode_charts(charts: Sequence[Dict]) -> ChartBatch:
+    """
+    Encode calculator output for a batch of charts.
+
+    Each chart is a dict with ``positions`` (as returned by
+    ``calculate_planetary_positions``), ``houses`` (``calculate_houses``)
+    and ``ayanamsa``.
+    """
+    longitudes = np.empty((len(charts), 7))
+    speeds = np.empty((len(charts), 7))
+    cusps = np.empty((len(charts), 12))
+    ayanamsa = np.empty(len(charts))
+    for n, chart in enumerate(charts):
+        positions = {getattr(k, "value", k): v for k, v in chart["positions"].items()}
+        for p, planet in enumerate(SEVEN_PLANETS):
+            position = positions[planet.value]
+            longitudes[n, p] = position["longitude"]
+            speeds[n, p] = -position["speed"] if position["is_retrograde"] else position["speed"]
+        cusps[n] = [house["longitude"] for house in chart["houses"]]
+        ayanamsa[n] = chart["ayanamsa"]
+    return ChartBatch(longitudes, speeds, cusps, ayanamsa)
+
+
+def _separation(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Shortest angular distance, 0-180."""
+    return np.abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+def _signs(longitudes: np.ndarray) -> np.ndarray:
+    return (longitudes // 30).astype(int) % 12
+
+
+def ashtakavarga(batch: ChartBatch) -> AshtakavargaResult:
+    """Bhinnashtakavarga of the seven planets and the Sarvashtakavarga."""
+    contributors = np.concatenate([_signs(batch.longitudes), _signs(batch.cusps[:, :1])], axis=1)
+    one_hot = np.eye(12, dtype=np.int16)[contributors]  # (charts, 8, 12)
+    bhinna = np.einsum("ncs,pcsz->npz", one_hot, BINDU_TENSOR)
+    return AshtakavargaResult(bhinna, bhinna.sum(axis=1))
+
+
+def houses_of(longitudes: np.ndarray, cusps: np.ndarray) -> np.ndarray:
+    """House (1-12) of each longitude, from the cusp spans."""
+    starts = cusps[:, None, :]
+    spans = (np.roll(cusps, -1, axis=1) - cusps)[:, None, :] % 360
+    inside = (longitudes[:, :, None] - starts) % 360 < spans
+    return inside.argmax(axis=2) + 1
+
+
+def drishti(batch: ChartBatch) -> np.ndarray:
+    """``[chart, aspecting, aspected]`` aspect strength in virupas."""
+    lon = batch.longitudes
+    distance = (lon[:, None, :] - lon[:, :, None]) % 360
+    strength = np.interp(distance, _DRISHTI_DEGREES, _DRISHTI_VALUES)
+    sign_house = (_signs(lon)[:, None, :] - _signs(lon)[:, :, None]) % 12 + 1
+    for planet, houses in SPECIAL_ASPECTS.items():
+        special = np.isin(sign_house[:, planet, :], houses)
+        strength[:, planet, :] = np.where(special, 60.0, strength[:, planet, :])
+    strength[:, np.arange(7), np.arange(7)] = 0.0
+    return strength
+
+
+def shadbala(batch: ChartBatch) -> ShadbalaResult:
+    """The six-fold strength of the seven planets."""
+    lon = batch.longitudes
+    signs = _signs(lon)
+    
+    # Sthana Bala
+    uchcha = _separation(lon, EXALTATION + 180) / 3
+    odd_sign = signs % 2 == 0
+    odd_navamsa = (lon // (30 / 9)).astype(int) % 2 == 0
+    ojayugma = 15 * (odd_sign != FEMININE) + 15 * (odd_navamsa != FEMININE)
+    kendradi = np.array([60.0, 30.0, 15.0])[(houses_of(lon, batch.cusps) - 1) % 3]
+    drekkana = 15 * ((lon % 30) // 10 == DREKKANA)
+    sthana = uchcha + ojayugma + kendradi + drekkana
+    
+    # Dig Bala: full at the planet's angle, none opposite it
+    dig = (180 - _separation(lon, batch.cusps[:, DIG_CUSP])) / 3
+    
+    # Kala Bala
+    day = _separation(lon[:, SUN], batch.cusps[:, 3])[:, None] / 3  # 60 at noon
+    nathonnatha = np.where(DIURNAL, day, 60 - day)
+    nathonnatha[:, MERCURY] = 60
+    waxing = _separation(lon[:, MOON], lon[:, SUN])[:, None] / 3
+    paksha = np.where(NATURAL_BENEFIC, waxing, 60 - waxing)
+    paksha[:, MOON] *= 2
+    tropical = np.radians(lon + batch.ayanamsa[:, None])
+    declination = np.degrees(np.arcsin(np.sin(np.radians(OBLIQUITY)) * np.sin(tropical)))
+    kranti = np.where(AYANA_SIDE == 0, np.abs(declination), AYANA_SIDE * declination)
+    ayana = (24 + kranti) / 48 * 60
+    ayana[:, SUN] *= 2
+    kala = nathonnatha + paksha + ayana
+    
+    # Chesta Bala from the motion state; the Sun and Moon take their
+    # Ayana and Paksha Bala instead
+    ratio = batch.speeds / MEAN_MOTION
+    chesta = np.select(
+        [ratio < 0, ratio < 0.1, ratio < 0.5, ratio < 0.9, ratio < 1.1, ratio < 1.5],
+        [60.0, 15.0, 15.0, 30.0, 7.5, 45.0],
+        default=30.0,
+    )
+    chesta[:, SUN] = ayana[:, SUN] / 2
+    chesta[:, MOON] = paksha[:, MOON] / 2
+    
+    naisargika = np.broadcast_to(NAISARGIKA, lon.shape).copy()
+    
+    # Drik Bala: a quarter of benefic minus malefic aspects received
+    weights = np.where(NATURAL_BENEFIC, 1.0, -1.0)
+    drik = np.einsum("a,nat->nt", weights, drishti(batch)) / 4
+    
+    return ShadbalaResult(sthana, dig, kala, chesta, naisargika, drik)
+
+
+def strength_report(batch: ChartBatch) -> List[Dict]:
+    """Per-chart Ashtakavarga and Shadbala keyed by planet value."""
+    av = ashtakavarga(batch)
+    sb = shadbala(batch)
+    total, rupas, strong = sb.total, sb.rupas, sb.is_strong
+    reports = []
+    for n in range(len(batch.longitudes)):
+        reports.append({
+            'ashtakavarga': {
+                planet.value: av.bhinna[n, p].tolist() for p, planet in enumerate(SEVEN_PLANETS)
+            },
+            'sarvashtakavarga': av.sarva[n].tolist(),
+            'shadbala': {
+                planet.value: {
+                    'sthana': float(sb.sthana[n, p]),
+                    'dig': float(sb.dig[n, p]),
+                    'kala': float(sb.kala[n, p]),
+                    'chesta': float(sb.chesta[n, p]),
+                    'naisargika': float(sb.naisargika[n, p]),
+                    'drik': float(sb.drik[n, p]),
+                    'total': float(total[n, p]),
+                    'rupas': float(rupas[n, p]),
+                    'is_strong': bool(strong[n, p]),
+                }
+                for p, planet in enumerate(SEVEN_PLANETS)
+            },
+        })
+    return reports
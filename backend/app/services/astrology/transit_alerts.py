@@ -0,0 +1,243 @@
+"""
+Nightly transit-to-natal alerts for every stored birth chart.
+
+The sky is computed twice per run, at the start and end of the day (UTC).
+Natal longitudes are streamed from ``planet_positions`` in chunks of charts
+as a ``(charts, planets)`` array, and a whole chunk is matched against the
+day's transits with array operations:
+
+- aspect alerts when a transit perfects an aspect to a natal planet during
+  the day (the signed distance to the exact aspect changes sign);
+- ingress alerts when a transit planet (other than the fast Moon) changes
+  sign, with the house it enters counted from the natal Moon;
+- dasha alerts when a mahadasha starts that day (one INSERT ... SELECT).
+
+Alerts for the day are cleared first, so a rerun replaces rather than
+duplicates them.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.astrology import (
+    BirthChartTable, ChartType, DashaLevel, DashaPeriodTable, Planet,
+    PlanetPositionTable, TransitAlertTable, ZodiacSign
+)
+from app.services.astrology.aspects import TRANSIT_ASPECTS
+from app.services.astrology.calculation_engine import VedicCalculator
+from app.services.astrology.current_sky import julian_day
+
+logger = logging.getLogger(__name__)
+
+PLANETS: Tuple[Planet, ...] = tuple(Planet)
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+SIGNS: Tuple[ZodiacSign, ...] = tuple(ZodiacSign)
+SIGN_INDEX = {sign: i for i, sign in enumerate(SIGNS)}
+MOON = PLANET_INDEX[Planet.MOON]
+
+# Each aspect is exact where wrap(transit - natal - offset) == 0; aspects
+# other than conjunction and opposition occur on both sides
+ASPECT_OFFSETS = np.array(
+    [angle for _, angle in TRANSIT_ASPECTS]
+    + [-angle for _, angle in TRANSIT_ASPECTS if 0 < angle < 180]
+)
+ASPECT_NAMES = (
+    [name for name, _ in TRANSIT_ASPECTS]
+    + [name for name, angle in TRANSIT_ASPECTS if 0 < angle < 180]
+)
+
+# No body moves anywhere near this far in a day; larger jumps in the signed
+# distance are wrap-arounds at +/-180, not crossings of the exact aspect
+_MAX_DAILY_MOTION = 90.0
+
+
+class NatalChunk(NamedTuple):
+    chart_ids: np.ndarray   # (charts,)
+    user_ids: np.ndarray    # (charts,)
+    longitudes: np.ndarray  # (charts, planets), NaN where unknown
+
+
+def _wrap(degrees: np.ndarray) -> np.ndarray:
+    """Map angles onto [-180, 180)."""
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+def transit_longitudes(jd: float, calculator: Optional[VedicCalculator] = None) -> np.ndarray:
+    """Sidereal longitudes of every planet at ``jd``, in ``PLANETS`` order."""
+    calculator = calculator or VedicCalculator()
+    ayanamsa = swe.get_ayanamsa_ut(jd)
+    longitudes = np.empty(len(PLANETS))
+    for planet in PLANETS:
+        if planet == Planet.KETU:
+            continue
+        longitudes[PLANET_INDEX[planet]] = calculator.sidereal_position(planet, jd, ayanamsa)[0]
+    longitudes[PLANET_INDEX[Planet.KETU]] = (longitudes[PLANET_INDEX[Planet.RAHU]] + 180) % 360
+    return longitudes
+
+
+def exact_aspects(
+    natal: np.ndarray, start: np.ndarray, end: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aspects that become exact between the ``start`` and ``end`` transits.
+
+    Returns index arrays ``(chart, natal_planet, transit_planet, aspect)``
+    into ``natal``'s rows, ``PLANETS`` and ``ASPECT_OFFSETS``. Intervals are
+    half-open, so an aspect exact at midnight is reported on one day only.
+    """
+    # (charts, natal planets, transit planets, aspects)
+    d0 = _wrap(start[None, None, :, None] - natal[:, :, None, None] - ASPECT_OFFSETS)
+    d1 = _wrap(end[None, None, :, None] - natal[:, :, None, None] - ASPECT_OFFSETS)
+    # NaN compares False on both sides, so unknown natal positions never match
+    crossed = ((d0 < 0) != (d1 < 0)) & (np.abs(d1 - d0) < _MAX_DAILY_MOTION)
+    return np.nonzero(crossed)
+
+
+def ingresses(start: np.ndarray, end: np.ndarray) -> List[Tuple[int, int]]:
+    """``(transit planet, new sign)`` for planets changing sign, Moon excluded."""
+    start_signs = (start // 30).astype(int)
+    end_signs = (end // 30).astype(int)
+    return [
+        (planet, int(end_signs[planet]))
+        for planet in np.nonzero(start_signs != end_signs)[0]
+        if planet != MOON
+    ]
+
+
+def iter_natal_chunks(db: Session, chunk_size: int) -> Iterator[NatalChunk]:
+    """Stream natal longitudes of all birth charts, ``chunk_size`` charts at a time."""
+    after = 0
+    while True:
+        charts = db.execute(
+            select(BirthChartTable.id, BirthChartTable.user_id)
+            .where(BirthChartTable.chart_type == ChartType.BIRTH, BirthChartTable.id > after)
+            .order_by(BirthChartTable.id)
+            .limit(chunk_size)
+        ).all()
+        if not charts:
+            return
+        
+        chart_ids = np.array([chart.id for chart in charts])
+        rows = db.execute(
+            select(
+                PlanetPositionTable.chart_id,
+                PlanetPositionTable.planet,
+                PlanetPositionTable.sign,
+                PlanetPositionTable.degree,
+            ).where(PlanetPositionTable.chart_id.in_(chart_ids.tolist()))
+        ).all()
+        
+        longitudes = np.full((len(charts), len(PLANETS)), np.nan)
+        if rows:
+            chart_index = np.searchsorted(chart_ids, [row.chart_id for row in rows])
+            planet_index = [PLANET_INDEX[row.planet] for row in rows]
+            longitudes[chart_index, planet_index] = [
+                SIGN_INDEX[row.sign] * 30 + row.degree for row in rows
+            ]
+        
+        yield NatalChunk(chart_ids, np.array([chart.user_id for chart in charts]), longitudes)
+        after = int(chart_ids[-1])
+
+
+def _alert_row(user_id, chart_id, day: date, kind: str, **fields) -> Dict:
+    # Every row carries every column so they go out as one executemany
+    return {
+        "user_id": int(user_id),
+        "chart_id": int(chart_id),
+        "alert_date": day,
+        "kind": kind,
+        "transit_planet": None,
+        "natal_planet": None,
+        "aspect": None,
+        "sign": None,
+        "house": None,
+        **fields,
+    }
+
+
+def chunk_alerts(
+    chunk: NatalChunk, day: date, start: np.ndarray, end: np.ndarray
+) -> List[Dict]:
+    """Alert rows for one chunk of charts."""
+    rows = []
+    charts, natal_planets, transit_planets, aspects = exact_aspects(chunk.longitudes, start, end)
+    for c, n, t, a in zip(charts, natal_planets, transit_planets, aspects):
+        rows.append(_alert_row(
+            chunk.user_ids[c], chunk.chart_ids[c], day, "aspect",
+            transit_planet=PLANETS[t],
+            natal_planet=PLANETS[n],
+            aspect=ASPECT_NAMES[a],
+        ))
+    
+    moon_signs = chunk.longitudes[:, MOON] // 30
+    has_moon = ~np.isnan(moon_signs)
+    for planet, sign in ingresses(start, end):
+        houses = (sign - moon_signs[has_moon]).astype(int) % 12 + 1
+        for chart_id, user_id, house in zip(
+            chunk.chart_ids[has_moon], chunk.user_ids[has_moon], houses
+        ):
+            rows.append(_alert_row(
+                user_id, chart_id, day, "ingress",
+                transit_planet=PLANETS[planet],
+                sign=SIGNS[sign],
+                house=int(house),
+            ))
+    return rows
+
+
+def _insert_dasha_alerts(db: Session, day: date) -> int:
+    """One INSERT ... SELECT for every mahadasha starting on ``day``."""
+    result = db.execute(
+        insert(TransitAlertTable).from_select(
+            ["user_id", "chart_id", "alert_date", "kind", "natal_planet"],
+            select(
+                BirthChartTable.user_id,
+                DashaPeriodTable.chart_id,
+                literal(day),
+                literal("dasha"),
+                DashaPeriodTable.planet,
+            )
+            .join(BirthChartTable, BirthChartTable.id == DashaPeriodTable.chart_id)
+            .where(
+                DashaPeriodTable.start_date == day,
+                DashaPeriodTable.level == DashaLevel.MAHADASHA,
+                BirthChartTable.chart_type == ChartType.BIRTH,
+            ),
+        )
+    )
+    return result.rowcount
+
+
+def run_transit_alerts(db: Session, day: date, chunk_size: int = 2000) -> Dict[str, int]:
+    """
+    Write the alerts for ``day`` for every birth chart.
+
+    Each chunk is committed on its own to keep transactions short.
+
+    Returns:
+        Counts of charts processed and alerts written, by kind.
+    """
+    calculator = VedicCalculator()
+    day_start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    start = transit_longitudes(julian_day(day_start), calculator)
+    end = transit_longitudes(julian_day(day_start + timedelta(days=1)), calculator)
+    
+    db.execute(delete(TransitAlertTable).where(TransitAlertTable.alert_date == day))
+    counts = {"charts": 0, "aspect": 0, "ingress": 0, "dasha": _insert_dasha_alerts(db, day)}
+    db.commit()
+    
+    for chunk in iter_natal_chunks(db, chunk_size):
+        rows = chunk_alerts(chunk, day, start, end)
+        if rows:
+            db.execute(insert(TransitAlertTable), rows)
+        db.commit()
+        counts["charts"] += len(chunk.chart_ids)
+        for row in rows:
+            counts[row["kind"]] += 1
+        logger.info(f"Processed {counts['charts']} charts")
+    return counts
@@ -0,0 +1,190 @@
+"""
+Live transit stream fan-out.
+
+One broadcaster task computes the sky once per tick (from the current-sky
+snapshot) and offers the frame to every subscribed connection. Each
+subscription keeps only the newest frame it hasn't sent yet, so a slow
+client skips intermediate ticks instead of growing a queue, and it diffs
+against what it has already sent, so it never loses a change. Connections
+that subscribe with a natal chart also get transit-to-natal aspect events
+when an aspect comes into or leaves orb.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.astrology.aspects import aspect_between
+
+logger = logging.getLogger(__name__)
+
+
+class TransitFrame(NamedTuple):
+    timestamp: str
+    positions: Dict[str, Dict]  # planet -> {longitude, sign, nakshatra, is_retrograde}
+
+
+def _current_sky():
+    from app.services.astrology.current_sky import current_sky
+    return current_sky
+
+
+class Subscription:
+    """One connection's view of the stream."""
+    
+    def __init__(self, natal: Optional[Dict[str, float]] = None, orb: float = 1.0):
+        self.natal = natal
+        self.orb = orb
+        self.dropped = 0
+        self._latest: Optional[TransitFrame] = None
+        self._ready = asyncio.Event()
+        self._sent: Dict[str, Dict] = {}
+        self._aspects: Dict[Tuple[str, str], str] = {}
+    
+    def offer(self, frame: TransitFrame) -> None:
+        """Replace any unsent frame with ``frame``; never blocks the broadcaster."""
+        if self._latest is not None:
+            self.dropped += 1
+        self._latest = frame
+        self._ready.set()
+    
+    async def next_frame(self) -> TransitFrame:
+        await self._ready.wait()
+        self._ready.clear()
+        frame, self._latest = self._latest, None
+        return frame
+    
+    def messages_for(self, frame: TransitFrame) -> List[Dict]:
+        """Messages bringing this connection up to date with ``frame``."""
+        messages = []
+        changes = {
+            planet: position for planet, position in frame.positions.items()
+            if self._sent.get(planet) != position
+        }
+        if changes:
+            self._sent.update(changes)
+            messages.append({
+                "type": "positions",
+                "timestamp": frame.timestamp,
+                "changes": changes,
+            })
+        if self.natal:
+            messages.extend(self._aspect_events(frame))
+        return messages
+    
+    def _aspect_events(self, frame: TransitFrame) -> List[Dict]:
+        active = {}
+        for transit_planet, position in frame.positions.items():
+            for natal_planet, natal_longitude in self.natal.items():
+                aspect = aspect_between(position["longitude"], natal_longitude, self.orb)
+                if aspect is not None:
+                    active[(transit_planet, natal_planet)] = aspect
+        
+        events = []
+        for pair in sorted(self._aspects.keys() | active.keys()):
+            before = self._aspects.get(pair)
+            after = active.get(pair)
+            if after is not None and before == after[0]:
+                continue
+            if before is not None:
+                events.append(self._aspect_event("end", pair, before, frame, None))
+            if after is not None:
+                events.append(self._aspect_event("begin", pair, after[0], frame, after[1]))
+        self._aspects = {pair: aspect[0] for pair, aspect in active.items()}
+        return events
+    
+    @staticmethod
+    def _aspect_event(
+        event: str,
+        pair: Tuple[str, str],
+        aspect_type: str,
+        frame: TransitFrame,
+        applied_orb: Optional[float],
+    ) -> Dict:
+        return {
+            "type": "aspect",
+            "event": event,
+            "timestamp": frame.timestamp,
+            "transit_planet": pair[0],
+            "natal_planet": pair[1],
+            "aspect": aspect_type,
+            "applied_orb": applied_orb,
+        }
+
+
+class TransitBroadcaster:
+    """
+    Compute one frame per tick and offer it to every subscription.
+
+    The tick task runs only while someone is subscribed. A new subscriber
+    gets the latest frame straight away rather than waiting for the next
+    tick.
+    """
+    
+    def __init__(
+        self,
+        tick_seconds: float = settings.TRANSIT_STREAM_TICK_SECONDS,
+        precision: int = settings.TRANSIT_STREAM_PRECISION,
+        sky_factory: Callable = _current_sky,
+    ):
+        self.tick_seconds = tick_seconds
+        self.precision = precision
+        self._sky_factory = sky_factory
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.latest: Optional[TransitFrame] = None
+    
+    def subscribe(
+        self, natal: Optional[Dict[str, float]] = None, orb: float = settings.TRANSIT_ASPECT_ORB
+    ) -> Subscription:
+        subscription = Subscription(natal=natal, orb=orb)
+        self._subscribers.add(subscription)
+        if self.latest is not None:
+            subscription.offer(self.latest)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.latest = None
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def compute_frame(self) -> TransitFrame:
+        """Positions for now, rounded so sub-precision motion isn't sent."""
+        positions = self._sky_factory().positions()
+        return TransitFrame(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            positions={
+                getattr(planet, "value", planet): {
+                    "longitude": round(position["longitude"], self.precision),
+                    "sign": getattr(position["sign"], "value", position["sign"]),
+                    "nakshatra": position["nakshatra"]["name"],
+                    "is_retrograde": position["is_retrograde"],
+                }
+                for planet, position in positions.items()
+            },
+        )
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                frame = await loop.run_in_executor(None, self.compute_frame)
+            except Exception:
+                logger.exception("Transit frame computation failed")
+            else:
+                self.latest = frame
+                for subscription in list(self._subscribers):
+                    subscription.offer(frame)
+            await asyncio.sleep(self.tick_seconds)
+
+
+transit_broadcaster = TransitBroadcaster()
@@ -0,0 +1,167 @@
+"""
+Yoga rule declarations for the compiled yoga engine.
+
+Each rule is a dict with a ``name``, a ``description`` and either ``all``
+and/or ``none`` clause lists or ``any``, a list of alternatives each with
+its own ``all``/``none``. A clause is one pattern or a list of patterns
+(any of which may hold); a pattern is an atom from ``yogas.FAMILIES`` such
+as ``("house", "jupiter", 10)``, where tuple keys mean "any of".
+"""
+from typing import Dict, List
+
+KENDRAS = (1, 4, 7, 10)
+TRIKONAS = (1, 5, 9)
+DUSTHANAS = (6, 8, 12)
+UPACHAYAS = (3, 6, 10, 11)
+
+BENEFICS = ("mercury", "jupiter", "venus")
+MALEFICS = ("sun", "mars", "saturn", "rahu", "ketu")
+# Planets counted in the lunar yogas (not the Sun or the nodes)
+TARA_GRAHAS = ("mars", "mercury", "jupiter", "venus", "saturn")
+ALL_PLANETS = (
+    "sun", "moon", "mars", "mercury", "jupiter", "venus", "saturn", "rahu", "ketu",
+)
+
+
+def _mahapurusha(name: str, planet: str, signs: tuple) -> Dict:
+    return {
+        "name": name,
+        "description": f"{planet.title()} in a kendra in its own or exaltation sign",
+        "all": [("house", planet, KENDRAS), ("sign", planet, signs)],
+    }
+
+
+def _vipareeta(name: str, house: int) -> Dict:
+    return {
+        "name": name,
+        "description": f"Lord of the {house}th in a dusthana",
+        "all": [("lord_house", house, DUSTHANAS)],
+    }
+
+
+YOGA_RULES: List[Dict] = [
+    # Pancha Mahapurusha
+    _mahapurusha("Ruchaka", "mars", ("aries", "scorpio", "capricorn")),
+    _mahapurusha("Bhadra", "mercury", ("gemini", "virgo")),
+    _mahapurusha("Hamsa", "jupiter", ("sagittarius", "pisces", "cancer")),
+    _mahapurusha("Malavya", "venus", ("taurus", "libra", "pisces")),
+    _mahapurusha("Sasa", "saturn", ("capricorn", "aquarius", "libra")),
+    
+    # Lunar yogas
+    {
+        "name": "Gaja Kesari",
+        "description": "Jupiter in a kendra from the Moon",
+        "all": [("moon_house", "jupiter", KENDRAS)],
+    },
+    {
+        "name": "Sunapha",
+        "description": "A planet other than the Sun or nodes in the 2nd from the Moon",
+        "all": [("moon_house", TARA_GRAHAS, 2)],
+        "none": [("moon_house", TARA_GRAHAS, 12)],
+    },
+    {
+        "name": "Anapha",
+        "description": "A planet other than the Sun or nodes in the 12th from the Moon",
+        "all": [("moon_house", TARA_GRAHAS, 12)],
+        "none": [("moon_house", TARA_GRAHAS, 2)],
+    },
+    {
+        "name": "Durudhara",
+        "description": "Planets other than the Sun or nodes on both sides of the Moon",
+        "all": [("moon_house", TARA_GRAHAS, 2), ("moon_house", TARA_GRAHAS, 12)],
+    },
+    {
+        "name": "Kemadruma",
+        "description": "No planet other than the Sun or nodes with or beside the Moon",
+        "none": [("moon_house", TARA_GRAHAS, (1, 2, 12))],
+    },
+    {
+        "name": "Adhi",
+        "description": "Mercury, Jupiter and Venus in the 6th, 7th or 8th from the Moon",
+        "all": [("moon_house", planet, (6, 7, 8)) for planet in BENEFICS],
+    },
+    {
+        "name": "Chandra-Mangala",
+        "description": "Moon conjunct Mars",
+        "all": [("conjunct", "moon", "mars")],
+    },
+    
+    # Conjunctions
+    {
+        "name": "Budha-Aditya",
+        "description": "Sun conjunct Mercury",
+        "all": [("conjunct", "sun", "mercury")],
+    },
+    {
+        "name": "Guru-Chandala",
+        "description": "Jupiter conjunct Rahu or Ketu",
+        "all": [("conjunct", "jupiter", ("rahu", "ketu"))],
+    },
+    
+    # Houses from the ascendant
+    {
+        "name": "Amala",
+        "description": "A benefic in the 10th from the ascendant or the Moon",
+        "all": [[("house", BENEFICS, 10), ("moon_house", BENEFICS, 10)]],
+    },
+    {
+        "name": "Shubha Kartari",
+        "description": "Benefics in the 2nd and 12th",
+        "all": [("house", BENEFICS, 2), ("house", BENEFICS, 12)],
+    },
+    {
+        "name": "Papa Kartari",
+        "description": "Malefics in the 2nd and 12th",
+        "all": [("house", MALEFICS, 2), ("house", MALEFICS, 12)],
+    },
+    {
+        "name": "Vasumati",
+        "description": "Mercury, Jupiter and Venus in upachayas",
+        "all": [("house", planet, UPACHAYAS) for planet in BENEFICS],
+    },
+    {
+        "name": "Chatussagara",
+        "description": "Every kendra occupied",
+        "all": [("house", ALL_PLANETS, house) for house in KENDRAS],
+    },
+    
+    # Lordships
+    {
+        "name": "Raja",
+        "description": "Lords of a kendra and a trikona conjunct or in aspect",
+        "all": [[
+            ("lords_conjunct", (4, 7, 10), TRIKONAS),
+            ("lords_conjunct", 1, (5, 9)),
+            ("lords_aspect", (4, 7, 10), TRIKONAS),
+            ("lords_aspect", TRIKONAS, (4, 7, 10)),
+            ("lords_aspect", 1, (5, 9)),
+            ("lords_aspect", (5, 9), 1),
+        ]],
+    },
+    {
+        "name": "Dhana",
+        "description": "Lords of the 2nd or 11th conjunct the lord of a trikona",
+        "all": [[("lords_conjunct", (2, 11), TRIKONAS), ("lords_conjunct", 2, 11)]],
+    },
+    {
+        "name": "Lakshmi",
+        "description": "Lord of the 9th in a kendra or trikona, Venus strong in a kendra or trikona",
+        "all": [
+            ("lord_house", 9, KENDRAS + TRIKONAS),
+            ("sign", "venus", ("taurus", "libra", "pisces")),
+            ("house", "venus", KENDRAS + TRIKONAS),
+        ],
+    },
+    _vipareeta("Harsha", 6),
+    _vipareeta("Sarala", 8),
+    _vipareeta("Vimala", 12),
+    {
+        "name": "Parivartana",
+        "description": "Lords of two houses in each other's house",
+        "any": [
+            {"all": [("lord_house", first, second), ("lord_house", second, first)]}
+            for first in range(1, 13)
+            for second in range(first + 1, 13)
+        ],
+    },
+]
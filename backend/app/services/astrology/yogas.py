@@ -0,0 +1,273 @@
+"""
+Compiled yoga detection.
+
+Charts are encoded into a fixed vocabulary of boolean atoms, packed into
+64-bit words:
+
+- ``("sign", planet, sign)`` and ``("house", planet, house)``: placements,
+  houses counted whole-sign from the ascendant;
+- ``("moon_house", planet, house)``: house counted from the Moon;
+- ``("lords", planet, house)``: ``planet`` rules ``house``;
+- ``("lord_house", house, placed_in)``: the lord of ``house`` sits in
+  ``placed_in``;
+- ``("aspect", a, b)`` and ``("conjunct", a, b)``: graha drishti and
+  conjunction between planets;
+- ``("lords_conjunct", h1, h2)`` and ``("lords_aspect", h1, h2)``: the same
+  relations between the lords of two houses.
+
+Rules (see ``yoga_rules``) are declared as data and compiled once into
+clause bitmasks. A clause holds when a chart shares a bit with its mask
+(or, for ``none`` clauses, shares none); a term is an AND of clauses and a
+rule an OR of terms. Evaluating every rule for every chart is then a few
+array operations over ``(charts, clauses)``, ``(charts, terms)`` and
+``(charts, rules)``.
+"""
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.astrology import Planet, ZodiacSign
+
+YOGA_PLANETS: Tuple[Planet, ...] = (
+    Planet.SUN, Planet.MOON, Planet.MARS, Planet.MERCURY, Planet.JUPITER,
+    Planet.VENUS, Planet.SATURN, Planet.RAHU, Planet.KETU,
+)
+SEVEN_PLANETS = YOGA_PLANETS[:7]
+SIGNS: Tuple[ZodiacSign, ...] = tuple(ZodiacSign)
+HOUSES = tuple(range(1, 13))
+MOON = YOGA_PLANETS.index(Planet.MOON)
+
+# Index into YOGA_PLANETS of each sign's lord, Aries first
+SIGN_LORDS = np.array([2, 5, 3, 1, 0, 3, 5, 2, 4, 6, 6, 4])
+
+# Signs (counted from the planet) each planet aspects in full; the nodes
+# follow the common 5/7/9 convention
+_ASPECTED_SIGNS = {
+    Planet.MARS: (4, 7, 8),
+    Planet.JUPITER: (5, 7, 9),
+    Planet.SATURN: (3, 7, 10),
+    Planet.RAHU: (5, 7, 9),
+    Planet.KETU: (5, 7, 9),
+}
+
+
+def _aspect_table() -> np.ndarray:
+    """``[planet, sign offset]`` -> True where the planet aspects that sign."""
+    table = np.zeros((len(YOGA_PLANETS), 12), dtype=bool)
+    for p, planet in enumerate(YOGA_PLANETS):
+        table[p, np.array(_ASPECTED_SIGNS.get(planet, (7,))) - 1] = True
+    return table
+
+
+ASPECTS = _aspect_table()
+
+# Atom families in encoding order, with the domain of each key
+FAMILIES: Tuple[Tuple[str, Tuple, Tuple], ...] = (
+    ("sign", YOGA_PLANETS, SIGNS),
+    ("house", YOGA_PLANETS, HOUSES),
+    ("moon_house", YOGA_PLANETS, HOUSES),
+    ("lords", SEVEN_PLANETS, HOUSES),
+    ("lord_house", HOUSES, HOUSES),
+    ("aspect", YOGA_PLANETS, YOGA_PLANETS),
+    ("conjunct", YOGA_PLANETS, YOGA_PLANETS),
+    ("lords_conjunct", HOUSES, HOUSES),
+    ("lords_aspect", HOUSES, HOUSES),
+)
+
+
+def _atom_index() -> Dict[Tuple, int]:
+    index = {}
+    for family, first, second in FAMILIES:
+        for a, b in product(first, second):
+            index[(family, getattr(a, "value", a), getattr(b, "value", b))] = len(index)
+    return index
+
+
+ATOM_INDEX = _atom_index()
+WORDS = -(-len(ATOM_INDEX) // 64)
+
+
+class CompiledRules(NamedTuple):
+    names: List[str]
+    descriptions: List[str]
+    clause_masks: np.ndarray  # (clauses, WORDS) uint64
+    clause_negated: np.ndarray  # (clauses,) True for ``none`` clauses
+    word_clauses: List[Tuple[int, np.ndarray]]  # clauses with bits in each word
+    term_clauses: np.ndarray  # (terms, clauses) 0/1
+    term_sizes: np.ndarray    # (terms,) clauses per term
+    rule_terms: np.ndarray    # (rules, terms) 0/1
+
+
+def _pack(atoms: np.ndarray) -> np.ndarray:
+    """Pack ``(..., atoms)`` booleans into ``(..., WORDS)`` uint64 words."""
+    padded = np.zeros(atoms.shape[:-1] + (WORDS * 64,), dtype=bool)
+    padded[..., :atoms.shape[-1]] = atoms
+    return np.ascontiguousarray(np.packbits(padded, axis=-1)).view(np.uint64)
+
+
+def _one_hot(values: np.ndarray, size: int = 12) -> np.ndarray:
+    return values[..., None] == np.arange(size)
+
+
+def encode_signs(signs: np.ndarray, ascendant: np.ndarray) -> np.ndarray:
+    """
+    Encode a batch of charts.
+
+    Args:
+        signs: ``(charts, 9)`` sign index (0 = Aries) of each of ``YOGA_PLANETS``
+        ascendant: ``(charts,)`` sign index of the ascendant
+
+    Returns:
+        ``(charts, WORDS)`` packed atoms
+    """
+    n = len(signs)
+    houses = (signs - ascendant[:, None]) % 12
+    moon_houses = (signs - signs[:, MOON:MOON + 1]) % 12
+    lords = SIGN_LORDS[(ascendant[:, None] + np.arange(12)) % 12]  # (charts, houses)
+    lord_signs = np.take_along_axis(signs, lords, axis=1)
+    lord_houses = np.take_along_axis(houses, lords, axis=1)
+    
+    offsets = (signs[:, None, :] - signs[:, :, None]) % 12  # [chart, a, b]
+    aspects = ASPECTS[np.arange(len(YOGA_PLANETS))[None, :, None], offsets]
+    conjunct = (offsets == 0) & ~np.eye(len(YOGA_PLANETS), dtype=bool)
+    
+    families = [
+        _one_hot(signs),
+        _one_hot(houses),
+        _one_hot(moon_houses),
+        lords[:, None, :] == np.arange(7)[None, :, None],
+        _one_hot(lord_houses),
+        aspects,
+        conjunct,
+        lord_signs[:, :, None] == lord_signs[:, None, :],
+        aspects[np.arange(n)[:, None, None], lords[:, :, None], lords[:, None, :]],
+    ]
+    return _pack(np.concatenate([f.reshape(n, -1) for f in families], axis=1))
+
+
+def encode_charts(charts: Sequence[Dict]) -> np.ndarray:
+    """
+    Encode calculator output (``positions`` and ``houses``) for a batch of
+    charts; the ascendant is the first house cusp.
+    """
+    signs = np.empty((len(charts), len(YOGA_PLANETS)), dtype=int)
+    ascendant = np.empty(len(charts), dtype=int)
+    for n, chart in enumerate(charts):
+        positions = {getattr(k, "value", k): v for k, v in chart["positions"].items()}
+        for p, planet in enumerate(YOGA_PLANETS):
+            signs[n, p] = int(positions[planet.value]["longitude"] // 30) % 12
+        ascendant[n] = int(chart["houses"][0]["longitude"] // 30) % 12
+    return encode_signs(signs, ascendant)
+
+
+def _expand(pattern: Tuple) -> List[int]:
+    """Atom indices of a pattern; tuple keys are expanded as alternatives."""
+    family, *keys = pattern
+    choices = [key if isinstance(key, tuple) else (key,) for key in keys]
+    atoms = []
+    for combination in product(*choices):
+        key = (family,) + tuple(getattr(k, "value", k) for k in combination)
+        if key not in ATOM_INDEX:
+            raise ValueError(f"Unknown yoga atom {key}")
+        atoms.append(ATOM_INDEX[key])
+    return atoms
+
+
+def _clause_mask(clause) -> np.ndarray:
+    # A clause is one pattern or a list of patterns, any of which may hold
+    patterns = clause if isinstance(clause, list) else [clause]
+    atoms = np.zeros(len(ATOM_INDEX), dtype=bool)
+    for pattern in patterns:
+        atoms[_expand(pattern)] = True
+    return atoms
+
+
+def compile_rules(rules: Sequence[Dict]) -> CompiledRules:
+    """
+    Compile rule declarations.
+
+    A rule has ``all`` and/or ``none`` clause lists, or ``any``: a list of
+    such ``{"all": ..., "none": ...}`` alternatives.
+    """
+    masks, negated, terms, rule_terms = [], [], [], []
+    for rule in rules:
+        alternatives = rule.get("any") or [rule]
+        term_ids = []
+        for alternative in alternatives:
+            clause_ids = []
+            for key, negate in (("all", False), ("none", True)):
+                for clause in alternative.get(key, ()):
+                    clause_ids.append(len(masks))
+                    masks.append(_clause_mask(clause))
+                    negated.append(negate)
+            term_ids.append(len(terms))
+            terms.append(clause_ids)
+        rule_terms.append(term_ids)
+    
+    # float32 so the products below go through BLAS; counts stay exact
+    term_clauses = np.zeros((len(terms), len(masks)), dtype=np.float32)
+    for t, clause_ids in enumerate(terms):
+        term_clauses[t, clause_ids] = 1
+    rule_matrix = np.zeros((len(rules), len(terms)), dtype=np.float32)
+    for r, term_ids in enumerate(rule_terms):
+        rule_matrix[r, term_ids] = 1
+    clause_masks = _pack(np.array(masks).reshape(len(masks), len(ATOM_INDEX)))
+    word_clauses = [
+        (word, np.nonzero(clause_masks[:, word])[0]) for word in range(WORDS)
+    ]
+    return CompiledRules(
+        names=[rule["name"] for rule in rules],
+        descriptions=[rule.get("description", "") for rule in rules],
+        clause_masks=clause_masks,
+        clause_negated=np.array(negated, dtype=bool),
+        word_clauses=[(word, clauses) for word, clauses in word_clauses if len(clauses)],
+        term_clauses=term_clauses,
+        term_sizes=term_clauses.sum(axis=1),
+        rule_terms=rule_matrix,
+    )
+
+
+@lru_cache(maxsize=None)
+def default_rules() -> CompiledRules:
+    from app.services.astrology.yoga_rules import YOGA_RULES
+    return compile_rules(YOGA_RULES)
+
+
+# Up to this many charts, clauses are matched against every word at once;
+# beyond it the (charts, clauses, words) intermediate gets too large
+_BROADCAST_CHARTS = 64
+
+
+def _clause_hits(encoded: np.ndarray, rules: CompiledRules) -> np.ndarray:
+    if len(encoded) <= _BROADCAST_CHARTS:
+        return (encoded[:, None, :] & rules.clause_masks[None, :, :]).any(axis=2)
+    # Word by word, touching only the clauses with bits in that word
+    hits = np.zeros((len(encoded), len(rules.clause_masks)), dtype=bool)
+    for word, clauses in rules.word_clauses:
+        hits[:, clauses] |= (encoded[:, word:word + 1] & rules.clause_masks[clauses, word]) != 0
+    return hits
+
+
+def evaluate(encoded: np.ndarray, rules: CompiledRules) -> np.ndarray:
+    """``(charts, rules)`` booleans: which yogas each encoded chart has."""
+    hits = _clause_hits(encoded, rules)
+    satisfied = hits != rules.clause_negated
+    terms = satisfied.astype(np.float32) @ rules.term_clauses.T == rules.term_sizes
+    return terms.astype(np.float32) @ rules.rule_terms.T > 0
+
+
+def find_yogas(
+    charts: Sequence[Dict], rules: Optional[CompiledRules] = None
+) -> List[List[Dict]]:
+    """Yogas present in each chart, as ``{"name", "description"}`` entries."""
+    rules = rules or default_rules()
+    found = evaluate(encode_charts(charts), rules)
+    return [
+        [
+            {'name': rules.names[r], 'description': rules.descriptions[r]}
+            for r in np.nonzero(row)[0]
+        ]
+        for row in found
+    ]
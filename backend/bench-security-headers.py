@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the security-headers middleware.
+
+Drives a minimal Starlette app in-process (no sockets, no server) and
+reports requests per second with no middleware, with the previous
+``@app.middleware("http")`` implementation, and with the pure ASGI
+``SecurityHeadersMiddleware``:
+
+    python bench-security-headers.py
+    python bench-security-headers.py --requests 50000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.middleware import DEFAULT_SECURITY_HEADERS, SecurityHeadersMiddleware
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/",
+    "raw_path": b"/",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 1234),
+    "server": ("bench", 80),
+}
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def make_app():
+    return Starlette(routes=[Route("/", endpoint)])
+
+
+async def call_next_headers(request, call_next):
+    """The middleware previously registered with @app.middleware("http")."""
+    response = await call_next(request)
+    for name, value in DEFAULT_SECURITY_HEADERS:
+        response.headers[name] = value
+    return response
+
+
+async def run(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(requests, 500)):  # warm up
+        await app(dict(SCOPE), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    baseline = make_app()
+    wrapped = make_app()
+    wrapped.add_middleware(BaseHTTPMiddleware, dispatch=call_next_headers)
+    pure = make_app()
+    pure.add_middleware(SecurityHeadersMiddleware)
+
+    for label, app in (
+        ("no middleware", baseline),
+        ("@app.middleware('http')", wrapped),
+        ("SecurityHeadersMiddleware", pure),
+    ):
+        rps = asyncio.run(run(app, args.requests))
+        logger.info(f"  {label:28s} {rps:10,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pick the bcrypt cost for a target hash time on this machine.
+
+Times bcrypt at increasing rounds and recommends the highest cost whose
+median hash time stays within the target. Run it on the production
+hardware and set the result as PASSWORD_BCRYPT_ROUNDS; existing hashes are
+upgraded (or downgraded) the next time each user logs in.
+
+    python calibrate-bcrypt.py
+    python calibrate-bcrypt.py --target-ms 100 --samples 7
+"""
+import argparse
+import logging
+import statistics
+import time
+from typing import Dict
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 20
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median seconds to hash a password at the given bcrypt cost."""
+    from passlib.hash import bcrypt
+
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target_seconds: float, samples: int) -> Dict[int, float]:
+    """Time each cost from MIN_ROUNDS until one exceeds the target."""
+    results = {}
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        results[rounds] = time_rounds(rounds, samples)
+        if results[rounds] > target_seconds:
+            break
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="maximum time per hash (default: 250)")
+    parser.add_argument("--samples", type=int, default=5,
+                        help="hashes timed per cost (default: 5)")
+    args = parser.parse_args()
+
+    results = calibrate(args.target_ms / 1000, args.samples)
+    for rounds, seconds in results.items():
+        logger.info(f"  rounds={rounds:2d}  {seconds * 1000:8.1f} ms")
+
+    within = [r for r, seconds in results.items() if seconds <= args.target_ms / 1000]
+    if not within:
+        logger.warning(f"Even rounds={MIN_ROUNDS} exceeds {args.target_ms:.0f} ms")
+        return
+    logger.info(f"\nPASSWORD_BCRYPT_ROUNDS={max(within)}")
+
+
+if __name__ == "__main__":
+    main()
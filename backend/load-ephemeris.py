@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Fill the precomputed ephemeris table, one year per worker process.
+
+Each year is computed in a worker and COPYed into its own partition,
+replacing whatever the partition held, so interrupted loads can be rerun:
+
+    python load-ephemeris.py
+    python load-ephemeris.py --start-year 1990 --end-year 2030 --step-hours 1 --workers 8
+"""
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.db.session import get_engine
+from app.services.astrology.ephemeris import (
+    FIRST_YEAR, LAST_YEAR, compute_year, copy_year
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def load_year(year: int, step_hours: int) -> int:
+    # Runs in a worker process, with its own engine
+    return copy_year(get_engine(), compute_year(year, step_hours))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--start-year", type=int, default=FIRST_YEAR,
+                        help=f"first year to load (default: {FIRST_YEAR})")
+    parser.add_argument("--end-year", type=int, default=LAST_YEAR,
+                        help=f"last year to load, inclusive (default: {LAST_YEAR})")
+    parser.add_argument("--step-hours", type=int, default=24, choices=(1, 24),
+                        help="1 for hourly, 24 for daily positions (default: 24)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    
+    if not FIRST_YEAR <= args.start_year <= args.end_year <= LAST_YEAR:
+        parser.error(f"years must lie within {FIRST_YEAR}-{LAST_YEAR}")
+    
+    years = range(args.start_year, args.end_year + 1)
+    total = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(load_year, year, args.step_hours): year for year in years}
+        for future in as_completed(futures):
+            rows = future.result()
+            total += rows
+            logger.info(f"{futures[future]}: {rows} rows")
+    logger.info(f"Loaded {len(years)} years, {total} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Report where import time goes when the API starts.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+(so nothing is already cached in sys.modules) and prints the slowest
+imports by cumulative and by self time. Use it to check cold-start cost
+before deploying to Netlify:
+
+    python profile-imports.py
+    python profile-imports.py --module app.api.api_v1.endpoints.charts --top 15
+"""
+import argparse
+import logging
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, NamedTuple
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def profile_imports(module: str) -> List[ImportTiming]:
+    """Import ``module`` in a subprocess and parse the -X importtime output."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        logger.error(result.stderr.splitlines()[-1] if result.stderr else "import failed")
+        sys.exit(result.returncode)
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    args = parser.parse_args()
+
+    timings = profile_imports(args.module)
+    total_us = sum(t.self_us for t in timings)
+    logger.info(f"Importing {args.module}: {total_us / 1000:.1f} ms, {len(timings)} modules\n")
+
+    # Top-level packages only, so a slow package isn't listed once per submodule
+    packages = {}
+    for t in timings:
+        root = t.module.split(".")[0]
+        packages[root] = packages.get(root, 0) + t.self_us
+    logger.info("Slowest packages (self time, all submodules):")
+    for root, us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        logger.info(f"  {us / 1000:8.1f} ms  {root}")
+
+    logger.info("\nSlowest single modules (self / cumulative):")
+    for t in sorted(timings, key=lambda t: -t.self_us)[:args.top]:
+        logger.info(
+            f"  {t.self_us / 1000:8.1f} ms {t.cumulative_us / 1000:8.1f} ms  {t.module}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Write the day's transit-to-natal alerts for every birth chart.
+
+Meant to run nightly from cron (or any scheduler) shortly after 00:00 UTC:
+
+    python run-transit-alerts.py
+    python run-transit-alerts.py --date 2026-10-20 --chunk-size 1000
+"""
+import argparse
+import logging
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.db.session import get_db_session
+from app.services.astrology.transit_alerts import run_transit_alerts
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--date", type=date.fromisoformat,
+                        default=datetime.now(timezone.utc).date(),
+                        help="day to evaluate, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--chunk-size", type=int, default=2000,
+                        help="charts matched per batch (default: 2000)")
+    args = parser.parse_args()
+
+    db = get_db_session()
+    try:
+        counts = run_transit_alerts(db, args.date, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    logger.info(
+        f"{args.date}: {counts['charts']} charts, {counts['aspect']} aspect, "
+        f"{counts['ingress']} ingress and {counts['dasha']} dasha alerts"
+    )
+
+
+if __name__ == "__main__":
+    main()
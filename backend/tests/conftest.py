@@ -0,0 +1,59 @@
+"""
+Shared pytest fixtures for the backend.
+"""
+from typing import Generator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Engine for the configured database; DB tests are skipped if it is unreachable."""
+    engine = create_engine(settings.DATABASE_URI, pool_pre_ping=True)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine) -> Generator[Session, None, None]:
+    """
+    Session bound to an outer transaction that is rolled back after the test.
+    
+    Commits made by CRUD helpers become savepoint releases, so nothing leaks
+    between tests.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def owner(db):
+    """A user to own the test charts."""
+    # Imported here so suites without DB fixtures don't need the models
+    from app.models.user import UserTable
+    
+    user = UserTable(
+        email="charts@example.com",
+        username="charts",
+        hashed_password="x",
+    )
+    db.add(user)
+    db.flush()
+    return user
@@ -0,0 +1,339 @@
+"""
+Tests for the birth chart CRUD operations.
+"""
+from datetime import date, time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.crud.birth_chart import birth_chart, build_chart_facts
+from app.models.astrology import (
+    DashaLevel, Planet, PlanetPlacementFilter, PlanetPositionTable, ZodiacSign
+)
+from app.schemas.birth_chart import BirthChartCreate
+from tests.utils import assert_max_queries, count_queries, make_chart
+
+
+def _calculation(retrograde: bool = False):
+    """Minimal calculator output: Moon in Rohini in the 2nd house."""
+    return {
+        "positions": {
+            Planet.MOON: {
+                "longitude": 40.0,
+                "sign": ZodiacSign.TAURUS,
+                "nakshatra": {"name": "Rohini", "pada": 1},
+                "is_retrograde": retrograde,
+            },
+        },
+        "houses": [
+            {"house_number": i + 1, "longitude": i * 30.0,
+             "sign": list(ZodiacSign)[i]}
+            for i in range(12)
+        ],
+        "aspects": [],
+        "dasha_periods": [
+            {"planet": Planet.MOON, "start_date": date(1990, 6, 15),
+             "end_date": date(1996, 6, 15)},
+        ],
+    }
+
+
+def _chart_in(name: str):
+    return BirthChartCreate(
+        name=name,
+        birth_date=date(1990, 6, 15),
+        birth_time=time(12, 0),
+        timezone="Asia/Kolkata",
+        latitude=19.076,
+        longitude=72.8777,
+        ayanamsa=23.7,
+    )
+
+
+class TestChartListing:
+    """Listing charts must not issue per-chart relationship queries."""
+    
+    def test_get_multi_by_owner_batches_children(self, db, owner):
+        for i in range(20):
+            make_chart(db, owner.id, f"Chart {i}")
+        db.flush()
+        db.expire_all()
+        
+        # One query for the charts, one per relationship.
+        with assert_max_queries(db, 5):
+            charts = birth_chart.get_multi_by_owner(db, owner_id=owner.id)
+            for chart in charts:
+                assert len(chart.planet_positions) == 1
+                assert len(chart.houses) == 1
+                assert len(chart.aspects) == 1
+                assert len(chart.dasha_periods) == 1
+        
+        assert len(charts) == 20
+    
+    def test_get_multi_by_owner_without_children(self, db, owner):
+        for i in range(5):
+            make_chart(db, owner.id, f"Chart {i}")
+        db.flush()
+        db.expire_all()
+        
+        with assert_max_queries(db, 1):
+            charts = birth_chart.get_multi_by_owner(
+                db, owner_id=owner.id, load_children=False
+            )
+        assert len(charts) == 5
+
+
+class TestBulkCreate:
+    """Bulk persistence of charts with their child rows."""
+    
+    def test_create_many_with_children(self, db, owner):
+        calculation = _calculation()
+        charts = [(_chart_in(f"Import {i}"), calculation) for i in range(10)]
+        
+        # Chart INSERT plus one batched INSERT per non-empty child table.
+        with assert_max_queries(db, 4):
+            chart_ids = birth_chart.create_many_with_children(
+                db, charts=charts, owner_id=owner.id
+            )
+        
+        assert len(chart_ids) == 10
+        chart = birth_chart.get(db, id=chart_ids[0])
+        assert chart.planet_positions[0].house == 2
+        assert len(chart.houses) == 12
+        # The Moon mahadasha plus the six of its antardashas after birth
+        levels = [d.level for d in chart.dasha_periods]
+        assert levels.count(DashaLevel.MAHADASHA) == 1
+        assert levels.count(DashaLevel.ANTARDASHA) == 6
+
+
+class TestPlacementFilter:
+    """Content queries over the indexed chart facts."""
+    
+    def test_build_chart_facts(self):
+        facts = build_chart_facts(_calculation(retrograde=True))
+        assert facts == {
+            "planets": {
+                "moon": {
+                    "sign": "taurus",
+                    "nakshatra": "Rohini",
+                    "house": 2,
+                    "retrograde": True,
+                }
+            }
+        }
+    
+    def test_filter_by_placements(self, db, owner):
+        direct, retro = birth_chart.create_many_with_children(
+            db,
+            charts=[
+                (_chart_in("Direct"), _calculation()),
+                (_chart_in("Retrograde"), _calculation(retrograde=True)),
+            ],
+            owner_id=owner.id,
+        )
+        
+        in_rohini = birth_chart.filter_by_placements(
+            db,
+            owner_id=owner.id,
+            placements=[PlanetPlacementFilter(planet=Planet.MOON, nakshatra="Rohini")],
+        )
+        assert [c.id for c in in_rohini] == [direct, retro]
+        
+        retrograde_in_2nd = birth_chart.filter_by_placements(
+            db,
+            owner_id=owner.id,
+            placements=[
+                PlanetPlacementFilter(planet=Planet.MOON, house=2, is_retrograde=True)
+            ],
+        )
+        assert [c.id for c in retrograde_in_2nd] == [retro]
+    
+    def test_api_created_chart_is_searchable(self, db, owner):
+        # generate_chart stores the calculation in its JSON form
+        calculation = jsonable_encoder(_calculation())
+        chart_in = BirthChartCreate(
+            **{
+                **_chart_in("From the API").dict(),
+                "planetary_positions": calculation["positions"],
+                "houses": calculation["houses"],
+            }
+        )
+        chart = birth_chart.create_with_owner(db, obj_in=chart_in, owner_id=owner.id)
+        
+        found = birth_chart.filter_by_placements(
+            db,
+            owner_id=owner.id,
+            placements=[PlanetPlacementFilter(planet=Planet.MOON, house=2, nakshatra="Rohini")],
+        )
+        assert [c.id for c in found] == [chart.id]
+
+
+class TestDashaSearch:
+    """Date-range queries over stored dasha periods."""
+    
+    def test_get_multi_in_dasha(self, db, owner):
+        moon, other = birth_chart.create_many_with_children(
+            db,
+            charts=[(_chart_in("Moon"), _calculation()), (_chart_in("None"), {})],
+            owner_id=owner.id,
+        )
+        
+        # Moon mahadasha runs [1990-06-15, 1996-06-15)
+        in_moon = birth_chart.get_multi_in_dasha(
+            db, owner_id=owner.id, on=date(1995, 1, 1), mahadasha=[Planet.MOON]
+        )
+        assert [c.id for c in in_moon] == [moon]
+        assert birth_chart.get_multi_in_dasha(
+            db, owner_id=owner.id, on=date(1996, 6, 15), mahadasha=[Planet.MOON]
+        ) == []
+        
+        # Moon/Jupiter antardasha is running at birth
+        on = date(1990, 7, 1)
+        assert [c.id for c in birth_chart.get_multi_in_dasha(
+            db, owner_id=owner.id, on=on,
+            mahadasha=[Planet.SATURN], antardasha=[Planet.JUPITER],
+        )] == [moon]
+        assert birth_chart.get_multi_in_dasha(
+            db, owner_id=owner.id, on=on,
+            mahadasha=[Planet.SATURN], antardasha=[Planet.JUPITER], match_all=True,
+        ) == []
+        assert birth_chart.get_multi_in_dasha(db, owner_id=owner.id, on=on) == []
+
+
+class TestPrimaryChart:
+    """Primary-chart switching is one statement in one transaction."""
+    
+    def test_set_primary_chart_swaps_flag(self, db, owner):
+        first = make_chart(db, owner.id, "First")
+        second = make_chart(db, owner.id, "Second")
+        db.flush()
+        birth_chart.set_primary_chart(db, chart_id=first.id, user_id=owner.id)
+        
+        with count_queries(db) as counter:
+            birth_chart._switch_primary_chart(
+                db, owner_id=owner.id, chart_id=second.id
+            )
+        assert counter.count == 1
+        
+        primary = birth_chart.get_primary_chart(db, owner_id=owner.id)
+        assert primary.id == second.id
+    
+    def test_switch_expires_only_updated_charts(self, db, owner):
+        first = make_chart(db, owner.id, "First")
+        second = make_chart(db, owner.id, "Second")
+        bystander = make_chart(db, owner.id, "Bystander")
+        db.flush()
+        
+        birth_chart._switch_primary_chart(db, owner_id=owner.id, chart_id=first.id)
+        assert "is_primary" in inspect(first).expired_attributes
+        assert "is_primary" not in inspect(second).expired_attributes
+        assert "is_primary" not in inspect(bystander).expired_attributes
+    
+    def test_set_primary_chart_rejects_foreign_chart(self, db, owner):
+        mine = make_chart(db, owner.id, "Mine")
+        db.flush()
+        birth_chart.set_primary_chart(db, chart_id=mine.id, user_id=owner.id)
+        
+        assert birth_chart.set_primary_chart(
+            db, chart_id=mine.id + 1000, user_id=owner.id
+        ) is None
+        assert birth_chart.get_primary_chart(db, owner_id=owner.id).id == mine.id
+    
+    def test_create_primary_chart_demotes_previous(self, db, owner):
+        old = birth_chart.create_with_owner(
+            db, obj_in=_chart_in("Old").copy(update={"is_primary": True}),
+            owner_id=owner.id,
+        )
+        new = birth_chart.create_with_owner(
+            db, obj_in=_chart_in("New").copy(update={"is_primary": True}),
+            owner_id=owner.id,
+        )
+        
+        db.refresh(old)
+        assert not old.is_primary
+        assert new.is_primary
+
+
+class TestPartialUpdate:
+    """Updates write only changed columns and skip the refresh round trip."""
+    
+    def test_update_notes_is_single_statement(self, db, owner):
+        chart = make_chart(db, owner.id, "Notes")
+        db.flush()
+        
+        with count_queries(db) as counter:
+            birth_chart.update(db, db_obj=chart, obj_in={"notes": "Saturn return"})
+            assert chart.notes == "Saturn return"
+        
+        assert counter.count == 1
+        statement = counter.statements[0]
+        assert statement.startswith("UPDATE birth_charts SET")
+        assert "notes=" in statement
+        assert "name=" not in statement
+    
+    def test_update_rejects_stale_version(self, db, owner):
+        chart = make_chart(db, owner.id, "Stale")
+        db.flush()
+        seen_at = chart.updated_at
+        birth_chart.update(db, db_obj=chart, obj_in={"notes": "first"})
+        
+        with pytest.raises(StaleDataError):
+            birth_chart.update(
+                db, db_obj=chart, obj_in={"notes": "second"},
+                expected_updated_at=seen_at,
+            )
+    
+    def test_promote_only_update_checks_version(self, db, owner):
+        primary = birth_chart.create_with_owner(
+            db, obj_in=_chart_in("Primary").copy(update={"is_primary": True}),
+            owner_id=owner.id,
+        )
+        other = birth_chart.create_with_owner(
+            db, obj_in=_chart_in("Other"), owner_id=owner.id
+        )
+        seen_at = other.updated_at
+        birth_chart.update(db, db_obj=other, obj_in={"notes": "edited elsewhere"})
+        
+        with pytest.raises(StaleDataError):
+            birth_chart.update(
+                db, db_obj=other, obj_in={"is_primary": True},
+                expected_updated_at=seen_at,
+            )
+        assert birth_chart.get_primary_chart(db, owner_id=owner.id).id == primary.id
+
+
+class TestBulkDelete:
+    """Deletes rely on ON DELETE CASCADE instead of ORM-side cascades."""
+    
+    def test_remove_cascades_in_one_delete(self, db, owner):
+        chart = make_chart(db, owner.id, "Doomed")
+        db.flush()
+        chart_id = chart.id
+        db.expire_all()
+        
+        with count_queries(db) as counter:
+            removed = birth_chart.remove(db, id=chart_id)
+        
+        # One SELECT for the snapshot, one DELETE; readable after the commit
+        assert counter.count == 2
+        assert (removed.id, removed.name) == (chart_id, "Doomed")
+        assert db.scalar(
+            select(func.count()).select_from(PlanetPositionTable)
+            .where(PlanetPositionTable.chart_id == chart_id)
+        ) == 0
+    
+    def test_remove_many_by_owner(self, db, owner):
+        charts = [make_chart(db, owner.id, f"Chart {i}") for i in range(3)]
+        db.flush()
+        
+        with count_queries(db) as counter:
+            deleted = birth_chart.remove_many_by_owner(
+                db, owner_id=owner.id, ids=[charts[0].id, charts[1].id]
+            )
+        assert deleted == 2
+        assert counter.count == 1
+        
+        assert birth_chart.remove_many_by_owner(db, owner_id=owner.id) == 1
+        assert birth_chart.get_multi_by_owner(db, owner_id=owner.id) == []
@@ -0,0 +1,74 @@
+"""
+EXPLAIN-based checks that chart queries are served by their indexes.
+
+Sequential scans are disabled for the transaction so the planner picks an
+index whenever one is usable, regardless of how few rows the test inserts.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.crud.birth_chart import birth_chart
+from app.models.astrology import ChartType, Planet
+from tests.utils import count_queries, explain, make_chart
+
+
+@pytest.fixture(autouse=True)
+def no_seqscan(db):
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+
+
+def _plan_for(db, run) -> str:
+    with count_queries(db) as counter:
+        run()
+    statement, parameters = counter.executed[-1]
+    return explain(db, statement, parameters)
+
+
+class TestChartIndexes:
+    """Each CRUDBirthChart query pattern has a matching index."""
+    
+    def test_primary_chart_uses_partial_index(self, db, owner):
+        plan = _plan_for(
+            db, lambda: birth_chart.get_primary_chart(db, owner_id=owner.id)
+        )
+        assert "uq_birth_charts_user_id_primary" in plan
+    
+    def test_chart_type_uses_composite_index(self, db, owner):
+        plan = _plan_for(
+            db,
+            lambda: birth_chart.get_by_chart_type(
+                db, owner_id=owner.id, chart_type=ChartType.NAVAMSA
+            ),
+        )
+        assert "ix_birth_charts_user_id_chart_type" in plan
+    
+    def test_search_uses_trigram_indexes(self, db, owner):
+        make_chart(db, owner.id, "Rohini client")
+        db.flush()
+        plan = _plan_for(
+            db, lambda: birth_chart.search(db, owner_id=owner.id, query="rohini")
+        )
+        assert "ix_birth_charts_name_trgm" in plan
+        assert "ix_birth_charts_notes_trgm" in plan
+    
+    def test_dasha_search_uses_range_index(self, db, owner):
+        make_chart(db, owner.id, "Moon dasha")
+        db.flush()
+        plan = _plan_for(
+            db,
+            lambda: birth_chart.get_multi_in_dasha(
+                db, owner_id=owner.id, on=date(1992, 1, 1), mahadasha=[Planet.MOON]
+            ),
+        )
+        assert "ix_dasha_periods_level_period" in plan or "ix_dasha_periods_planet_level" in plan
+    
+    def test_primary_chart_is_unique_per_owner(self, db, owner):
+        first = make_chart(db, owner.id, "First")
+        second = make_chart(db, owner.id, "Second")
+        first.is_primary = True
+        second.is_primary = True
+        with pytest.raises(IntegrityError):
+            db.flush()
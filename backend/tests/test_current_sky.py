@@ -0,0 +1,56 @@
+"""
+Tests for the shared current-sky snapshot.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas.astrology import Planet
+from app.services.astrology.current_sky import CurrentSky, julian_day
+
+# Fastest body (the Moon) within 1 arc-second of a direct calculation
+TOLERANCE_DEGREES = 1 / 3600
+
+
+def _angle_between(a: float, b: float) -> float:
+    return abs((a - b + 180) % 360 - 180)
+
+
+@pytest.fixture
+def sky():
+    return CurrentSky(refresh_seconds=30, max_age_seconds=120)
+
+
+class TestCurrentSky:
+    """Positions projected from the snapshot match a direct calculation."""
+    
+    def test_projection_matches_direct_calculation(self, sky):
+        snapshot = sky.refresh()
+        at = datetime.now(timezone.utc) + timedelta(seconds=90)
+        projected = sky.positions(at)
+        direct = sky.compute_snapshot(julian_day(at))
+        
+        assert sky.snapshot_for(julian_day(at)) is snapshot
+        for planet in Planet:
+            if planet not in direct.longitudes:
+                continue
+            assert _angle_between(
+                projected[planet]["longitude"], direct.longitudes[planet]
+            ) < TOLERANCE_DEGREES
+    
+    def test_ketu_opposes_rahu(self, sky):
+        positions = sky.positions()
+        assert _angle_between(
+            positions[Planet.KETU]["longitude"], positions[Planet.RAHU]["longitude"] + 180
+        ) < 1e-9
+    
+    def test_distant_instants_are_computed_directly(self, sky):
+        snapshot = sky.refresh()
+        jd = julian_day(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        assert sky.snapshot_for(jd).jd == jd
+        assert sky._snapshot is snapshot
+    
+    def test_houses_per_location(self, sky):
+        houses = sky.houses(19.0760, 72.8777)
+        assert [h["house_number"] for h in houses] == list(range(1, 13))
+        assert all(0 <= h["longitude"] < 360 for h in houses)
@@ -0,0 +1,86 @@
+"""
+Tests for Vimshottari antardasha splitting.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.astrology import Planet
+from app.services.astrology.dasha import (
+    DAYS_PER_YEAR, VIMSHOTTARI_SEQUENCE, VIMSHOTTARI_YEARS, antardasha_periods,
+    dasha_lords_at
+)
+
+
+def _mahadasha(planet, start, years):
+    return {
+        "planet": planet,
+        "start_date": start,
+        "end_date": start + timedelta(days=years * DAYS_PER_YEAR),
+        "duration_years": years,
+    }
+
+
+class TestAntardashas:
+    """Sub-periods follow the Vimshottari order from the mahadasha lord."""
+    
+    def test_sequence_spans_120_years(self):
+        assert sum(years for _, years in VIMSHOTTARI_SEQUENCE) == VIMSHOTTARI_YEARS
+    
+    def test_full_mahadasha_splits_into_nine(self):
+        start = datetime(2000, 1, 1)
+        saturn = _mahadasha(Planet.SATURN, start, 19)
+        periods = antardasha_periods([saturn])
+        
+        assert [p["planet"] for p in periods] == [
+            Planet.SATURN, Planet.MERCURY, Planet.KETU, Planet.VENUS, Planet.SUN,
+            Planet.MOON, Planet.MARS, Planet.RAHU, Planet.JUPITER,
+        ]
+        assert all(p["mahadasha_planet"] == Planet.SATURN for p in periods)
+        assert periods[0]["start_date"] == start
+        assert periods[-1]["end_date"] == saturn["end_date"]
+        for before, after in zip(periods, periods[1:]):
+            assert before["end_date"] == after["start_date"]
+        # Saturn/Saturn lasts 19 * 19 / 120 years
+        assert periods[0]["duration_years"] == pytest.approx(19 * 19 / 120)
+    
+    def test_partial_mahadasha_at_birth_is_clipped(self):
+        birth = datetime(1990, 6, 15, 12)
+        # Born 2 years into Venus: 18 of 20 years remain
+        venus = _mahadasha(Planet.VENUS, birth, 18)
+        periods = antardasha_periods([venus])
+        
+        # Venus/Venus (3.33 years) is still running at birth
+        assert periods[0]["planet"] == Planet.VENUS
+        assert periods[0]["start_date"] == birth
+        assert periods[0]["duration_years"] == pytest.approx(20 * 20 / 120 - 2)
+        assert len(periods) == 9
+        assert sum(p["duration_years"] for p in periods) == pytest.approx(18)
+    
+    def test_accepts_planet_values(self):
+        start = datetime(2000, 1, 1)
+        periods = antardasha_periods([_mahadasha("rahu", start, 18)])
+        assert periods[0]["planet"] == Planet.RAHU
+        assert periods[1]["planet"] == Planet.JUPITER
+
+
+class TestDashaLordsAt:
+    """Running lords come straight from the natal Moon."""
+    
+    def test_matches_period_tables(self):
+        # Moon halfway through Bharani: 10 of Venus' 20 years remain at birth
+        lords = [planet for planet, _ in VIMSHOTTARI_SEQUENCE]
+        maha, antar = dasha_lords_at(20.0, [0.0, 9.9, 10.5, 11.0])
+        assert [lords[i] for i in maha] == [
+            Planet.VENUS, Planet.VENUS, Planet.SUN, Planet.SUN,
+        ]
+        # Venus/Rahu runs from 7.17 to 10.17 years into Venus and Venus/Ketu
+        # closes it; Sun/Mars runs from 0.8 to 1.15 years into the Sun
+        assert [lords[i] for i in antar] == [
+            Planet.RAHU, Planet.KETU, Planet.MOON, Planet.MARS,
+        ]
+        
+        birth = datetime(2000, 1, 1)
+        venus = _mahadasha(Planet.VENUS, birth, 10)
+        periods = antardasha_periods([venus])
+        assert periods[0]["planet"] == Planet.RAHU
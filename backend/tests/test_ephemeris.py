@@ -0,0 +1,81 @@
+"""
+Tests for the precomputed ephemeris table.
+"""
+import csv
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.models.astrology import EphemerisTable, Planet, ZodiacSign
+from app.services.astrology.ephemeris import (
+    PLANETS, EphemerisSeries, ephemeris_at, ephemeris_range, sign_changes, to_csv
+)
+
+START = datetime(2000, 1, 1)
+
+
+def _series(longitudes):
+    """A daily series from 2000-01-01 with the same track for every planet."""
+    steps = len(longitudes)
+    return EphemerisSeries(
+        year=2000,
+        moments=[START + timedelta(days=i) for i in range(steps)],
+        jd=2451544.5 + np.arange(steps),
+        longitudes=np.tile(np.array(longitudes, dtype=float), (len(PLANETS), 1)),
+        speeds=np.full((len(PLANETS), steps), -0.5),
+    )
+
+
+def _rows(planet, longitudes):
+    return [
+        {
+            "planet": planet,
+            "moment": START + timedelta(days=i),
+            "jd": 2451544.5 + i,
+            "longitude": lon,
+            "speed": 1.0,
+            "sign": list(ZodiacSign)[int(lon // 30)],
+            "nakshatra": int(lon // (360 / 27)) + 1,
+        }
+        for i, lon in enumerate(longitudes)
+    ]
+
+
+class TestCopyFormat:
+    """Rows are encoded for COPY in the table's column order."""
+    
+    def test_to_csv(self):
+        rows = list(csv.reader(to_csv(_series([0.5, 359.9]))))
+        assert len(rows) == 2 * len(PLANETS)
+        assert rows[0] == [
+            PLANETS[0].name, "2000-01-01 00:00:00", "2451544.5", "0.5", "-0.5",
+            "ARIES", "1",
+        ]
+        assert rows[1][5:] == ["PISCES", "27"]
+
+
+class TestEphemerisQueries:
+    """Range helpers over stored rows."""
+    
+    def test_range_and_sign_changes(self, db):
+        # Retrograde back over the Aries/Pisces boundary and forward again
+        db.execute(insert(EphemerisTable), _rows(Planet.MARS, [29.0, 30.5, 29.5, 31.0]))
+        
+        rows = ephemeris_range(db, Planet.MARS, START, START + timedelta(days=3))
+        assert [row.longitude for row in rows] == [29.0, 30.5, 29.5]
+        
+        changes = sign_changes(db, Planet.MARS, START, START + timedelta(days=4))
+        assert [(c.previous_sign, c.sign) for c in changes] == [
+            (ZodiacSign.ARIES, ZodiacSign.TAURUS),
+            (ZodiacSign.TAURUS, ZodiacSign.ARIES),
+            (ZodiacSign.ARIES, ZodiacSign.TAURUS),
+        ]
+    
+    def test_ephemeris_at(self, db):
+        db.execute(insert(EphemerisTable), _rows(Planet.SUN, [280.0, 281.0]))
+        db.execute(insert(EphemerisTable), _rows(Planet.MOON, [10.0, 23.0]))
+        
+        positions = ephemeris_at(db, START + timedelta(days=1, hours=6))
+        assert positions[Planet.SUN].longitude == 281.0
+        assert positions[Planet.MOON].longitude == 23.0
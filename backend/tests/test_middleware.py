@@ -0,0 +1,43 @@
+"""
+Tests for the ASGI middleware.
+"""
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.middleware import SecurityHeadersMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware)
+    
+    @app.get("/plain")
+    def plain():
+        return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+    
+    @app.get("/stream")
+    def stream():
+        lines = (f'{{"n": {i}}}\n' for i in range(3))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    
+    return app
+
+
+class TestSecurityHeadersMiddleware:
+    """Headers are injected without buffering or overriding the response."""
+    
+    def test_adds_security_headers(self):
+        response = TestClient(_app()).get("/plain")
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["referrer-policy"] == "strict-origin-when-cross-origin"
+    
+    def test_keeps_endpoint_headers(self):
+        response = TestClient(_app()).get("/plain")
+        assert response.headers.get_list("x-frame-options") == ["SAMEORIGIN"]
+    
+    def test_streams_ndjson(self):
+        with TestClient(_app()).stream("GET", "/stream") as response:
+            assert response.headers["x-content-type-options"] == "nosniff"
+            lines = list(response.iter_lines())
+        assert lines == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
@@ -0,0 +1,104 @@
+"""
+Tests for the batch panchang generator.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.astrology import Planet
+from app.services.astrology.current_sky import julian_day
+from app.services.astrology.panchang import (
+    KARANAS, TITHIS, YOGAS, Transitions, compute_transitions, day_rows,
+    panchang_days, to_datetime
+)
+
+J0 = 2451545.0
+SUN_SPEED = 0.9856
+MOON_SPEED = 13.1764
+
+
+class LinearSky:
+    """Sun and Moon moving at constant speed from Aries 0° at ``J0``."""
+    
+    def sidereal_position(self, planet, jd, ayanamsa):
+        speed = SUN_SPEED if planet == Planet.SUN else MOON_SPEED
+        return (speed * (jd - J0)) % 360, 0.0, speed
+
+
+class TestTransitions:
+    """Limb boundaries are found once, at the exact crossing."""
+    
+    def test_linear_motion(self):
+        transitions = compute_transitions(J0 - 0.1, J0 + 30, LinearSky())
+        tithi = transitions["tithi"]
+        expected = J0 + 12.0 * np.arange(len(tithi.starts) - 1) / (MOON_SPEED - SUN_SPEED)
+        assert tithi.starts[1:] == pytest.approx(expected, abs=1e-6)
+        assert tithi.numbers.tolist() == [k % 30 + 1 for k in range(-1, len(expected))]
+        
+        # Every tithi boundary is also a karana boundary
+        karana = transitions["karana"]
+        assert karana.starts[1::2] == pytest.approx(tithi.starts[1:], abs=1e-6)
+        
+        nakshatra = transitions["nakshatra"]
+        assert nakshatra.starts[2] == pytest.approx(J0 + (360 / 27) / MOON_SPEED, abs=1e-6)
+        assert nakshatra.numbers[:3].tolist() == [27, 1, 2]
+    
+    def test_new_moon(self):
+        # Conjunction of 8 April 2024 (the total solar eclipse), 18:21 UT
+        new_moon = julian_day(datetime(2024, 4, 8, 18, 21))
+        tithi = compute_transitions(new_moon - 1, new_moon + 1)["tithi"]
+        starts = dict(zip(tithi.numbers.tolist(), tithi.starts.tolist()))
+        assert abs(starts[1] - new_moon) < 2 / 1440
+
+
+class TestDayRows:
+    """Day rows are sliced from the shared transitions."""
+    
+    def test_entries_between_sunrises(self):
+        starts = np.array([-np.inf, J0 + 0.5, J0 + 0.8, J0 + 3])
+        transitions = {
+            name: Transitions(starts, np.array([1, 2, 3, 4]))
+            for name in ("tithi", "nakshatra", "yoga", "karana")
+        }
+        midnights = J0 - 0.5 + np.arange(3)
+        sunrises = midnights + 0.25
+        sunsets = midnights + 0.75
+        rows = list(day_rows(
+            [date(2000, 1, 1), date(2000, 1, 2)], midnights, sunrises, sunsets,
+            transitions, timezone.utc,
+        ))
+        
+        first, second = rows
+        assert first.vara == "Shanivara"
+        assert first.sunrise == datetime(2000, 1, 1, 6, tzinfo=timezone.utc)
+        assert [(entry.name, entry.ends) for entry in first.tithi] == [
+            (TITHIS[0], to_datetime(J0 + 0.5)),
+            (TITHIS[1], to_datetime(J0 + 0.8)),
+        ]
+        assert [(entry.name, entry.ends) for entry in second.tithi] == [
+            (TITHIS[1], to_datetime(J0 + 0.8)),
+            (TITHIS[2], to_datetime(J0 + 3)),
+        ]
+        assert second.yoga[0].name == YOGAS[1]
+        assert second.karana[-1].name == KARANAS[2]
+
+
+class TestPanchangDays:
+    """A location's calendar from the real ephemeris."""
+    
+    def test_week_in_delhi(self):
+        days = list(panchang_days(
+            28.6139, 77.2090, date(2024, 12, 29), date(2025, 1, 4), "Asia/Kolkata"
+        ))
+        assert [day.date for day in days] == [
+            date(2024, 12, 29) + timedelta(days=d) for d in range(7)
+        ]
+        for day in days:
+            assert day.sunrise.hour == 7 and day.sunrise < day.sunset
+            assert 1 <= len(day.tithi) <= 3
+            assert day.tithi[0].ends > day.sunrise
+            # Consecutive entries, each ending after the previous one
+            ends = [entry.ends for entry in day.karana]
+            assert ends == sorted(ends)
+        assert any(day.tithi[0].name == "Amavasya" for day in days)
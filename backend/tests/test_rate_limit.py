@@ -0,0 +1,125 @@
+"""
+Tests for token-bucket rate limiting.
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import (
+    BucketPolicy,
+    MemoryRateLimitBackend,
+    RateLimitMiddleware,
+)
+from app.core.security import create_access_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(backend, capacity=10, refill_rate=1.0, **options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=backend,
+        user_policy=BucketPolicy(capacity, refill_rate),
+        ip_policy=BucketPolicy(capacity, refill_rate),
+        **options,
+    )
+    
+    @app.get("/api/v1/charts/{chart_id}")
+    def read_chart(chart_id: int):
+        return {"id": chart_id}
+    
+    @app.post("/api/v1/charts/generate")
+    def generate_chart():
+        return {"ok": True}
+    
+    return TestClient(app)
+
+
+class TestMemoryBackend:
+    """Buckets refill over time and never exceed capacity."""
+    
+    def test_refills(self):
+        clock = FakeClock()
+        backend = MemoryRateLimitBackend(clock=clock)
+        policy = BucketPolicy(capacity=2, refill_rate=1.0)
+        consume = lambda: asyncio.run(backend.consume("k", 1, policy))
+        
+        assert consume().allowed and consume().allowed
+        blocked = consume()
+        assert not blocked.allowed
+        assert blocked.retry_after == pytest.approx(1.0)
+        
+        clock.now += 1
+        assert consume().allowed
+        clock.now += 60
+        assert consume().allowed and consume().allowed
+        assert not consume().allowed
+
+
+class TestRateLimitMiddleware:
+    """Requests are charged by endpoint weight to per-user or per-IP buckets."""
+    
+    def test_rejects_when_bucket_empty(self):
+        client = _client(MemoryRateLimitBackend(clock=FakeClock()), capacity=3)
+        statuses = [client.get("/api/v1/charts/1").status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+        response = client.get("/api/v1/charts/1")
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert response.headers["retry-after"] == "1"
+    
+    def test_weights_expensive_endpoints(self):
+        client = _client(MemoryRateLimitBackend(clock=FakeClock()), capacity=15)
+        assert client.post("/api/v1/charts/generate").status_code == 200
+        assert client.post("/api/v1/charts/generate").status_code == 429
+        # A read still fits in what is left
+        assert client.get("/api/v1/charts/1").status_code == 200
+    
+    def test_users_have_separate_buckets(self):
+        client = _client(MemoryRateLimitBackend(clock=FakeClock()), capacity=1)
+        alice = {"Authorization": f"Bearer {create_access_token(1, timedelta(minutes=5))}"}
+        bob = {"Authorization": f"Bearer {create_access_token(2, timedelta(minutes=5))}"}
+        
+        assert client.get("/api/v1/charts/1", headers=alice).status_code == 200
+        assert client.get("/api/v1/charts/1", headers=alice).status_code == 429
+        assert client.get("/api/v1/charts/1", headers=bob).status_code == 200
+        # Anonymous requests from the same IP use the IP bucket
+        assert client.get("/api/v1/charts/1").status_code == 200
+    
+    def test_forwarded_for_uses_proxy_hop(self):
+        client = _client(
+            MemoryRateLimitBackend(clock=FakeClock()), capacity=1, trust_forwarded_for=True
+        )
+        spoofed = lambda fake: {"X-Forwarded-For": f"{fake}, 203.0.113.7"}
+        assert client.get("/api/v1/charts/1", headers=spoofed("1.1.1.1")).status_code == 200
+        # A different client-supplied entry doesn't buy a fresh bucket
+        assert client.get("/api/v1/charts/1", headers=spoofed("2.2.2.2")).status_code == 429
+    
+    def test_platform_client_ip_header(self):
+        client = _client(
+            MemoryRateLimitBackend(clock=FakeClock()), capacity=1,
+            client_ip_header="X-NF-Client-Connection-IP",
+        )
+        first = {"X-NF-Client-Connection-IP": "203.0.113.7", "X-Forwarded-For": "1.1.1.1"}
+        second = {"X-NF-Client-Connection-IP": "203.0.113.8", "X-Forwarded-For": "1.1.1.1"}
+        assert client.get("/api/v1/charts/1", headers=first).status_code == 200
+        assert client.get("/api/v1/charts/1", headers=first).status_code == 429
+        assert client.get("/api/v1/charts/1", headers=second).status_code == 200
+    
+    def test_fails_open_when_backend_unavailable(self):
+        class BrokenBackend:
+            async def consume(self, key, cost, policy):
+                raise ConnectionError("redis down")
+        
+        client = _client(BrokenBackend(), capacity=1)
+        assert client.get("/api/v1/charts/1").status_code == 200
+        assert client.get("/api/v1/charts/1").status_code == 200
@@ -0,0 +1,119 @@
+"""
+Tests for birth-time rectification.
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from app.models.astrology import Planet, ZodiacSign
+from app.services.astrology.calculation_engine import VedicCalculator
+from app.services.astrology.dasha import antardasha_periods
+from app.services.astrology.rectification import (
+    DashaEvent, RectificationConstraints, WindowSky, rectify
+)
+
+BIRTH_DATE = date(1990, 6, 15)
+LATITUDE = 19.0760  # Mumbai
+LONGITUDE = 72.8777
+
+
+@pytest.fixture
+def calculator():
+    return VedicCalculator()
+
+
+def _running(calculator, moment, on):
+    """Mahadasha and antardasha lords on ``on`` for a birth at ``moment``."""
+    # The dasha Moon uses the ayanamsa stored by the last positions call
+    calculator.calculate_planetary_positions(
+        moment.date(), moment.time(), LATITUDE, LONGITUDE
+    )
+    periods = calculator.calculate_dasha_periods(
+        moment.date(), moment.time(), LATITUDE, LONGITUDE
+    )
+    on = datetime.combine(on, time(12))
+    maha = next(p for p in periods if p["start_date"] <= on < p["end_date"])
+    antar = next(
+        p for p in antardasha_periods([maha]) if p["start_date"] <= on < p["end_date"]
+    )
+    return maha["planet"], antar["planet"]
+
+
+class TestWindowSky:
+    """The incremental sky agrees with a direct calculation."""
+    
+    def test_ascendant_and_planets(self, calculator):
+        start_jd = calculator._get_julian_day(
+            datetime.combine(BIRTH_DATE, time(8)), LATITUDE, LONGITUDE
+        )
+        sky = WindowSky(start_jd, start_jd + 1 / 6, LATITUDE, LONGITUDE, "P", calculator)
+        jd = start_jd + np.array([0, 0.05, 0.11, 1 / 6])
+        
+        ascendant = sky.ascendant(jd)
+        moon = sky.planets(jd)[:, 1]
+        for i, t in enumerate(jd):
+            ayanamsa = swe.get_ayanamsa_ut(t)
+            _, ascmc = swe.houses_ex(t, LATITUDE, LONGITUDE, b"P")
+            assert abs((ascmc[0] - ayanamsa - ascendant[i] + 180) % 360 - 180) < 0.01
+            direct, _, _ = calculator.sidereal_position(Planet.MOON, t, ayanamsa)
+            assert abs((direct - moon[i] + 180) % 360 - 180) < 0.001
+
+
+class TestRectify:
+    """Candidate windows satisfy the constraints and end where they stop holding."""
+    
+    def test_ascendant_windows(self, calculator):
+        constraints = RectificationConstraints(ascendant_signs=[ZodiacSign.LEO])
+        windows = rectify(
+            BIRTH_DATE, time(6), time(18), LATITUDE, LONGITUDE, constraints,
+            calculator=calculator,
+        )
+        assert len(windows) == 1
+        window = windows[0]
+        assert window.ascendant == ZodiacSign.LEO
+        # A sign rises in roughly two hours
+        assert timedelta(hours=1.5) < window.end - window.start < timedelta(hours=3)
+        
+        for moment, expected in (
+            (window.start + timedelta(seconds=5), ZodiacSign.LEO),
+            (window.start - timedelta(seconds=5), ZodiacSign.CANCER),
+            (window.end + timedelta(seconds=5), ZodiacSign.VIRGO),
+        ):
+            jd = calculator._get_julian_day(moment, LATITUDE, LONGITUDE)
+            _, ascmc = swe.houses_ex(jd, LATITUDE, LONGITUDE, b"P")
+            ascendant = (ascmc[0] - swe.get_ayanamsa_ut(jd)) % 360
+            assert list(ZodiacSign)[int(ascendant // 30)] == expected
+    
+    def test_dasha_events(self, calculator):
+        on = date(2015, 3, 1)
+        noon = datetime.combine(BIRTH_DATE, time(12))
+        maha, antar = _running(calculator, noon, on)
+        constraints = RectificationConstraints(
+            events=[DashaEvent(on=on, mahadasha=maha, antardasha=antar)],
+        )
+        windows = rectify(
+            BIRTH_DATE, time(8), time(16), LATITUDE, LONGITUDE, constraints,
+            calculator=calculator,
+        )
+        assert any(w.start <= noon <= w.end for w in windows)
+        for window in windows:
+            middle = window.start + (window.end - window.start) / 2
+            assert _running(calculator, middle, on) == (maha, antar)
+    
+    def test_placements_narrow_the_window(self, calculator):
+        everything = rectify(
+            BIRTH_DATE, time(0), time(23, 59), LATITUDE, LONGITUDE,
+            RectificationConstraints(), calculator=calculator,
+        )
+        assert len(everything) == 1
+        
+        sun_in_tenth = rectify(
+            BIRTH_DATE, time(0), time(23, 59), LATITUDE, LONGITUDE,
+            RectificationConstraints(placements={Planet.SUN: [10]}),
+            house_system="W", calculator=calculator,
+        )
+        # The Sun's sign is 10th from the ascendant for about one sign's rising
+        assert len(sun_in_tenth) == 1
+        assert sun_in_tenth[0].end - sun_in_tenth[0].start < timedelta(hours=3)
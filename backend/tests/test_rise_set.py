@@ -0,0 +1,76 @@
+"""
+Tests for the cached rise/set service.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.astrology import Planet
+from app.services.astrology import rise_set
+from app.services.astrology.current_sky import julian_day
+from app.services.astrology.rise_set import RiseSet, RiseSetService, midnights
+
+DELHI = (28.6139, 77.2090)
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Replace the ephemeris with rises at 06:00 and sets at 18:00 local mean time."""
+    calls = []
+    
+    def fake_compute(midnight_jd, latitude, longitude, body=Planet.SUN):
+        calls.append((len(midnight_jd), latitude, longitude, body))
+        return RiseSet(midnight_jd + 0.25, midnight_jd + 0.75)
+    
+    monkeypatch.setattr(rise_set, "compute_rise_set", fake_compute)
+    return calls
+
+
+class TestCache:
+    """Only uncached dates reach the ephemeris."""
+    
+    def test_vectorized_misses(self, computed):
+        service = RiseSetService(maxsize=100, precision=0.01)
+        week = [date(2024, 1, 1) + timedelta(days=d) for d in range(7)]
+        first = service.events(*DELHI, week[:3])
+        second = service.events(*DELHI, week)
+        assert [call[0] for call in computed] == [3, 4]
+        assert (second.rise[:3] == first.rise).all()
+        assert second.rise - second.set == pytest.approx(np.full(7, -0.5))
+        
+        # Nearby coordinates share the quantized entries; the Moon does not
+        service.events(DELHI[0] + 0.001, DELHI[1] - 0.001, week)
+        service.events(*DELHI, week, Planet.MOON)
+        assert [call[0] for call in computed] == [3, 4, 7]
+        assert computed[0][1:3] == pytest.approx((28.61, 77.21))
+    
+    def test_bounded(self, computed):
+        service = RiseSetService(maxsize=10, precision=0.01)
+        service.precompute_year(*DELHI, 2024, bodies=(Planet.SUN,))
+        assert computed[0][0] == 366
+        assert len(service._cache) == 10
+
+
+class TestVedicDays:
+    """Instants belong to the day of the sunrise before them."""
+    
+    def test_sunrise_boundaries(self, computed):
+        service = RiseSetService(maxsize=100)
+        latitude, longitude = 28.61, 77.21  # on the quantization grid
+        sunrise = midnights([date(2024, 3, 10)], longitude)[0] + 0.25
+        instants = np.array([sunrise - 0.01, sunrise + 1e-6, sunrise + 0.9])
+        days = service.vedic_days(latitude, longitude, instants)
+        assert days.dates == [date(2024, 3, 9), date(2024, 3, 10), date(2024, 3, 10)]
+        assert days.start == pytest.approx([sunrise - 1, sunrise, sunrise], abs=1e-9)
+        assert days.end == pytest.approx([sunrise, sunrise + 1, sunrise + 1], abs=1e-9)
+
+
+class TestEphemeris:
+    """Rise times from the real ephemeris."""
+    
+    def test_delhi_new_year(self):
+        events = RiseSetService(maxsize=10).events(*DELHI, [date(2024, 1, 1)])
+        sunrise = datetime(2024, 1, 1, 1, 45, tzinfo=timezone.utc)  # 07:15 IST
+        assert abs(events.rise[0] - julian_day(sunrise)) < 10 / 1440
+        assert events.rise[0] < events.set[0]
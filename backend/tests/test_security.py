@@ -0,0 +1,110 @@
+"""
+Tests for token verification and user caching.
+"""
+import asyncio
+import threading
+from datetime import timedelta
+
+import pytest
+from jose import JWTError, jwt
+
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class TestTTLCache:
+    """The bounded LRU/TTL cache behind token and user caching."""
+    
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+    
+    def test_expires_entries(self):
+        cache = TTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestVerifiedTokenCache:
+    """Repeated bearer tokens skip signature verification."""
+    
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        security._verified_tokens.clear()
+        security._user_cache.clear()
+    
+    def test_decode_once_per_token(self, monkeypatch):
+        token = security.create_access_token(42, expires_delta=timedelta(minutes=5))
+        calls = []
+        real_decode = jwt.decode
+        
+        def counting_decode(*args, **kwargs):
+            calls.append(args[0])
+            return real_decode(*args, **kwargs)
+        
+        monkeypatch.setattr(jwt, "decode", counting_decode)
+        assert security._decode_token(token)[0] == "42"
+        assert security._decode_token(token)[0] == "42"
+        assert len(calls) == 1
+    
+    def test_expired_cached_token_is_reverified(self):
+        token = security.create_access_token(42, expires_delta=timedelta(seconds=-1))
+        security._verified_tokens.set(token, ("42", 0.0))
+        with pytest.raises(JWTError):
+            security._decode_token(token)
+    
+    def test_invalidate_user_cache(self):
+        security._user_cache.set("42", object())
+        security.invalidate_user_cache(42)
+        assert security._user_cache.get("42") is None
+    
+    def test_user_update_evicts_cached_user(self, db, owner):
+        from app.crud.user import user as crud_user
+        
+        security._user_cache.set(str(owner.id), object())
+        crud_user.update(db, db_obj=owner, obj_in={"full_name": "Renamed"})
+        assert security._user_cache.get(str(owner.id)) is None
+
+
+class TestPasswordHashing:
+    """bcrypt runs on its own capped executor and follows the configured cost."""
+    
+    @pytest.fixture(autouse=True)
+    def fast_rounds(self, monkeypatch):
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 5)
+        security.get_pwd_context.cache_clear()
+        yield
+        security.get_pwd_context.cache_clear()
+    
+    def test_rehash_when_cost_changes(self, monkeypatch):
+        old_hash = security.get_password_hash("correct horse")
+        assert security.verify_and_update_password("correct horse", old_hash) == (True, None)
+        
+        monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 6)
+        security.get_pwd_context.cache_clear()
+        valid, new_hash = security.verify_and_update_password("correct horse", old_hash)
+        assert valid
+        assert new_hash.startswith("$2b$06$")
+    
+    def test_saturated_executor_sheds_load(self, monkeypatch):
+        monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(1))
+        security._hash_slots.acquire()
+        with pytest.raises(security.PasswordHashingBusy):
+            security.get_password_hash("correct horse")
+        with pytest.raises(security.PasswordHashingBusy):
+            asyncio.run(security.get_password_hash_async("correct horse"))
+    
+    def test_async_helpers(self):
+        hashed = asyncio.run(security.get_password_hash_async("correct horse"))
+        assert asyncio.run(security.verify_password_async("correct horse", hashed))
+        assert asyncio.run(
+            security.verify_and_update_password_async("wrong", hashed)
+        ) == (False, None)
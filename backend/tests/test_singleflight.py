@@ -0,0 +1,104 @@
+"""
+Tests for request coalescing.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.singleflight import SharedSingleFlight, SingleFlight
+
+
+class FakeRedis:
+    """Just enough of redis.Redis for the shared lock protocol."""
+    
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, nx=False, px=None):
+        with self._lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            return True
+    
+    def register_script(self, script):
+        def release(keys, args, client=None):
+            with self._lock:
+                if self.data.get(keys[0]) == args[0].encode():
+                    del self.data[keys[0]]
+        return release
+
+
+def _slow_counter(delay=0.2):
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return {"value": 42}
+    
+    return calls, compute
+
+
+class TestSingleFlight:
+    """Concurrent calls with one key share a single execution."""
+    
+    def test_coalesces_concurrent_calls(self):
+        flight = SingleFlight()
+        calls, compute = _slow_counter()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: flight.do("k", compute), range(8)))
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 8
+    
+    def test_distinct_keys_run_separately(self):
+        flight = SingleFlight()
+        calls, compute = _slow_counter(0)
+        flight.do("a", compute)
+        flight.do("b", compute)
+        flight.do("a", compute)
+        assert len(calls) == 3
+    
+    def test_shares_exceptions(self):
+        flight = SingleFlight()
+        
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("bad chart")
+        
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(flight.do, "k", fail) for _ in range(4)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+class TestSharedSingleFlight:
+    """Processes coordinate through a lock and result in the shared cache."""
+    
+    def test_coalesces_across_processes(self):
+        redis = FakeRedis()
+        # Two instances stand in for two worker processes
+        flights = [
+            SharedSingleFlight("t:", poll_interval=0.01, client_factory=lambda: redis)
+            for _ in range(2)
+        ]
+        calls, compute = _slow_counter()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: flights[i % 2].do("k", compute), range(8)))
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 8
+        assert "t:lock:k" not in redis.data
+    
+    def test_computes_locally_without_redis(self):
+        def unavailable():
+            raise ConnectionError("redis down")
+        
+        flight = SharedSingleFlight("t:", client_factory=unavailable)
+        assert flight.do("k", lambda: 7) == 7
@@ -0,0 +1,108 @@
+"""
+Tests for the batch Ashtakavarga and Shadbala engine.
+"""
+import numpy as np
+import pytest
+
+from app.models.astrology import Planet
+from app.services.astrology.strength import (
+    BENEFIC_PLACES, JUPITER, MARS, MOON, SATURN, SEVEN_PLANETS, SUN, VENUS,
+    ChartBatch, ashtakavarga, drishti, encode_charts, houses_of, shadbala
+)
+
+# Classical totals of each planet's Ashtakavarga; Sarvashtakavarga is 337
+BINDU_TOTALS = [48, 49, 39, 54, 56, 52, 39]
+
+
+def _random_batch(n, seed=7):
+    rng = np.random.default_rng(seed)
+    ascendant = rng.uniform(0, 360, n)
+    return ChartBatch(
+        longitudes=rng.uniform(0, 360, (n, 7)),
+        speeds=rng.uniform(-0.5, 14, (n, 7)),
+        cusps=(ascendant[:, None] + np.arange(12) * 30) % 360,
+        ayanamsa=np.full(n, 24.0),
+    )
+
+
+def _scalar_bhinna(longitudes, ascendant):
+    """Reference Ashtakavarga by counting houses, one chart at a time."""
+    signs = [int(lon // 30) for lon in longitudes] + [int(ascendant // 30)]
+    table = np.zeros((7, 12), dtype=int)
+    for p, planet in enumerate(SEVEN_PLANETS):
+        for sign in range(12):
+            for c, places in enumerate(BENEFIC_PLACES[planet]):
+                if (sign - signs[c]) % 12 + 1 in places:
+                    table[p, sign] += 1
+    return table
+
+
+class TestAshtakavarga:
+    """Bindu tables match the classical counts."""
+    
+    def test_totals_are_fixed(self):
+        result = ashtakavarga(_random_batch(50))
+        assert (result.bhinna.sum(axis=2) == BINDU_TOTALS).all()
+        assert (result.sarva.sum(axis=1) == 337).all()
+    
+    def test_matches_scalar_reference(self):
+        batch = _random_batch(20)
+        result = ashtakavarga(batch)
+        for n in range(20):
+            expected = _scalar_bhinna(batch.longitudes[n], batch.cusps[n, 0])
+            assert (result.bhinna[n] == expected).all()
+            assert (result.sarva[n] == expected.sum(axis=0)).all()
+
+
+class TestShadbala:
+    """Components follow their defining formulas."""
+    
+    def test_batch_equals_single_charts(self):
+        batch = _random_batch(10)
+        together = shadbala(batch).total
+        for n in range(10):
+            single = ChartBatch(*(field[n:n + 1] for field in batch))
+            assert shadbala(single).total[0] == pytest.approx(together[n])
+    
+    def test_uchcha_and_dig_bala(self):
+        batch = _random_batch(1)
+        lon = batch.longitudes.copy()
+        lon[0, SUN] = 10.0  # deep exaltation
+        lon[0, JUPITER] = batch.cusps[0, 0]  # on the ascendant
+        exalted = shadbala(batch._replace(longitudes=lon))
+        assert exalted.dig[0, JUPITER] == pytest.approx(60)
+        
+        # Uchcha is the only Sthana part that differs between the extremes
+        lon[0, SUN] = 190.0  # deep debilitation
+        debilitated = shadbala(batch._replace(longitudes=lon))
+        assert exalted.sthana[0, SUN] - debilitated.sthana[0, SUN] == pytest.approx(60)
+    
+    def test_drishti(self):
+        lon = np.zeros((1, 7))
+        lon[0] = [0, 180, 90, 45, 120, 200, 270]
+        strength = drishti(_random_batch(1)._replace(longitudes=lon))
+        assert strength[0, SUN, MOON] == 60        # opposition
+        assert strength[0, MARS, MOON] == 60       # Mars' special 4th-sign aspect
+        assert strength[0, SATURN, SUN] == 45      # 90 degrees, no special aspect
+        assert strength[0, JUPITER, VENUS] == 35   # 80 degrees: 80 - 45
+        assert strength[0, SUN, SUN] == 0
+    
+    def test_houses_of(self):
+        cusps = (np.arange(12) * 30.0 + 15)[None, :]
+        assert houses_of(np.array([[15.0, 44.9, 14.9]]), cusps).tolist() == [[1, 1, 12]]
+
+
+class TestEncoding:
+    """Calculator output is encoded in planet order."""
+    
+    def test_encode_charts(self):
+        positions = {
+            planet: {"longitude": 10.0 * p, "speed": 1.0, "is_retrograde": planet == Planet.SATURN}
+            for p, planet in enumerate(SEVEN_PLANETS)
+        }
+        houses = [{"house_number": i + 1, "longitude": i * 30.0} for i in range(12)]
+        batch = encode_charts([{"positions": positions, "houses": houses, "ayanamsa": 24.0}])
+        assert batch.longitudes[0, VENUS] == 50.0
+        assert batch.speeds[0, SATURN] == -1.0
+        assert batch.cusps[0, 0] == 0.0
+        assert batch.longitudes.shape == (1, 7)
@@ -0,0 +1,103 @@
+"""
+Tests for the vectorized transit-to-natal alert matching.
+"""
+from datetime import date
+
+import numpy as np
+
+from app.models.astrology import Planet, ZodiacSign
+from app.services.astrology.transit_alerts import (
+    ASPECT_NAMES,
+    PLANET_INDEX,
+    PLANETS,
+    NatalChunk,
+    chunk_alerts,
+    exact_aspects,
+    ingresses,
+)
+
+SUN = PLANET_INDEX[Planet.SUN]
+MOON = PLANET_INDEX[Planet.MOON]
+MARS = PLANET_INDEX[Planet.MARS]
+DAY = date(2026, 10, 20)
+
+
+def _sky(**longitudes) -> np.ndarray:
+    """Transit longitudes with every planet parked at 0-30 degrees apart."""
+    sky = np.array([7.0 + 29.0 * i for i in range(len(PLANETS))]) % 360
+    for name, longitude in longitudes.items():
+        sky[PLANET_INDEX[Planet(name)]] = longitude
+    return sky
+
+
+def _natal(*charts) -> np.ndarray:
+    natal = np.full((len(charts), len(PLANETS)), np.nan)
+    for row, placements in enumerate(charts):
+        for planet, longitude in placements.items():
+            natal[row, PLANET_INDEX[planet]] = longitude
+    return natal
+
+
+def _found(natal, start, end):
+    return {
+        (int(c), PLANETS[n], PLANETS[t], ASPECT_NAMES[a])
+        for c, n, t, a in zip(*exact_aspects(natal, start, end))
+    }
+
+
+class TestExactAspects:
+    """Aspects are reported on the day the transit perfects them."""
+    
+    def test_conjunction_and_trine(self):
+        natal = _natal({Planet.VENUS: 100.0}, {Planet.VENUS: 220.0})
+        start, end = _sky(moon=95.0), _sky(moon=108.0)
+        found = _found(natal, start, end)
+        assert (0, Planet.VENUS, Planet.MOON, "conjunction") in found
+        assert (1, Planet.VENUS, Planet.MOON, "trine") in found
+    
+    def test_not_reported_before_or_after_exact(self):
+        natal = _natal({Planet.VENUS: 100.0})
+        assert not _found(natal, _sky(moon=80.0), _sky(moon=93.0))
+        assert not _found(natal, _sky(moon=101.0), _sky(moon=114.0))
+    
+    def test_across_zero_aries(self):
+        natal = _natal({Planet.VENUS: 2.0})
+        found = _found(natal, _sky(moon=355.0), _sky(moon=8.0))
+        assert (0, Planet.VENUS, Planet.MOON, "conjunction") in found
+    
+    def test_retrograde_station(self):
+        natal = _natal({Planet.VENUS: 50.0})
+        found = _found(natal, _sky(mars=50.2), _sky(mars=49.9))
+        assert (0, Planet.VENUS, Planet.MARS, "conjunction") in found
+    
+    def test_unknown_natal_positions_never_match(self):
+        assert not _found(_natal({}), _sky(moon=95.0), _sky(moon=108.0))
+
+
+class TestChunkAlerts:
+    """Ingresses are counted from the natal Moon and rows share one shape."""
+    
+    def test_ingress_houses(self):
+        assert ingresses(_sky(sun=29.5), _sky(sun=30.5)) == [(SUN, 1)]
+        # The Moon changes sign every couple of days and is not reported
+        assert ingresses(_sky(moon=29.5), _sky(moon=42.0)) == []
+        
+        chunk = NatalChunk(
+            chart_ids=np.array([11, 12]),
+            user_ids=np.array([1, 2]),
+            longitudes=_natal({Planet.MOON: 345.0}, {}),
+        )
+        rows = chunk_alerts(chunk, DAY, _sky(sun=29.5), _sky(sun=30.5))
+        ingress_rows = [row for row in rows if row["kind"] == "ingress"]
+        assert ingress_rows == [{
+            "user_id": 1,
+            "chart_id": 11,
+            "alert_date": DAY,
+            "kind": "ingress",
+            "transit_planet": Planet.SUN,
+            "natal_planet": None,
+            "aspect": None,
+            "sign": ZodiacSign.TAURUS,
+            "house": 3,
+        }]
+        assert len({frozenset(row) for row in rows}) == 1
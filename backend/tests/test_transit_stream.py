@@ -0,0 +1,85 @@
+"""
+Tests for the live transit stream fan-out.
+"""
+import asyncio
+
+from app.services.astrology.transit_stream import (
+    Subscription,
+    TransitBroadcaster,
+    TransitFrame,
+)
+
+
+def _frame(moon: float, sun: float = 35.0) -> TransitFrame:
+    position = lambda longitude: {
+        "longitude": longitude, "sign": "Aries", "nakshatra": "Ashwini", "is_retrograde": False
+    }
+    return TransitFrame("2024-01-01T00:00:00+00:00", {"Sun": position(sun), "Moon": position(moon)})
+
+
+class FakeSky:
+    def __init__(self):
+        self.calls = 0
+    
+    def positions(self):
+        self.calls += 1
+        return {
+            "Sun": {"longitude": 10.0, "sign": "Aries", "nakshatra": {"name": "Ashwini"}, "is_retrograde": False},
+        }
+
+
+class TestSubscription:
+    """Each connection is sent diffs and keeps only the newest frame."""
+    
+    def test_sends_only_changes(self):
+        subscription = Subscription()
+        first = subscription.messages_for(_frame(moon=5.0))
+        assert set(first[0]["changes"]) == {"Sun", "Moon"}
+        second = subscription.messages_for(_frame(moon=5.5))
+        assert set(second[0]["changes"]) == {"Moon"}
+        assert subscription.messages_for(_frame(moon=5.5)) == []
+    
+    def test_slow_consumer_gets_latest_frame(self):
+        async def scenario():
+            subscription = Subscription()
+            subscription.offer(_frame(moon=1.0))
+            subscription.offer(_frame(moon=2.0))
+            frame = await subscription.next_frame()
+            return subscription, frame
+        
+        subscription, frame = asyncio.run(scenario())
+        assert frame.positions["Moon"]["longitude"] == 2.0
+        assert subscription.dropped == 1
+    
+    def test_aspect_events(self):
+        subscription = Subscription(natal={"Venus": 100.0}, orb=1.0)
+        assert subscription.messages_for(_frame(moon=50.0))[1:] == []
+        
+        begin = subscription.messages_for(_frame(moon=99.5))[1:]
+        assert [(m["event"], m["transit_planet"], m["natal_planet"], m["aspect"]) for m in begin] == [
+            ("begin", "Moon", "Venus", "conjunction")
+        ]
+        assert subscription.messages_for(_frame(moon=100.2))[1:] == []
+        
+        end = subscription.messages_for(_frame(moon=102.0))[1:]
+        assert [(m["event"], m["aspect"]) for m in end] == [("end", "conjunction")]
+
+
+class TestTransitBroadcaster:
+    """One computation per tick is shared by every subscriber."""
+    
+    def test_fans_out_one_computation(self):
+        sky = FakeSky()
+        broadcaster = TransitBroadcaster(tick_seconds=60, sky_factory=lambda: sky)
+        
+        async def scenario():
+            subscriptions = [broadcaster.subscribe() for _ in range(50)]
+            frames = await asyncio.gather(*(s.next_frame() for s in subscriptions))
+            for subscription in subscriptions:
+                broadcaster.unsubscribe(subscription)
+            return frames
+        
+        frames = asyncio.run(scenario())
+        assert sky.calls == 1
+        assert all(frame is frames[0] for frame in frames)
+        assert broadcaster.subscriber_count == 0
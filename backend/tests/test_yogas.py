@@ -0,0 +1,105 @@
+"""
+Tests for the compiled yoga rule engine.
+"""
+import numpy as np
+import pytest
+
+from app.services.astrology.yoga_rules import YOGA_RULES
+from app.services.astrology.yogas import (
+    ATOM_INDEX, YOGA_PLANETS, compile_rules, default_rules, encode_charts,
+    encode_signs, evaluate
+)
+
+PLANET_ORDER = [planet.value for planet in YOGA_PLANETS]
+
+
+def _signs(ascendant=0, **placements):
+    """Sign indices (0 = Aries) of every planet; unplaced ones go to Aries."""
+    signs = np.zeros((1, len(YOGA_PLANETS)), dtype=int)
+    for planet, sign in placements.items():
+        signs[0, PLANET_ORDER.index(planet)] = sign
+    return signs, np.array([ascendant])
+
+
+def _has_atom(encoded, atom):
+    bits = np.unpackbits(encoded.view(np.uint8), axis=-1)
+    return bool(bits[0, ATOM_INDEX[atom]])
+
+
+def _yogas(ascendant=0, **placements):
+    rules = default_rules()
+    found = evaluate(encode_signs(*_signs(ascendant, **placements)), rules)
+    return {rules.names[r] for r in np.nonzero(found[0])[0]}
+
+
+class TestEncoding:
+    """Atoms reflect placements, houses and lordships."""
+    
+    def test_atoms(self):
+        # Leo ascendant: the Sun rules the 1st, Saturn the 6th and 7th
+        encoded = encode_signs(*_signs(4, sun=4, saturn=10, moon=1, jupiter=7))
+        assert _has_atom(encoded, ("sign", "sun", "leo"))
+        assert _has_atom(encoded, ("house", "saturn", 7))
+        assert _has_atom(encoded, ("moon_house", "jupiter", 7))
+        assert _has_atom(encoded, ("lords", "saturn", 6))
+        assert _has_atom(encoded, ("lord_house", 1, 1))
+        assert _has_atom(encoded, ("aspect", "saturn", "sun"))
+        assert _has_atom(encoded, ("aspect", "sun", "saturn"))
+        assert not _has_atom(encoded, ("conjunct", "sun", "sun"))
+    
+    def test_encode_charts_reads_calculator_output(self):
+        positions = {planet: {"longitude": 95.0} for planet in YOGA_PLANETS}
+        houses = [{"house_number": 1, "longitude": 5.0}]
+        encoded = encode_charts([{"positions": positions, "houses": houses}])
+        assert _has_atom(encoded, ("house", "moon", 4))
+
+
+class TestRules:
+    """Declared rules match the charts they describe."""
+    
+    def test_gaja_kesari(self):
+        assert "Gaja Kesari" in _yogas(moon=2, jupiter=5)
+        assert "Gaja Kesari" not in _yogas(moon=2, jupiter=6)
+    
+    def test_mahapurusha(self):
+        # Mars exalted in Capricorn, 10th from an Aries ascendant
+        assert "Ruchaka" in _yogas(0, mars=9)
+        assert "Ruchaka" not in _yogas(1, mars=9)
+    
+    def test_lunar_yogas(self):
+        lone_moon = dict(
+            moon=0, sun=3, mars=4, mercury=4, jupiter=5, venus=5, saturn=6, rahu=7, ketu=1
+        )
+        assert "Kemadruma" in _yogas(**lone_moon)
+        assert "Kemadruma" not in _yogas(**{**lone_moon, "venus": 1})
+        assert "Sunapha" in _yogas(**{**lone_moon, "venus": 1})
+        assert "Durudhara" in _yogas(**{**lone_moon, "venus": 1, "saturn": 11})
+    
+    def test_parivartana(self):
+        # Aries ascendant: Mars (1st lord) in Cancer, Moon (4th lord) in Aries
+        assert "Parivartana" in _yogas(0, mars=3, moon=0)
+        assert "Parivartana" not in _yogas(0, mars=3, moon=1)
+    
+    def test_raja_yoga(self):
+        # Cancer ascendant: Mars rules the 5th and 10th on its own
+        assert "Raja" in _yogas(3, mars=0)
+    
+    def test_unknown_atom_is_rejected(self):
+        with pytest.raises(ValueError):
+            compile_rules([{"name": "Bad", "all": [("house", "pluto", 1)]}])
+
+
+class TestBatch:
+    """A batch gives the same answers as charts one at a time."""
+    
+    def test_batch_equals_single(self):
+        rng = np.random.default_rng(3)
+        signs = rng.integers(0, 12, (200, len(YOGA_PLANETS)))
+        ascendant = rng.integers(0, 12, 200)
+        rules = compile_rules(YOGA_RULES)
+        together = evaluate(encode_signs(signs, ascendant), rules)
+        for n in range(0, 200, 17):
+            single = evaluate(encode_signs(signs[n:n + 1], ascendant[n:n + 1]), rules)
+            assert (single[0] == together[n]).all()
+        assert together.shape == (200, len(YOGA_RULES))
+        assert together.any(axis=0).sum() > len(YOGA_RULES) // 2
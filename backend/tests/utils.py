@@ -0,0 +1,115 @@
+"""
+Shared helpers for the backend test-suite.
+"""
+from contextlib import contextmanager
+from datetime import date, time
+from typing import Any, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.crud.birth_chart import birth_chart
+from app.models.astrology import (
+    AspectTable, DashaPeriodTable, HouseTable, Planet, PlanetPositionTable,
+    ZodiacSign
+)
+
+_SAVEPOINT_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryCounter:
+    """Collects the SQL statements emitted on a connection."""
+    
+    def __init__(self) -> None:
+        self.executed: List[Tuple[str, Any]] = []
+    
+    @property
+    def statements(self) -> List[str]:
+        return [statement for statement, _ in self.executed]
+    
+    @property
+    def count(self) -> int:
+        return len(self.executed)
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # Savepoints come from the test fixture's transaction wrapping
+        if statement.lstrip().upper().startswith(_SAVEPOINT_PREFIXES):
+            return
+        self.executed.append((statement, parameters))
+
+
+@contextmanager
+def count_queries(db: Session) -> Iterator[QueryCounter]:
+    """
+    Count the queries a block of code sends through the session's connection.
+    
+    Usage:
+        with count_queries(db) as counter:
+            crud.birth_chart.get_multi_by_owner(db, owner_id=user.id)
+        assert counter.count == 5
+    """
+    counter = QueryCounter()
+    connection: Connection = db.connection()
+    event.listen(connection, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(connection, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(db: Session, expected: int) -> Iterator[QueryCounter]:
+    """Fail if the block issues more than ``expected`` queries."""
+    with count_queries(db) as counter:
+        yield counter
+    assert counter.count <= expected, (
+        f"Expected at most {expected} queries, got {counter.count}:\n"
+        + "\n".join(counter.statements)
+    )
+
+
+def explain(db: Session, statement: str, parameters: Any = None) -> str:
+    """Return the PostgreSQL plan for a statement captured by ``count_queries``."""
+    result = db.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+def make_chart(db: Session, owner_id: int, name: str):
+    """Add a chart with one row in each child table (not flushed)."""
+    chart = birth_chart.model(
+        name=name,
+        owner_id=owner_id,
+        birth_date=date(1990, 6, 15),
+        birth_time=time(12, 0),
+        timezone="Asia/Kolkata",
+        latitude=19.076,
+        longitude=72.8777,
+        ayanamsa=23.7,
+    )
+    chart.planet_positions = [
+        PlanetPositionTable(
+            planet=Planet.MOON, sign=ZodiacSign.TAURUS, degree=10.0,
+            nakshatra="Rohini", nakshatra_pada=1, house=2,
+        )
+    ]
+    chart.houses = [
+        HouseTable(
+            house_number=1, sign=ZodiacSign.ARIES,
+            start_degree=0.0, end_degree=30.0,
+        )
+    ]
+    chart.aspects = [
+        AspectTable(
+            planet=Planet.MOON, aspecting_planet=Planet.SATURN,
+            aspect_degree=180.0, orb=1.0,
+        )
+    ]
+    chart.dasha_periods = [
+        DashaPeriodTable(
+            planet=Planet.MOON, start_date=date(1990, 6, 15),
+            end_date=date(1996, 6, 15),
+        )
+    ]
+    db.add(chart)
+    return chart
@@ -12,7 +12,9 @@ $env:DATABASE_URL = $ConnectionString
 python -m pip install --upgrade pip
 pip install alembic psycopg2-binary
 
-# Run migrations
+# Create the schema on an empty database (stamped at the latest migration),
+# then run any migrations an existing database is missing
+python init-db.py
 alembic upgrade head
 
 # Create initial admin user (use a strong password in production)
@@ -12,6 +12,20 @@ from fastapi.middleware.cors import CORSMiddleware
 # Add the backend directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
+# Function instances serve one request at a time: keep a single DB connection
+# per warm instance instead of a server-sized pool. Set DB_POOL_MODE=null when
+# connecting through pgbouncer. The engine itself is only created on first use.
+os.environ.setdefault('DB_POOL_MODE', 'serverless')
+# If ENABLE_RATE_LIMITING is turned on: Netlify's edge passes the connecting
+# client's IP in its own header, and X-Forwarded-For stays untrusted.
+# Function instances don't share memory, so also set RATE_LIMIT_BACKEND=redis
+# (with REDIS_URL) for limits that hold across instances.
+os.environ.setdefault('RATE_LIMIT_CLIENT_IP_HEADER', 'x-nf-client-connection-ip')
+os.environ.setdefault('RATE_LIMIT_TRUST_FORWARDED_FOR', 'false')
+# Instances are frozen between invocations, so background tasks don't run;
+# the current-sky snapshot is refreshed on demand instead.
+os.environ.setdefault('CURRENT_SKY_BACKGROUND_REFRESH', 'false')
+
 # Import the FastAPI app
 from app.main import app as fastapi_app
 